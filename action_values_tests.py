@@ -0,0 +1,72 @@
+"""
+test the estimation of card values for AI hints in `action_values.py`
+"""
+import numpy as np
+
+from program_files.wizard_card import Wizard_Card
+from program_files.game_state import Game_State
+from program_files.action_values import get_action_values, get_game_state_key, copy_game_state
+from program_files.wizard_ais.simple_rule_ai import Simple_Rule_Ai
+
+
+def _get_trick_state() -> Game_State:
+  """
+  3 players in round 3, player 0 starts the trick with a red 5 and player 1 has to serve red
+  """
+  game_state = Game_State(3)
+  game_state.round_number = 3
+  game_state.round_starting_player = 2 # incremented by `start_round`
+  hands = [
+      [Wizard_Card(5), Wizard_Card(20), Wizard_Card(59)],
+      [Wizard_Card(3), Wizard_Card(12), Wizard_Card(35)],
+      [Wizard_Card(0), Wizard_Card(31), Wizard_Card(47)]]
+  game_state.start_round(hands, Wizard_Card(17), 1)
+  game_state.set_predictions(np.array([1, 1, 0]))
+  game_state.start_trick()
+  game_state.perform_action(Wizard_Card(5))
+  return game_state
+
+
+def test_legal_cards():
+  game_state = _get_trick_state()
+  key = get_game_state_key(game_state)
+  hands = [list(hand) for hand in game_state.players_hands]
+  action_values = get_action_values(game_state, Simple_Rule_Ai(), time_budget_s=0.1, rng=np.random.default_rng(0))
+  # player 1 has to serve red
+  assert set(action_values) == {3, 12}
+  # the game state is not changed by the rollouts
+  assert get_game_state_key(game_state) == key
+  assert game_state.players_hands == hands
+
+
+def test_game_state_key():
+  game_state = _get_trick_state()
+  game_state_copy = copy_game_state(game_state)
+  assert get_game_state_key(game_state_copy) == get_game_state_key(game_state)
+  game_state_copy.perform_action(Wizard_Card(3))
+  assert get_game_state_key(game_state_copy) != get_game_state_key(game_state)
+  # other players' hands are not known to the active player
+  game_state_copy = copy_game_state(game_state)
+  game_state_copy.players_hands[2] = [Wizard_Card(1), Wizard_Card(2), Wizard_Card(4)]
+  assert get_game_state_key(game_state_copy) == get_game_state_key(game_state)
+  # the same played card in an earlier trick instead of the current trick
+  game_state_copy = copy_game_state(game_state)
+  game_state_copy.winning_card = None
+  game_state_copy.n_cards_to_be_played = 3
+  assert get_game_state_key(game_state_copy) != get_game_state_key(game_state)
+
+
+def test_ai_action_values():
+  class Value_Ai(Simple_Rule_Ai):
+    def get_action_values(self, game_state: Game_State) -> dict[int, float]:
+      return {card.raw_value: 1. for card in game_state.players_hands[game_state.trick_active_player]}
+  assert get_action_values(_get_trick_state(), Value_Ai()) == {3: 1., 12: 1., 35: 1.}
+
+
+def all_tests():
+  test_legal_cards()
+  test_game_state_key()
+  test_ai_action_values()
+
+if __name__ == "__main__":
+  all_tests()
@@ -0,0 +1,122 @@
+"""
+test the asyncio game driver and its external agents in `async_game_driver.py`
+"""
+import os
+import sys
+import json
+import asyncio
+
+import numpy as np
+
+from program_files.game_engine import Game_Engine, TRICK, BID
+from program_files.action_values import get_game_state_key, get_legal_actions
+from program_files.async_game_driver import get_observation, observation_to_game_state, decode_decision, \
+    In_Process_Agent, Subprocess_Agent, Socket_Agent, play_game_async, play_games_async, run_games, serve_agent_socket
+from program_files.wizard_ais.simple_rule_ai import Simple_Rule_Ai
+
+REPOSITORY_PATH: str = os.path.dirname(os.path.abspath(__file__))
+
+
+class Waiting_Agent(In_Process_Agent):
+  """
+  agent that waits before each decision and counts how many of its decisions are pending at the same time
+  """
+  def __init__(self):
+    super().__init__(Simple_Rule_Ai())
+    self.n_pending: int = 0
+    self.max_pending: int = 0
+
+  async def get_decision(self, engine: Game_Engine):
+    self.n_pending += 1
+    self.max_pending = max(self.max_pending, self.n_pending)
+    await asyncio.sleep(0.001)
+    self.n_pending -= 1
+    return await super().get_decision(engine)
+
+
+def test_observation():
+  np.random.seed(0)
+  engine = Game_Engine(4, max_rounds=5, players=[Simple_Rule_Ai() for _ in range(4)])
+  while engine.game_state.round_number < 5 or engine.next_event != TRICK:
+    engine.step()
+  engine.step()
+  observation = json.loads(json.dumps(get_observation(engine)))
+  game_state, _ = observation_to_game_state(observation)
+  assert get_game_state_key(game_state) == get_game_state_key(engine.game_state)
+  # only the active player's cards are sent
+  assert all(hand == [] for player, hand in enumerate(game_state.players_hands) if player != engine.active_player)
+  # the first card in the hand may not follow suit
+  card = get_legal_actions(engine.game_state)[0]
+  assert decode_decision(engine, card.raw_value) == card
+  try:
+    decode_decision(engine, 60)
+  except ValueError:
+    pass
+  else:
+    assert False, "cards that are not in the hand should be rejected"
+
+
+def test_bid_observation():
+  engine = Game_Engine(3, max_rounds=3, players=[Simple_Rule_Ai() for _ in range(3)])
+  while engine.next_event != BID:
+    engine.step()
+  engine.step()
+  predictions = get_observation(engine)["predictions"]
+  first_bidder = engine.game_state.round_starting_player
+  assert predictions[first_bidder] == engine.predictions[first_bidder]
+  assert predictions.count(None) == 2
+
+
+def test_in_process_game():
+  """
+  a game with in-process agents is the same game as with synchronous players
+  """
+  ai = Simple_Rule_Ai()
+  np.random.seed(0)
+  synchronous_points = Game_Engine(4, max_rounds=8, players=[ai] * 4).play_game().copy()
+  np.random.seed(0)
+  points = asyncio.run(play_game_async([In_Process_Agent(ai)] * 4, max_rounds=8))
+  assert np.array_equal(points, synchronous_points)
+
+
+def test_interleaved_games():
+  agents = [Waiting_Agent() for _ in range(3)]
+  points = asyncio.run(play_games_async(agents, n_games=20, max_rounds=3, max_concurrent_games=10))
+  assert points.shape == (20, 3)
+  # decisions of different games are pending at the same time, but not of more than 10 games
+  assert 1 < max(agent.max_pending for agent in agents) <= 10
+
+
+def test_socket_agent():
+  async def play() -> np.ndarray:
+    server = await serve_agent_socket(Simple_Rule_Ai())
+    port: int = server.sockets[0].getsockname()[1]
+    agents = [Socket_Agent("localhost", port) for _ in range(2)] + [In_Process_Agent(Simple_Rule_Ai())]
+    try:
+      return await play_games_async(agents, n_games=4, max_rounds=4)
+    finally:
+      for agent in agents:
+        await agent.close()
+      server.close()
+      await server.wait_closed()
+  assert asyncio.run(play()).shape == (4, 3)
+
+
+def test_subprocess_agent():
+  agent = Subprocess_Agent([sys.executable, "-m", "program_files.async_game_driver", "simple rule ai"],
+      cwd=REPOSITORY_PATH, decision_timeout_s=60)
+  points = run_games([agent, In_Process_Agent(Simple_Rule_Ai()), agent], n_games=3, max_rounds=3)
+  assert points.shape == (3, 3)
+  assert agent.process is None
+
+
+def all_tests():
+  test_observation()
+  test_bid_observation()
+  test_in_process_game()
+  test_interleaved_games()
+  test_socket_agent()
+  test_subprocess_agent()
+
+if __name__ == "__main__":
+  all_tests()
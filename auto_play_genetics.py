@@ -11,19 +11,20 @@ this module implements methods to automatically let AIs
 last edited: 11.04.2023
 author: Sebastian Jost
 """
-import tkinter as tk
 import multiprocessing as mp
+from typing import TYPE_CHECKING
 
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.stats as stats
-from memory_profiler import profile
 
-from program_files.game_state import Game_State
 from program_files.wizard_ais.ai_base_class import Wizard_Base_Ai
-from program_files.helper_functions import get_hands
+from program_files.game_engine import Game_Engine
+from program_files.game_records import Game_Record_Writer, get_record_writer
+from program_files.profiling import Phase_Timer
+from program_files.fitness_statistics import estimate_fitness
+from program_files.deal_bank import Deal_Bank
+if TYPE_CHECKING: # tkinter and matplotlib are only needed for plotting
+  import tkinter as tk
 
-# @profile
 class Genetic_Auto_Play():
   def __init__(self,
                n_players: int,
@@ -31,6 +32,10 @@ class Genetic_Auto_Play():
                max_rounds: int = 20,
                confidence_level: float = 0.95,
                limit_choices: bool = False, # not implemented
+               record_dir: str = None,
+               timer: Phase_Timer = None,
+               score_estimator: str = "lower_confidence_bound",
+               deal_bank: Deal_Bank = None,
                ):
     """
     initialize auto-play setup
@@ -41,15 +46,27 @@ class Genetic_Auto_Play():
         limit_choices (bool): whether or not to allow the number of bids can equal the number of tricks (not implemented)
         max_rounds (int): number of rounds to be played
         ai_instances (list[Wizard_Base_Ai]): list of AI instances to be used in the games
-        confidence_level (float): confidence level for player scores (score = lower bound of confidence interval)
+        confidence_level (float): confidence level of the two-sided confidence interval for player scores
+        record_dir (str): directory to record all played games in (see `game_records.py`). `None` disables recording.
+        timer (Phase_Timer): timer to record the time spent in each phase of the game and by each AI. `None` disables profiling.
+        score_estimator (str): how to calculate a player's score from the results of all games (see `fitness_statistics.SCORE_ESTIMATORS`)
+        deal_bank (Deal_Bank): pre-dealt games to play instead of shuffling cards. Game `n` of each evaluation uses game `n` of the bank,
+            so all evaluations with the same bank are played on the same deals. `None` shuffles new cards for every round.
     """
     self.n_players: int = n_players
     self.limit_choices: bool = limit_choices
     self.n_rounds: int = min(max_rounds, 60 // self.n_players) + 1
     self.ai_instances: list[Wizard_Base_Ai] = ai_instances
-    self.confidence_level: float = confidence_level / 2 # two-sided confidence interval
+    self.confidence_level: float = confidence_level
+    self.score_estimator: str = score_estimator
+    self.record_dir: str = record_dir
+    self.timer: Phase_Timer = timer
+    self.deal_bank: Deal_Bank = deal_bank
+    if deal_bank is not None and (deal_bank.n_players != n_players or deal_bank.n_rounds < self.n_rounds - 1):
+      raise ValueError(f"The deal bank has games of {deal_bank.n_rounds} rounds for {deal_bank.n_players} players.")
 
     self.games_played = 0
+    self.scores: np.ndarray = np.zeros((0, n_players))
 
 
   def auto_play_single_threaded(self, n_games: int) -> np.ndarray:
@@ -62,40 +79,44 @@ class Genetic_Auto_Play():
         n_games (int): number of games to be played
 
     returns:
-        (np.ndarray): scores for each player as lower bound of confidence interval
+        (np.ndarray): score of each player calculated with `self.score_estimator`
     """
     scores: np.ndarray = np.zeros((n_games, self.n_players))
 
-    random_order = np.arange(self.n_players)
-
     for n in range(n_games):
-      np.random.shuffle(random_order)
+      random_order: np.ndarray = self.get_seat_order(n)
       ai_instances = [self.ai_instances[i] for i in random_order]
-      player_scores: np.ndarray = self.play_game(ai_instances)
-      scores[n, :] = player_scores
-    # calculate average scores and standard deviations for each player
-    avg_scores: np.ndarray = np.sum(scores, axis=0) / n_games
-    standard_deviations: np.ndarray = np.std(scores, axis=0)
-    # calculate confidence intervals
-    z_score: float = stats.norm.ppf(1 - (1 - self.confidence_level) / 2)
-    lower_confidence_bound: np.ndarray = avg_scores - standard_deviations / np.sqrt(n_games) * z_score
-    return lower_confidence_bound
+      player_scores: np.ndarray = self.play_game(ai_instances, random_order, self.timer, game_index=n)
+      scores[n, random_order] = player_scores # record results in proper order
+    if self.record_dir is not None:
+      get_record_writer(self.record_dir).flush()
+    self.scores = scores
+    return estimate_fitness(scores, self.score_estimator, self.confidence_level)
 
 
-  def play_record_game(self, *_) -> np.ndarray:
+  def play_record_game(self, n: int) -> np.ndarray:
     """
     play a single game and return the final scores of the players
 
+    inputs:
+    -------
+        n (int): index of the game in this evaluation
+
     returns:
     --------
         (np.ndarray): final scores of the players
+        (Phase_Timer): times of this game. Only returned if profiling is enabled.
     """
-    random_order: np.ndarray = np.arange(self.n_players)
-    np.random.shuffle(random_order)
+    random_order: np.ndarray = self.get_seat_order(n)
     ai_instances: list[Wizard_Base_Ai] = [self.ai_instances[i] for i in random_order]
-    player_scores: np.ndarray = self.play_game(ai_instances)
-    player_scores[random_order] = player_scores # record results in proper order
-    return player_scores
+    game_timer: Phase_Timer = None if self.timer is None else self.timer.new_like()
+    seat_scores: np.ndarray = self.play_game(ai_instances, random_order, game_timer, game_index=n)
+    # record results in proper order. Assigning `seat_scores` into itself through the index would overwrite scores before they are read.
+    player_scores: np.ndarray = np.empty_like(seat_scores)
+    player_scores[random_order] = seat_scores
+    if game_timer is None:
+      return player_scores
+    return player_scores, game_timer
 
   def auto_play_multi_threaded(self, 
       n_games: int, 
@@ -111,72 +132,61 @@ class Genetic_Auto_Play():
         reset_stats (bool): whether to start counting at 0 or continue counting old scores
 
     returns:
-        (np.ndarray): scores for each player as lower bound of confidence interval
+        (np.ndarray): score of each player calculated with `self.score_estimator`
     """
     # play games in parallel
     result_list: list[np.ndarray] = process_pool.map(self.play_record_game, range(n_games))
+    if self.timer is not None:
+      result_list, game_timers = zip(*result_list)
+      for game_timer in game_timers:
+        self.timer.merge(game_timer)
     # record results
     scores: np.ndarray = np.array(result_list)
-    # calculate average scores and standard deviations for each player
-    avg_scores: np.ndarray = np.sum(scores, axis=0) / n_games
-    standard_deviations: np.ndarray = np.std(scores, axis=0)
-    # calculate confidence intervals
-    z_score: float = stats.norm.ppf(1 - (1 - self.confidence_level) / 2)
-    lower_confidence_bound: np.ndarray = avg_scores - standard_deviations / np.sqrt(n_games) * z_score
-    return lower_confidence_bound
+    self.scores = scores
+    return estimate_fitness(scores, self.score_estimator, self.confidence_level)
 
 
-  def play_game(self, ai_instances: list[Wizard_Base_Ai]):
+  def get_seat_order(self, n: int) -> np.ndarray:
+    """
+    return the player in each seat of game `n`: rotated with the game index if a deal bank is used,
+    so candidates get the same hands in every evaluation, otherwise shuffled.
+    """
+    if self.deal_bank is not None:
+      return self.deal_bank.get_seat_order(n)
+    random_order: np.ndarray = np.arange(self.n_players)
+    np.random.shuffle(random_order)
+    return random_order
+
+
+  def play_game(self,
+      ai_instances: list[Wizard_Base_Ai],
+      seat_ids: list[int] = None,
+      timer: Phase_Timer = None,
+      game_index: int = 0):
     """
     play one game with the rules set in `self`
+
+    inputs:
+    -------
+        ai_instances (list[Wizard_Base_Ai]): AI instance of the player in each seat
+        seat_ids (list[int]): index of each seat's player in `self.ai_instances`. Only used for game records.
+        timer (Phase_Timer): timer to record the time of each phase in. `None` disables profiling.
+        game_index (int): index of the game in `self.deal_bank`. It determines the deal and the starting player. Ignored without a deal bank.
     """
-    game = Game_State(n_players=self.n_players, verbosity=0)
-    for round_nbr in range(1, self.n_rounds):
-      self.play_round(round_nbr, game, self.limit_choices, ai_instances)
-    return game.players_total_points
-
-  def play_round(self, round_nbr: int, game: Game_State, limit_choices: bool, ai_instances: list[Wizard_Base_Ai]):
-    """
-    play the given round with `self.n_players` players.
-    """
-    # generate hands and determine trump
-    # print(f"Starting round {round_nbr}")
-    hands, trump_card = get_hands(game.n_players, round_nbr)
-    if trump_card is None:
-      trump_color = -1
-    elif trump_card.value != 14:
-      trump_color = trump_card.color
-    else:  # trump card is a wizard -> player who "gave cards" determines trump
-      trump_color = ai_instances[game.round_starting_player].get_trump_color_choice(
-          hands=hands,
-          active_player=game.round_starting_player,
-          game_state=game)  # game.round_starting_player(
-      # game.round_starting_player,
-      # hands[game.round_starting_player])
-    game.start_round(hands, trump_card, trump_color)
-    # handle player predictions
-    predictions = np.zeros(game.n_players, dtype=np.int8)
-    player_index = game.round_starting_player
-    for _ in range(self.n_players):
-      ai_bid = ai_instances[game.round_starting_player].get_prediction(
-          player_index=player_index,
-          game_state=game)
-      predictions[player_index] = ai_bid
-      player_index = (player_index + 1) % game.n_players
-    game.set_predictions(predictions)
-    # play tricks of the round
-    while game.tricks_to_be_played > 0:
-      self.play_trick(game, ai_instances)
-
-  def play_trick(self, game: Game_State, ai_instances: list[Wizard_Base_Ai]):
-    """
-    play one trick and advance the game object accordingly
-    """
-    game.start_trick()
-    for _ in range(game.n_players):
-      action = ai_instances[game.trick_active_player].get_trick_action(
-          game_state=game)
-      game.perform_action(action)
+    if self.record_dir is None:
+      record_writer: Game_Record_Writer = None
+    else:
+      record_writer: Game_Record_Writer = get_record_writer(self.record_dir)
+    engine = Game_Engine(
+        self.n_players,
+        max_rounds=self.n_rounds - 1,
+        players=ai_instances,
+        record_writer=record_writer,
+        seat_ids=seat_ids,
+        timer=timer,
+        deal_function=None if self.deal_bank is None else self.deal_bank.get_dealer(game_index),
+        starting_player=None if self.deal_bank is None else self.deal_bank.get_starting_player(game_index))
+    return engine.play_game()
 
 
   def get_player_labels(self):
@@ -203,7 +213,7 @@ class Genetic_Auto_Play():
       player_labels[i] = player_label
     return player_labels
 
-  def plot_results(self, tkinter_embedded: tk.Frame = None, highlight_final_value=True):
+  def plot_results(self, tkinter_embedded: "tk.Frame" = None, highlight_final_value=True):
     """
     plot average scores and win ratios currently saved
 
@@ -211,6 +221,7 @@ class Genetic_Auto_Play():
     -------
       tkinter_embedded (tkinter.Frame): a tkinter frame where the plot is to be shown. If none is given, the plot is shown in a seperate window created by matplotlib.
     """
+    import matplotlib.pyplot as plt
     player_labels = self.get_player_labels()
     colors = ["#22dd22", "#00aaaa", "#5588ff", "#bb00bb", "#dd2222", "#ff8800"]
     if tkinter_embedded is None:
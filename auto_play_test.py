@@ -9,13 +9,14 @@ import time
 # import tkinter as tk
 # from program_files.wizard_menu_gui import Wizard_Menu_Gui
 from program_files.auto_play_games import Wizard_Auto_Play
+from program_files.profiling import Phase_Timer
 from program_files.wizard_ais.simple_rule_ai import Simple_Rule_Ai
 from program_files.wizard_ais.smart_random_ai import Smart_Random_Ai
 from program_files.wizard_ais.uniform_random_ai import Uniform_Random_Ai
 from program_files.wizard_ais.genetic_rule_ai import Genetic_Rule_Ai
 from program_files.wizard_ais.genetic_nn_ai import Genetic_NN_Ai
 
-def main(n_games=300):
+def main(n_games=300, profile=False):
     # wizard_gui = Wizard_Menu_Gui()
     # tk.mainloop()
   auto_play_class = Wizard_Auto_Play(
@@ -60,7 +61,8 @@ def main(n_games=300):
       #  "bids_choice_var": Uniform_Random_Ai.name,
       #  "get_trick_action": Uniform_Random_Ai.name},
        ],
-    n_players=4)
+    n_players=4,
+    timer=Phase_Timer(record_latencies=True) if profile else None)
   start_time = time.perf_counter()
   # stats = auto_play_class.auto_play_single_threaded(
   #   n_games=n_games, reset_stats=True)
@@ -71,6 +73,8 @@ def main(n_games=300):
   print(f"playing {n_games} games multi-threaded took {end_time-start_time} s.")
   print("average scores:\n", stats[0][-5:-1])
   print("win ratios:\n", stats[1][-5:-1])
+  if profile:
+    print(auto_play_class.timer.report())
   auto_play_class.plot_results()
 
 if __name__ == "__main__":
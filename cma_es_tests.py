@@ -0,0 +1,50 @@
+"""
+test the CMA-ES optimizer in `cma_es.py` on simple test functions
+"""
+import numpy as np
+
+from program_files.cma_es import CMA_ES
+
+
+def _optimize(function, initial_mean: np.ndarray, n_generations: int, seed: int = 0) -> CMA_ES:
+  optimizer = CMA_ES(initial_mean, initial_step_size=0.5, rng=np.random.default_rng(seed))
+  for _ in range(n_generations):
+    candidates = optimizer.ask()
+    optimizer.tell([function(candidate) for candidate in candidates])
+  return optimizer
+
+
+def test_sphere():
+  optimizer = _optimize(lambda x: -np.sum((x - 3)**2), np.zeros(11), 300)
+  assert np.allclose(optimizer.mean, 3, atol=1e-6)
+
+
+def test_rotated_ellipsoid():
+  """
+  strongly correlated parameters can only be optimized efficiently if the covariance matrix is adapted
+  """
+  rng = np.random.default_rng(1)
+  rotation, _ = np.linalg.qr(rng.normal(size=(5, 5)))
+  scales = 10.**np.arange(5)
+  optimizer = _optimize(lambda x: -np.sum((scales * (rotation @ (x - 1)))**2), np.zeros(5), 400)
+  assert np.allclose(optimizer.mean, 1, atol=1e-4)
+
+
+def test_ask_tell_order():
+  optimizer = CMA_ES(np.zeros(3))
+  try:
+    optimizer.tell(np.zeros(optimizer.population_size))
+  except ValueError:
+    pass
+  else:
+    assert False, "`tell` without `ask` should raise a ValueError"
+  assert optimizer.ask().shape == (optimizer.population_size, 3)
+
+
+def all_tests():
+  test_sphere()
+  test_rotated_ellipsoid()
+  test_ask_tell_order()
+
+if __name__ == "__main__":
+  all_tests()
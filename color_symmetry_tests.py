@@ -0,0 +1,92 @@
+"""
+test the canonical form of decision points under color permutations in `color_symmetry.py`
+"""
+import itertools
+
+import numpy as np
+
+from program_files.wizard_card import Wizard_Card
+from program_files.game_state import Game_State
+from program_files.game_engine import Game_Engine, TRICK, BID
+from program_files.action_values import get_game_state_key, get_legal_actions
+from program_files.color_symmetry import get_color_permutation, get_canonical_game_state, permute_game_state, \
+    invert_permutation, permute_card
+from program_files.wizard_ais.simple_rule_ai import Simple_Rule_Ai
+
+
+def _get_decision_points(event: str, n_games: int = 3) -> list:
+  """
+  copies of the game state at each decision of type `event` in a few games
+  """
+  decision_points = []
+  for seed in range(n_games):
+    np.random.seed(seed)
+    engine = Game_Engine(4, max_rounds=6, players=[Simple_Rule_Ai() for _ in range(4)])
+    while engine.game_state.round_number <= 6:
+      if engine.next_event == event:
+        decision_points.append((permute_game_state(engine.game_state, (0, 1, 2, 3)), engine.active_player))
+      engine.step()
+  return decision_points
+
+
+def test_invariance():
+  """
+  all color permutations of a decision point have the same canonical form
+  """
+  for event in (TRICK, BID):
+    for game_state, player_index in _get_decision_points(event)[::7]:
+      keys = set()
+      for permutation in itertools.permutations(range(4)):
+        permuted_state = permute_game_state(game_state, permutation)
+        canonical_state, _ = get_canonical_game_state(permuted_state, player_index)
+        own_hand = tuple(card.raw_value for card in canonical_state.players_hands[player_index])
+        # during bidding, the hand of the active player of the trick in `get_game_state_key` is unknown to the bidder
+        canonical_state.players_hands = [hand if player == player_index else [] for player, hand in enumerate(canonical_state.players_hands)]
+        keys.add((get_game_state_key(canonical_state), own_hand, canonical_state.round_starting_player))
+      assert len(keys) == 1
+      if game_state.trump_color != -1:
+        assert get_canonical_game_state(game_state, player_index)[0].trump_color == 0
+
+
+def test_fewer_states():
+  """
+  the first bids of round 1 only depend on the own card, the trump card and the trump color up to color permutations
+  """
+  keys, canonical_keys = set(), set()
+  for own_value, trump_value in itertools.permutations(range(60), 2):
+    game_state = Game_State(4)
+    game_state.round_starting_player = 3 # incremented by `start_round`
+    trump_card = Wizard_Card(trump_value)
+    hands = [[Wizard_Card(own_value)], [], [], []]
+    game_state.start_round(hands, trump_card, trump_card.color if trump_card.value != 14 else 2)
+    keys.add(get_game_state_key(game_state))
+    canonical_keys.add(get_game_state_key(get_canonical_game_state(game_state, 0)[0]))
+  assert len(keys) > 5 * len(canonical_keys)
+
+
+def test_action_mapping():
+  for game_state, _ in _get_decision_points(TRICK)[::5]:
+    canonical_state, permutation = get_canonical_game_state(game_state)
+    inverse = invert_permutation(permutation)
+    # legal actions in the canonical state are the permuted legal actions
+    legal_actions = {card.raw_value for card in get_legal_actions(game_state)}
+    assert {permute_card(card, inverse).raw_value for card in get_legal_actions(canonical_state)} == legal_actions
+  assert permute_card(Wizard_Card(14), (2, 0, 1, 3)) == Wizard_Card(44)
+  assert permute_card(None, (2, 0, 1, 3)) is None
+
+
+def test_serving_color():
+  for game_state, _ in _get_decision_points(TRICK):
+    permutation = get_color_permutation(game_state)
+    if game_state.serving_color in (0, 1, 2, 3) and game_state.serving_color != game_state.trump_color:
+      assert permutation[game_state.serving_color] == (0 if game_state.trump_color == -1 else 1)
+
+
+def all_tests():
+  test_invariance()
+  test_fewer_states()
+  test_action_mapping()
+  test_serving_color()
+
+if __name__ == "__main__":
+  all_tests()
@@ -0,0 +1,124 @@
+"""
+test the pre-dealt games of `deal_bank.py`
+"""
+import os
+import pickle
+import tempfile
+
+import numpy as np
+
+from program_files.deal_bank import Deal_Bank, write_deal_bank, get_deal_size
+from program_files.game_engine import Game_Engine
+from program_files.wizard_ais.simple_rule_ai import Simple_Rule_Ai
+from auto_play_genetics import Genetic_Auto_Play
+from genetic_algorithm import evaluate_population
+
+
+def test_deals():
+  with tempfile.TemporaryDirectory() as bank_dir:
+    file_path = os.path.join(bank_dir, "deals.wdb")
+    write_deal_bank(file_path, n_players=4, n_games=25, seed=0)
+    assert os.path.getsize(file_path) == 8 + 25 * get_deal_size(4, 15)
+    bank = Deal_Bank(file_path)
+    assert (len(bank), bank.n_players, bank.n_rounds) == (25, 4, 15)
+    for game_index in (0, 24):
+      for round_nbr in range(1, 16):
+        hands, trump_card = bank.get_hands(game_index, round_nbr)
+        assert all(len(hand) == round_nbr and hand == sorted(hand) for hand in hands)
+        cards = [card.raw_value for hand in hands for card in hand]
+        if round_nbr == 15:
+          assert trump_card is None
+        else:
+          cards.append(trump_card.raw_value)
+        assert len(set(cards)) == len(cards)
+    # same seed -> same deals, also in larger banks
+    write_deal_bank(os.path.join(bank_dir, "larger.wdb"), n_players=4, n_games=5000, seed=0)
+    larger_bank = Deal_Bank(os.path.join(bank_dir, "larger.wdb"))
+    assert np.array_equal(larger_bank.deals[:25], bank.deals)
+    assert larger_bank.get_hands(4999, 3) != larger_bank.get_hands(4999 - 4096, 3)
+    # only the file path is pickled
+    assert len(pickle.dumps(bank)) < 200
+    assert np.array_equal(pickle.loads(pickle.dumps(bank)).deals, bank.deals)
+    del bank, larger_bank
+
+
+class Hand_Recording_Ai(Simple_Rule_Ai):
+  """
+  simple rule AI that records its hand and bidding position at each bid
+  """
+  def __init__(self):
+    super().__init__()
+    self.bids: list[tuple] = []
+
+  def get_prediction(self, player_index: int, game_state) -> int:
+    hand: tuple[int] = tuple(card.raw_value for card in game_state.players_hands[player_index])
+    self.bids.append((game_state.round_number, hand, game_state.n_predictions))
+    return super().get_prediction(player_index=player_index, game_state=game_state)
+
+
+def test_same_hands_in_each_evaluation():
+  """
+  a candidate gets the same hands and bidding positions in every evaluation on the same bank
+  """
+  with tempfile.TemporaryDirectory() as bank_dir:
+    file_path = os.path.join(bank_dir, "deals.wdb")
+    write_deal_bank(file_path, n_players=3, n_games=9, max_rounds=3, seed=2)
+    bank = Deal_Bank(file_path)
+    evaluations = []
+    for seed in range(2):
+      np.random.seed(seed)
+      players = [Hand_Recording_Ai() for _ in range(3)]
+      Genetic_Auto_Play(3, ai_instances=players, max_rounds=3, deal_bank=bank).auto_play_single_threaded(n_games=9)
+      evaluations.append([player.bids for player in players])
+    assert evaluations[0] == evaluations[1]
+    # each candidate bids in every position of round 1 equally often
+    for bids in evaluations[0]:
+      assert sorted(position for round_nbr, _, position in bids if round_nbr == 1) == [0, 0, 0, 1, 1, 1, 2, 2, 2]
+    del bank
+
+
+def test_evaluation_with_bank():
+  with tempfile.TemporaryDirectory() as bank_dir:
+    file_path = os.path.join(bank_dir, "deals.wdb")
+    write_deal_bank(file_path, n_players=3, n_games=5, max_rounds=4, seed=1)
+    bank = Deal_Bank(file_path)
+    engine = Game_Engine(3, max_rounds=4, players=[Simple_Rule_Ai()] * 3, deal_function=bank.get_dealer(2))
+    engine.step()
+    assert (engine.hands, engine.trump_card) == bank.get_hands(2, 1)
+    auto_game = Genetic_Auto_Play(3, ai_instances=[Simple_Rule_Ai() for _ in range(3)], max_rounds=4, deal_bank=bank)
+    auto_game.auto_play_single_threaded(n_games=8)
+    assert auto_game.scores.shape == (8, 3)
+    try:
+      Genetic_Auto_Play(4, ai_instances=[Simple_Rule_Ai() for _ in range(4)], max_rounds=4, deal_bank=bank)
+    except ValueError:
+      pass
+    else:
+      assert False, "a deal bank for 3 players should not be accepted for 4 players"
+    del bank, engine, auto_game
+
+
+def test_population_evaluation_with_bank():
+  """
+  every table of a training evaluation plays the games at the start of the bank
+  """
+  with tempfile.TemporaryDirectory() as bank_dir:
+    file_path = os.path.join(bank_dir, "deals.wdb")
+    write_deal_bank(file_path, n_players=3, n_games=2, seed=3)
+    bank = Deal_Bank(file_path)
+    bank_hands = {tuple(card.raw_value for card in hand) for game_index in range(2) for hand in bank.get_hands(game_index, 1)[0]}
+    np.random.seed(0)
+    population = [Hand_Recording_Ai() for _ in range(3)]
+    evaluate_population(population, n_games_per_generation=2, n_repetitions_per_game=2, deal_bank=bank)
+    first_round_hands = {hand for player in population for round_nbr, hand, _ in player.bids if round_nbr == 1}
+    assert first_round_hands == bank_hands
+    del bank
+
+
+def all_tests():
+  test_deals()
+  test_same_hands_in_each_evaluation()
+  test_evaluation_with_bank()
+  test_population_evaluation_with_bank()
+
+if __name__ == "__main__":
+  all_tests()
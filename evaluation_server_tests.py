@@ -0,0 +1,105 @@
+"""
+test the evaluation work-queue server in `evaluation_server.py` with workers on localhost
+"""
+import time
+import threading
+import multiprocessing as mp
+
+import numpy as np
+
+from program_files.evaluation_server import Evaluation_Coordinator, run_worker
+from program_files.wizard_ais.simple_rule_ai import Simple_Rule_Ai
+from program_files.wizard_ais.genetic_rule_ai import Genetic_Wizard_Player
+from auto_play_genetics import Genetic_Auto_Play
+
+AUTHKEY: bytes = b"evaluation server test"
+
+
+def _start_worker(coordinator: Evaluation_Coordinator) -> mp.Process:
+  worker = mp.Process(target=run_worker, args=(coordinator.address, AUTHKEY), daemon=True)
+  worker.start()
+  return worker
+
+
+def test_map():
+  with Evaluation_Coordinator(authkey=AUTHKEY, chunksize=3) as coordinator:
+    workers = [_start_worker(coordinator) for _ in range(2)]
+    assert coordinator.map(abs, range(-10, 0)) == list(range(10, 0, -1))
+    # play games like `evaluate_population` does
+    auto_game = Genetic_Auto_Play(3, ai_instances=[Simple_Rule_Ai(), Genetic_Wizard_Player(), Genetic_Wizard_Player()], max_rounds=3)
+    auto_game.auto_play_multi_threaded(n_games=6, process_pool=coordinator)
+    assert auto_game.scores.shape == (6, 3)
+    # each job has its own seed, so the games differ
+    assert len({tuple(scores) for scores in auto_game.scores}) > 1
+  for worker in workers:
+    worker.join(timeout=5)
+    assert not worker.is_alive()
+
+
+def test_worker_loss():
+  """
+  jobs of a worker that is killed while playing them are resent to another worker
+  """
+  with Evaluation_Coordinator(authkey=AUTHKEY) as coordinator:
+    lost_worker = _start_worker(coordinator)
+    results = []
+    map_thread = threading.Thread(target=lambda: results.extend(coordinator.map(time.sleep, [0.5] * 3)))
+    map_thread.start()
+    time.sleep(0.3)
+    lost_worker.kill()
+    _start_worker(coordinator)
+    map_thread.join(timeout=10)
+    assert results == [None] * 3
+
+
+def test_job_errors():
+  with Evaluation_Coordinator(authkey=AUTHKEY) as coordinator:
+    _start_worker(coordinator)
+    try:
+      coordinator.map(int, ["not a number"])
+    except RuntimeError as error:
+      assert "ValueError" in str(error)
+    else:
+      assert False, "errors on workers should be raised by `map`"
+    # the worker is still usable after an error
+    assert coordinator.map(int, ["1", "2"]) == [1, 2]
+
+
+def test_no_workers():
+  """
+  `map` fails instead of waiting forever if no worker serves its jobs
+  """
+  with Evaluation_Coordinator(authkey=AUTHKEY) as coordinator:
+    for kwargs in ({"timeout_s": 0.5}, {}):
+      if not kwargs:
+        coordinator.no_worker_timeout_s = 0.5
+      start_time = time.time()
+      try:
+        coordinator.map(abs, [-1], **kwargs)
+      except (TimeoutError, RuntimeError):
+        pass
+      else:
+        assert False, "`map` without workers should fail"
+      assert time.time() - start_time < 5
+    # failed jobs are not played once a worker connects
+    _start_worker(coordinator)
+    assert coordinator.map(abs, [-2], timeout_s=10) == [2]
+  # closing the coordinator fails running calls of `map`
+  coordinator = Evaluation_Coordinator(authkey=AUTHKEY)
+  threading.Timer(0.5, coordinator.close).start()
+  try:
+    coordinator.map(abs, [-1])
+  except RuntimeError as error:
+    assert "closed" in str(error)
+  else:
+    assert False, "`map` should fail when the coordinator is closed"
+
+
+def all_tests():
+  test_map()
+  test_worker_loss()
+  test_job_errors()
+  test_no_workers()
+
+if __name__ == "__main__":
+  all_tests()
@@ -0,0 +1,77 @@
+"""
+test the fitness estimators in `fitness_statistics.py`
+"""
+import multiprocessing as mp
+
+import numpy as np
+
+from program_files.fitness_statistics import get_critical_value, confidence_interval, trimmed_mean, \
+    bootstrap_lower_bound, estimate_fitness
+from program_files.wizard_ais.simple_rule_ai import Simple_Rule_Ai
+from auto_play_genetics import Genetic_Auto_Play
+
+
+def test_critical_values():
+  assert abs(get_critical_value(0.95) - 1.959964) < 1e-6
+  assert abs(get_critical_value(0.95, two_sided=False) - 1.644854) < 1e-6
+  assert abs(get_critical_value(0.99) - 2.575829) < 1e-6
+
+
+def test_confidence_interval():
+  scores = np.array([
+      [10., -20., 0.],
+      [30., -10., 0.],
+      [20., -30., 0.],
+      [40., -20., 0.]])
+  lower, upper = confidence_interval(scores, 0.95)
+  standard_errors = np.std(scores, axis=0, ddof=1) / 2
+  assert np.allclose(lower, np.mean(scores, axis=0) - 1.959964 * standard_errors)
+  assert np.allclose(upper, np.mean(scores, axis=0) + 1.959964 * standard_errors)
+  # a single game has no spread
+  assert np.all(estimate_fitness(scores[:1]) == scores[0])
+
+
+def test_trimmed_mean():
+  rng = np.random.default_rng(0)
+  scores = rng.normal(size=(50, 4))
+  expected = np.mean(np.sort(scores, axis=0)[5:45], axis=0)
+  assert np.allclose(trimmed_mean(scores, proportion=0.1), expected)
+  assert np.allclose(estimate_fitness(scores, "trimmed_mean"), expected)
+
+
+def test_bootstrap_lower_bound():
+  """
+  for many games, the bootstrap bound should be close to the normal approximation
+  """
+  rng = np.random.default_rng(1)
+  scores = rng.normal(loc=[0, 10, -5], scale=[5, 20, 1], size=(2000, 3))
+  bootstrap_bound = bootstrap_lower_bound(scores, 0.95, n_resamples=2000, rng=rng)
+  normal_bound, _ = confidence_interval(scores, 0.95)
+  standard_errors = np.std(scores, axis=0, ddof=1) / np.sqrt(len(scores))
+  assert np.all(np.abs(bootstrap_bound - normal_bound) < 0.2 * standard_errors)
+
+
+def test_single_and_multi_process_scores():
+  """
+  games played in a worker process record the scores in the same player order as games in the main process
+  """
+  auto_game = Genetic_Auto_Play(4, ai_instances=[Simple_Rule_Ai() for _ in range(4)], max_rounds=5)
+  np.random.seed(1)
+  auto_game.auto_play_single_threaded(n_games=10)
+  single_process_scores = auto_game.scores
+  # a single forked worker inherits the seed and plays the games in order
+  np.random.seed(1)
+  with mp.get_context("fork").Pool(1) as process_pool:
+    auto_game.auto_play_multi_threaded(n_games=10, process_pool=process_pool)
+  assert np.array_equal(auto_game.scores, single_process_scores)
+
+
+def all_tests():
+  test_critical_values()
+  test_confidence_interval()
+  test_trimmed_mean()
+  test_bootstrap_lower_bound()
+  test_single_and_multi_process_scores()
+
+if __name__ == "__main__":
+  all_tests()
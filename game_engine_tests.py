@@ -0,0 +1,123 @@
+"""
+test the game loop in `game_engine.py`
+"""
+import numpy as np
+
+from program_files.game_engine import Game_Engine, DEAL, BID, GAME_END
+from program_files.wizard_ais.simple_rule_ai import Simple_Rule_Ai
+from auto_play_genetics import Genetic_Auto_Play
+
+
+class Seat_Checking_Ai(Simple_Rule_Ai):
+  """
+  simple rule AI that checks that it only makes decisions for its own seat
+  """
+  def __init__(self, seat: int):
+    super().__init__()
+    self.seat: int = seat
+    self.n_bids: int = 0
+    self.n_actions: int = 0
+
+  def get_prediction(self, player_index: int, game_state) -> int:
+    assert player_index == self.seat
+    self.n_bids += 1
+    return super().get_prediction(player_index=player_index, game_state=game_state)
+
+  def get_trick_action(self, game_state):
+    assert game_state.trick_active_player == self.seat
+    self.n_actions += 1
+    return super().get_trick_action(game_state=game_state)
+
+
+class Bid_Checking_Ai(Simple_Rule_Ai):
+  """
+  simple rule AI that counts its bids and checks that it sees all earlier bids of the round
+  """
+  # bids of the current round in bidding order, shared by all instances
+  round_bids: list[int] = []
+
+  def __init__(self):
+    super().__init__()
+    self.n_bids: int = 0
+
+  def get_prediction(self, player_index: int, game_state) -> int:
+    n_earlier_bids: int = (player_index - game_state.round_starting_player) % game_state.n_players
+    assert game_state.n_predictions == n_earlier_bids
+    if n_earlier_bids == 0:
+      Bid_Checking_Ai.round_bids = []
+    assert np.sum(game_state.players_predictions) == sum(Bid_Checking_Ai.round_bids)
+    bid: int = super().get_prediction(player_index=player_index, game_state=game_state)
+    Bid_Checking_Ai.round_bids.append(bid)
+    self.n_bids += 1
+    return bid
+
+
+def test_play_game():
+  players = [Seat_Checking_Ai(seat) for seat in range(4)]
+  engine = Game_Engine(4, max_rounds=6, players=players)
+  total_points = engine.play_game()
+  assert engine.next_event == GAME_END
+  assert engine.game_state.round_number == 7
+  assert np.array_equal(total_points, np.sum(engine.game_state.players_gained_points_history, axis=0))
+  # every player bid once per round and played one card per trick
+  assert all(player.n_bids == 6 for player in players)
+  assert all(player.n_actions == 21 for player in players)
+  try:
+    engine.step()
+  except ValueError:
+    pass
+  else:
+    assert False, "`step` should raise a ValueError after the game ended"
+
+
+def test_step_events():
+  engine = Game_Engine(3, max_rounds=2, players=[Simple_Rule_Ai() for _ in range(3)])
+  assert engine.next_event == DEAL and engine.active_player is None
+  engine.step()
+  while engine.next_event != BID:
+    engine.step()
+  first_bidder = engine.active_player
+  assert first_bidder == engine.game_state.round_starting_player
+  results = []
+  while engine.next_event != DEAL:
+    results.append(engine.step())
+  # 3 bids and one trick of 3 cards in round 1
+  assert results == [0, 0, 0, 0, 0, 2]
+  assert engine.game_state.round_number == 2
+
+
+def test_external_decisions():
+  """
+  decisions passed to `step` lead to the same game as decisions requested by the engine
+  """
+  ai = Simple_Rule_Ai()
+  np.random.seed(0)
+  synchronous_points = Game_Engine(4, max_rounds=8, players=[ai] * 4).play_game().copy()
+  np.random.seed(0)
+  engine = Game_Engine(4, max_rounds=8)
+  methods = {"trump": ai.get_trump_color_choice, "bid": ai.get_prediction, "trick": ai.get_trick_action}
+  while engine.next_event != GAME_END:
+    if engine.next_event == DEAL:
+      engine.step()
+    else:
+      engine.step(methods[engine.next_event](**engine.get_decision_kwargs()))
+  assert np.array_equal(engine.game_state.players_total_points, synchronous_points)
+
+
+def test_genetic_auto_play_bids():
+  """
+  every player bids for their own seat (not the round starting player for everyone) and sees earlier bids
+  """
+  players = [Bid_Checking_Ai() for _ in range(3)]
+  Genetic_Auto_Play(3, ai_instances=players, max_rounds=5).auto_play_single_threaded(n_games=4)
+  assert all(player.n_bids == 4 * 5 for player in players)
+
+
+def all_tests():
+  test_play_game()
+  test_step_events()
+  test_external_decisions()
+  test_genetic_auto_play_bids()
+
+if __name__ == "__main__":
+  all_tests()
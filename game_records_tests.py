@@ -0,0 +1,109 @@
+"""
+test recording games in the binary game record format
+"""
+import os
+import tempfile
+
+import numpy as np
+
+from auto_play_genetics import Genetic_Auto_Play
+from program_files.game_records import RECORD_FILE_HEADER, Game_Record_Reader, get_record_writer
+from program_files.wizard_ais.genetic_rule_ai import Genetic_Wizard_Player
+
+
+def _record_games(record_dir: str, n_players: int = 3, max_rounds: int = 5, n_games: int = 4) -> str:
+  """
+  play `n_games` with genetic rule AIs and record them in `record_dir`
+
+  returns:
+  --------
+      str: path of the record file
+  """
+  auto_game = Genetic_Auto_Play(
+      n_players=n_players,
+      ai_instances=[Genetic_Wizard_Player() for _ in range(n_players)],
+      max_rounds=max_rounds,
+      record_dir=record_dir)
+  auto_game.auto_play_single_threaded(n_games)
+  return get_record_writer(record_dir).file_path
+
+
+def test_record_layout():
+  """
+  test that every game record has the documented size and that each round contains every dealt card exactly once
+  """
+  n_players, max_rounds, n_games = 4, 6, 5
+  with tempfile.TemporaryDirectory() as record_dir:
+    file_path = _record_games(record_dir, n_players, max_rounds, n_games)
+    with open(file_path, "rb") as file:
+      data: bytes = file.read()
+  assert data[:len(RECORD_FILE_HEADER)] == RECORD_FILE_HEADER
+  offset: int = len(RECORD_FILE_HEADER)
+  n_recorded_games: int = 0
+  while offset < len(data):
+    record_length = int.from_bytes(data[offset:offset + 2], "little")
+    assert data[offset + 2] == n_players
+    assert data[offset + 3] == max_rounds
+    assert sorted(data[offset + 5:offset + 5 + n_players]) == list(range(n_players))
+    expected_length = 5 + n_players + sum(2 + n_players + n_players * r for r in range(1, max_rounds + 1))
+    assert record_length == expected_length
+    # check played cards of each round
+    round_offset = offset + 5 + n_players
+    for round_nbr in range(1, max_rounds + 1):
+      trump_card = data[round_offset]
+      played_cards = data[round_offset + 2 + n_players:round_offset + 2 + n_players + n_players * round_nbr]
+      assert len(set(played_cards)) == n_players * round_nbr
+      assert trump_card not in played_cards
+      round_offset += 2 + n_players + n_players * round_nbr
+    offset += record_length
+    n_recorded_games += 1
+  assert offset == len(data)
+  assert n_recorded_games == n_games
+
+
+def test_replay_scores():
+  """
+  test that replaying recorded games through `Game_State` reproduces the final scores of the played games
+  """
+  n_players, max_rounds, n_games = 3, 8, 6
+  with tempfile.TemporaryDirectory() as record_dir:
+    auto_game = Genetic_Auto_Play(
+        n_players=n_players,
+        ai_instances=[Genetic_Wizard_Player() for _ in range(n_players)],
+        max_rounds=max_rounds,
+        record_dir=record_dir)
+    # play games one by one to keep the final scores of each game
+    final_scores: list[np.ndarray] = []
+    for _ in range(n_games):
+      game_scores = auto_game.play_game(auto_game.ai_instances, [0, 1, 2])
+      final_scores.append(game_scores.copy())
+    writer = get_record_writer(record_dir)
+    writer.flush()
+    reader = Game_Record_Reader(writer.file_path)
+    assert len(reader) == n_games
+    assert len(reader.rounds) == n_games * max_rounds
+    assert np.all(reader.rounds["round_number"][:max_rounds] == np.arange(1, max_rounds + 1))
+    for game_index in range(n_games):
+      game_state = None
+      n_trick_steps = 0
+      for step in reader.replay_game(game_index):
+        game_state = step.game_state
+        if step.kind == "trick":
+          n_trick_steps += 1
+          # the recorded action must be in the reconstructed hand of the active player
+          assert step.action in game_state.players_hands[step.player_index]
+      assert n_trick_steps == n_players * max_rounds * (max_rounds + 1) // 2
+      assert np.all(game_state.players_total_points == final_scores[game_index])
+    # access a single decision point and reuse the cached index
+    step = reader.get_game_state(n_games - 1, round_number=3, kind="trick", n_decision=4)
+    assert step.game_state.round_number == 3
+    assert os.path.exists(reader.index_path)
+    assert len(Game_Record_Reader(writer.file_path)) == n_games
+
+
+def all_tests():
+  test_record_layout()
+  test_replay_scores()
+
+if __name__ == "__main__":
+  all_tests()
@@ -1,22 +1,24 @@
 import os
+import sys
 import time
 import json
+import copy
 import pickle
 import multiprocessing as mp
 from typing import Any
-from tkinter import Tk, filedialog
 # from itertools import repeat
 
 import numpy as np
-import matplotlib.pyplot as plt
-import torch
-from memory_profiler import profile
 
+from program_files.wizard_ais.ai_base_class import Wizard_Base_Ai
 from program_files.wizard_ais.genetic_rule_ai import Genetic_Wizard_Player
 from auto_play_genetics import Genetic_Auto_Play
+from program_files.profiling import Phase_Timer
+from program_files.rating_ledger import Rating_Ledger, get_player_key
+from program_files.cma_es import CMA_ES
+from program_files.deal_bank import Deal_Bank
 
 
-# @profile
 def train_genetic_ai(
     population: list[Genetic_Wizard_Player],
     n_generations: int = 100,
@@ -27,6 +29,14 @@ def train_genetic_ai(
     mutation_rate: float = 0.1,
     mutation_range: float = 0.1,
     track_n_best_players: int = 5,
+    profile: bool = False,
+    score_estimator: str = "lower_confidence_bound",
+    rating_ledger_path: str = None,
+    reference_players: list[Wizard_Base_Ai] = None,
+    n_reference_seats: int = 1,
+    hall_of_fame_size: int = 0,
+    process_pool: mp.Pool = None,
+    deal_bank: Deal_Bank = None,
     ):
   """
   Find good parameters for the genetic rule AI by using a genetic algorithm utilizing the methods `crossover` and `mutate` of the `Genetic_Wizard_Player` class.
@@ -39,38 +49,68 @@ def train_genetic_ai(
       n_repetitions_per_game (int): number of repetitions of each game (keep players the same, shuffle their order)
       crossover_range (float): how far outside the distance between the two parents' values the child's value can be
       track_n_best_players (int): number of best players to track for each generation
+      profile (bool): whether to record the time spent in each phase of the games and the latency of AI decisions and print a report after training
+      score_estimator (str): how to calculate a player's score from repeated games (see `fitness_statistics.SCORE_ESTIMATORS`)
+      rating_ledger_path (str): SQLite file of a `Rating_Ledger` to record the ratings of all evaluated players in. `None` disables ratings.
+      reference_players (list[Wizard_Base_Ai]): fixed opponents seated at every table during evaluation (e.g. `Simple_Rule_Ai()`, `Genetic_Rule_Ai().player`).
+          They give a stable fitness baseline across generations. `None` only plays population members against each other.
+      n_reference_seats (int): number of seats at each table taken by reference players or the hall of fame
+      hall_of_fame_size (int): number of best players of the most recent generations that are added to the reference players
+      process_pool (mp.Pool): pool to play games with, e.g. an `Evaluation_Coordinator` to use the workers of several machines.
+          If `None`, a process pool with one process per CPU is created for the training.
+      deal_bank (Deal_Bank): pre-dealt games of 3 players to evaluate the population with (see `evaluate_population`).
+          `None` shuffles the cards of every game.
 
   returns:
   --------
       dict[str, float]: dictionary containing the best parameters found
       list[list[tuple[float, Genetic_Wizard_Player]]]: list of the best players of each generation and their average score
   """
-  if n_games_per_generation < len(population) / 3:
-    raise ValueError("n_games_per_generation must be at least the population size divided by 3.")
+  n_population_seats: int = 3 if reference_players is None and hall_of_fame_size == 0 else 3 - n_reference_seats
+  if n_population_seats < 1:
+    raise ValueError("At least one seat per table must be taken by a population member.")
+  if n_games_per_generation < len(population) / n_population_seats:
+    raise ValueError(f"n_games_per_generation must be at least the population size divided by {n_population_seats}.")
+  reference_players = list(reference_players) if reference_players is not None else []
+  hall_of_fame: list[Wizard_Base_Ai] = []
   best_player_evolution: list[list[tuple[float, Genetic_Wizard_Player]]] = [0] * n_generations
   start_time: float = time.time()
   # Initialize lists to store diversity measures
   pairwise_distances: list[float] = [0] * n_generations
   fitness_variances: list[float] = [0] * n_generations
+  timer: Phase_Timer = Phase_Timer(record_latencies=True) if profile else None
+  rating_ledger: Rating_Ledger = None if rating_ledger_path is None else Rating_Ledger(rating_ledger_path)
   
   # create process pool for multiprocessing
-  print(f"Started training using {mp.cpu_count()} processes.")
-  process_pool: mp.Pool = mp.Pool(mp.cpu_count())
+  close_process_pool: bool = process_pool is None
+  if process_pool is None:
+    print(f"Started training using {mp.cpu_count()} processes.")
+    process_pool: mp.Pool = mp.Pool(mp.cpu_count())
   # train population
   for generation in range(n_generations):
     population_scores: list[float] = evaluate_population(
         population,
         n_games_per_generation,
         n_repetitions_per_game,
-        process_pool)
+        process_pool,
+        timer=timer,
+        score_estimator=score_estimator,
+        rating_ledger=rating_ledger,
+        reference_players=reference_players + hall_of_fame or None,
+        n_reference_seats=n_reference_seats,
+        deal_bank=deal_bank)
     population, best_players = evolve_population(
         population,
         population_scores,
-        crossover_range,
-        mutation_rate,
-        mutation_range,
-        track_n_best_players)
+        crossover_range=crossover_range,
+        mutation_rate=mutation_rate,
+        mutation_range=mutation_range,
+        track_n_best_players=track_n_best_players)
     best_player_evolution[generation] = best_players
+    if hall_of_fame_size > 0:
+      # copy the best player since survivors may still change in later generations
+      hall_of_fame.append(copy.deepcopy(best_players[0][1]))
+      hall_of_fame = hall_of_fame[-hall_of_fame_size:]
     # Calculate diversity measures for the current generation
     pairwise_distances[generation] = pairwise_distance(population)
     fitness_variances[generation] = fitness_variance(population_scores)
@@ -85,14 +125,25 @@ def train_genetic_ai(
       pairwise_distances = pairwise_distances[:generation + 1]
       fitness_variances = fitness_variances[:generation + 1]
       break
-  # close process pool
-  process_pool.close()
-  process_pool.join()
   # return best parameters
   print("\nTraining complete.  Evaluating best player...", end="")
-  population_scores: list[float] = evaluate_population(population, n_games_per_generation, n_repetitions_per_game)
+  population_scores: list[float] = evaluate_population(
+      population, n_games_per_generation, n_repetitions_per_game, process_pool,
+      score_estimator=score_estimator,
+      rating_ledger=rating_ledger,
+      reference_players=reference_players + hall_of_fame or None,
+      n_reference_seats=n_reference_seats,
+      deal_bank=deal_bank)
+  # close process pool
+  if close_process_pool:
+    process_pool.close()
+    process_pool.join()
+  if rating_ledger is not None:
+    rating_ledger.close()
   best_player: Genetic_Wizard_Player = population[np.argmax(population_scores)]
   print("\b\b\b done.")
+  if timer is not None:
+    print(timer.report())
   # save last generation
   training_name: str = time.strftime("%Y-%m-%d_%H-%M-%S") + f"_{population[0].__class__.__name__}"
   save_dir: str = os.path.join("genetic_ai_training_history_3", training_name)
@@ -110,12 +161,126 @@ def train_genetic_ai(
         )
   return best_player.get_parameters(), best_player_evolution, pairwise_distances, fitness_variances
 
+def train_cma_es(
+    initial_player: Genetic_Wizard_Player = None,
+    n_generations: int = 100,
+    max_time_s: float = 60 * 60, # 1 hour
+    population_size: int = None,
+    initial_step_size: float = 0.3,
+    n_games_per_generation: int = None,
+    n_repetitions_per_game: int = 30,
+    track_n_best_players: int = 5,
+    score_estimator: str = "lower_confidence_bound",
+    reference_players: list[Wizard_Base_Ai] = None,
+    n_reference_seats: int = 1,
+    process_pool: mp.Pool = None,
+    deal_bank: Deal_Bank = None,
+    seed: int = None,
+    ):
+  """
+  Find good parameters for the genetic rule AI with the covariance matrix adaptation evolution strategy (CMA-ES).
+  Candidates are evaluated with `evaluate_population` like in `train_genetic_ai`, but new candidates are sampled from a
+  multivariate normal distribution that learns the correlations between parameters, so fewer games are needed to find good parameters.
+  Each parameter is scaled by its initial absolute value (at least 1), so `initial_step_size` is a relative change.
+
+  inputs:
+  -------
+      initial_player (Genetic_Wizard_Player): player whose parameters are the initial mean. Defaults to the default parameters.
+      n_generations (int): number of generations to train for
+      max_time_s (float): maximum training time
+      population_size (int): number of candidates per generation. Defaults to `4 + 3 * ln(n_parameters)`.
+      initial_step_size (float): initial standard deviation of the (scaled) parameters
+      n_games_per_generation (int): number of games played per generation. Defaults to the minimum for every candidate to play once.
+      n_repetitions_per_game (int): number of repetitions of each game (keep players the same, shuffle their order)
+      track_n_best_players (int): number of best candidates to track for each generation
+      score_estimator (str): how to calculate a player's score from repeated games (see `fitness_statistics.SCORE_ESTIMATORS`)
+      reference_players (list[Wizard_Base_Ai]): fixed opponents seated at every table (see `evaluate_population`)
+      n_reference_seats (int): number of seats at each table taken by reference players
+      process_pool (mp.Pool): pool to play games with. If `None`, a process pool with one process per CPU is created for the training.
+      deal_bank (Deal_Bank): pre-dealt games of 3 players to evaluate the candidates with (see `evaluate_population`)
+      seed (int): seed for sampling candidates. A random seed is used if `None`.
+
+  returns:
+  --------
+      dict[str, float]: mean of the final search distribution (the estimate of the best parameters)
+      list[list[tuple[float, Genetic_Wizard_Player]]]: list of the best candidates of each generation and their score
+      list[float]: pairwise distance of the candidates in each generation
+      list[float]: fitness variance in each generation
+  """
+  if initial_player is None:
+    initial_player = Genetic_Wizard_Player()
+  parameter_names: list[str] = list(initial_player.get_parameters().keys())
+  initial_parameters: np.ndarray = np.array([initial_player.get_parameters()[name] for name in parameter_names], dtype=float)
+  parameter_scales: np.ndarray = np.maximum(np.abs(initial_parameters), 1)
+  optimizer: CMA_ES = CMA_ES(
+      initial_parameters / parameter_scales,
+      initial_step_size=initial_step_size,
+      population_size=population_size,
+      rng=np.random.default_rng(seed))
+  n_population_seats: int = 3 if reference_players is None else 3 - n_reference_seats
+  if n_games_per_generation is None:
+    n_games_per_generation = int(np.ceil(optimizer.population_size / n_population_seats))
+  def get_player(scaled_parameters: np.ndarray) -> Genetic_Wizard_Player:
+    return Genetic_Wizard_Player(**dict(zip(parameter_names, (scaled_parameters * parameter_scales).tolist())))
+
+  best_player_evolution: list[list[tuple[float, Genetic_Wizard_Player]]] = []
+  pairwise_distances: list[float] = []
+  fitness_variances: list[float] = []
+  close_process_pool: bool = process_pool is None
+  if process_pool is None:
+    print(f"Started training using {mp.cpu_count()} processes.")
+    process_pool: mp.Pool = mp.Pool(mp.cpu_count())
+  start_time: float = time.time()
+  for generation in range(n_generations):
+    candidates: list[Genetic_Wizard_Player] = [get_player(parameters) for parameters in optimizer.ask()]
+    candidate_scores: list[float] = evaluate_population(
+        candidates,
+        n_games_per_generation,
+        n_repetitions_per_game,
+        process_pool,
+        score_estimator=score_estimator,
+        reference_players=reference_players,
+        n_reference_seats=n_reference_seats,
+        deal_bank=deal_bank)
+    optimizer.tell(candidate_scores)
+    sorted_candidates: list[tuple[float, Genetic_Wizard_Player]] = \
+        sorted(zip(candidate_scores, candidates), reverse=True, key=lambda x: x[0])
+    best_player_evolution.append(sorted_candidates[:track_n_best_players])
+    pairwise_distances.append(pairwise_distance(candidates))
+    fitness_variances.append(fitness_variance(candidate_scores))
+    # show progress bar for training
+    current_time = time.time() - start_time
+    print(f"\rTraining AI: {generation + 1}/{n_generations} generations in {current_time: 6.0f} s.", end="")
+    print(f" Best score: {max(candidate_scores):.2f}, step size: {optimizer.step_size:.3f}", end="")
+    if current_time > max_time_s:
+      print(f"\nStopping training after {generation + 1} generations.  Maximum time of {max_time_s} s exceeded.")
+      break
+  if close_process_pool:
+    process_pool.close()
+    process_pool.join()
+  print("\nTraining complete.")
+  mean_player: Genetic_Wizard_Player = get_player(optimizer.mean)
+  # save final mean
+  training_name: str = time.strftime("%Y-%m-%d_%H-%M-%S") + "_CMA_ES"
+  save_dir: str = os.path.join("genetic_ai_training_history_3", training_name)
+  os.makedirs(save_dir, exist_ok=True)
+  mean_player.save(save_dir, id=0)
+  with open(os.path.join(save_dir, "best_player_evolution.pickle"), "wb") as file:
+    pickle.dump(best_player_evolution, file)
+  return mean_player.get_parameters(), best_player_evolution, pairwise_distances, fitness_variances
+
 def evaluate_population(
       population: list[Genetic_Wizard_Player],
       n_games_per_generation: int,
       n_repetitions_per_game: int,
       process_pool: mp.Pool = None,
       min_reps_for_multiprocessing: int = 5,
+      timer: Phase_Timer = None,
+      score_estimator: str = "lower_confidence_bound",
+      rating_ledger: Rating_Ledger = None,
+      reference_players: list[Wizard_Base_Ai] = None,
+      n_reference_seats: int = 1,
+      deal_bank: Deal_Bank = None,
       ) -> list[list[float]]:
   """
   Evaluate the population by playing a number of games with each player and calculating their score.
@@ -126,6 +291,14 @@ def evaluate_population(
   -------
       population (list[Genetic_Wizard_Player]): list of players
       n_games_per_generation (int): number of games played per generation
+      timer (Phase_Timer): timer to record the time spent in each phase of the games. `None` disables profiling.
+      score_estimator (str): how to calculate a player's score from repeated games (see `fitness_statistics.SCORE_ESTIMATORS`)
+      rating_ledger (Rating_Ledger): ledger to update with the scores of all games. `None` disables ratings.
+      reference_players (list[Wizard_Base_Ai]): fixed opponents. `n_reference_seats` seats of each table are taken by randomly chosen reference players.
+          Only the scores of population members are returned. `None` only plays population members against each other.
+      n_reference_seats (int): number of seats taken by reference players at each table
+      deal_bank (Deal_Bank): pre-dealt games of 3 players. Repetition `n` of every table plays game `n` of the bank,
+          so all players are compared on the same deals and no cards are shuffled during the evaluation. `None` shuffles the cards of every game.
 
   returns:
   --------
@@ -133,26 +306,37 @@ def evaluate_population(
   """
   individual_scores: list[list[float]] = [[] for _ in range(len(population))]
   individual_indices: list[int] = list(range(len(population)))
+  if rating_ledger is not None:
+    player_keys: list[str] = [get_player_key(player) for player in population]
+    reference_keys: list[str] = [get_player_key(player) for player in reference_players or []]
 
   if process_pool is None and n_repetitions_per_game > min_reps_for_multiprocessing:
     process_pool: mp.Pool = mp.Pool(mp.cpu_count())
   # for n_players in range(3, 7):
   n_players = 3
+  n_population_seats: int = n_players if reference_players is None else n_players - n_reference_seats
   player_indices_list = list(individual_indices)
   np.random.shuffle(player_indices_list)
   for _ in range(n_games_per_generation):
-    if len(player_indices_list) < n_players:
+    if len(player_indices_list) < n_population_seats:
       additional_indices = list(individual_indices)
       np.random.shuffle(additional_indices)
       player_indices_list.extend(additional_indices)
 
-    player_indices = [player_indices_list.pop(0) for _ in range(n_players)]
+    player_indices = [player_indices_list.pop(0) for _ in range(n_population_seats)]
     players = [population[i] for i in player_indices]
+    if reference_players is not None:
+      reference_indices: np.ndarray = np.random.choice(
+          len(reference_players), n_reference_seats, replace=len(reference_players) < n_reference_seats)
+      players += [reference_players[i] for i in reference_indices]
     auto_game = Genetic_Auto_Play(
         n_players=n_players,
         limit_choices=False,
         max_rounds=20,
         ai_instances=players,
+        timer=timer,
+        score_estimator=score_estimator,
+        deal_bank=deal_bank,
     )
     if n_repetitions_per_game > min_reps_for_multiprocessing:
       scores = auto_game.auto_play_multi_threaded(
@@ -164,6 +348,11 @@ def evaluate_population(
           n_games = n_repetitions_per_game)
     for i, player_index in enumerate(player_indices):
       individual_scores[player_index].append(scores[i])
+    if rating_ledger is not None:
+      table_keys: list[str] = [player_keys[i] for i in player_indices]
+      if reference_players is not None:
+        table_keys += [reference_keys[i] for i in reference_indices]
+      rating_ledger.add_games(table_keys, auto_game.scores)
   # if n_repetitions_per_game > min_reps_for_multiprocessing:
   #   process_pool.close()
   #   process_pool.join()
@@ -298,17 +487,20 @@ def flatten_parameters(param_dict: dict[str, Any]) -> np.ndarray:
   Returns:
       np.ndarray: 1D array of parameters
   """
+  # parameters can only contain tensors if torch was imported, so avoid importing it for rule based players
+  torch = sys.modules.get("torch")
+  tensor_type: tuple[type] = () if torch is None else torch.Tensor
   flat_list = []
   for key, value in param_dict.items():
-    if isinstance(value, float):
+    if isinstance(value, (int, float)):
       flat_list.append(value)
     elif isinstance(value, list):
       for item in value:
-        if isinstance(item, torch.Tensor):
+        if isinstance(item, tensor_type):
           flat_list.extend(item.flatten().tolist())
         else:
           flat_list.append(item)
-    elif isinstance(value, torch.Tensor):
+    elif isinstance(value, tensor_type):
       flat_list.extend(value.flatten().tolist())
   return np.array(flat_list)
 
@@ -322,6 +514,7 @@ def load_diversity_values(file_path: str = None) -> tuple[list[float], list[floa
       list[float]: list of average fitness variances of players
   """
   if file_path is None:
+    from tkinter import filedialog
     file_path = filedialog.askopenfilename(
         initialdir=".",
         title="Select a diversity history file",
@@ -343,6 +536,7 @@ def load_best_player_evolution(file_path: str = None) -> list[dict[str, Any]]:
       bet_player_evolution
   """
   if file_path is None:
+    from tkinter import filedialog
     file_path = filedialog.askopenfilename(
         initialdir=".",
         title="Select a best player evolution file",
@@ -365,6 +559,7 @@ def plot_diversity_measures(
       pairwise_distances (list[float]): list of pairwise distances
       fitness_variances (list[float]): list of fitness variances
   """
+  import matplotlib.pyplot as plt
   fig, ax = plt.subplots(2, 1, figsize=(15, 5), sharex=True)
   ax[0].plot(np.arange(len(pairwise_distances)), pairwise_distances, color="#ff8800")
   ax[0].set_title("Pairwise Distance between Players")
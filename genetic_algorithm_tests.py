@@ -0,0 +1,83 @@
+"""
+test the evaluation with reference players and the hall of fame in `genetic_algorithm.py`
+"""
+import os
+import tempfile
+import multiprocessing as mp
+
+import numpy as np
+
+from program_files.wizard_ais.genetic_rule_ai import Genetic_Wizard_Player
+from program_files.wizard_ais.simple_rule_ai import Simple_Rule_Ai
+from genetic_algorithm import evaluate_population, train_genetic_ai, flatten_parameters, pairwise_distance
+
+
+class Counting_Rule_Ai(Simple_Rule_Ai):
+  """
+  simple rule AI that counts the rounds it bids in
+  """
+  def __init__(self):
+    super().__init__()
+    self.n_bids: int = 0
+
+  def get_prediction(self, player_index: int, game_state) -> int:
+    self.n_bids += 1
+    return super().get_prediction(player_index=player_index, game_state=game_state)
+
+
+class Tracked_Player(Genetic_Wizard_Player):
+  """
+  genetic rule player that records the ids of all instances that bid, including copies in the hall of fame
+  """
+  bidding_players: set[int] = set()
+
+  def get_prediction(self, player_index: int, game_state) -> int:
+    Tracked_Player.bidding_players.add(id(self))
+    return super().get_prediction(player_index=player_index, game_state=game_state)
+
+
+def test_reference_seats():
+  np.random.seed(0)
+  population = [Genetic_Wizard_Player() for _ in range(4)]
+  references = [Counting_Rule_Ai(), Counting_Rule_Ai()]
+  population_scores = evaluate_population(population, 4, 2, reference_players=references, n_reference_seats=1)
+  assert len(population_scores) == len(population)
+  # one reference seat in each of 4 * 2 games of 20 rounds
+  assert sum(reference.n_bids for reference in references) == 4 * 2 * 20
+
+
+def test_hall_of_fame():
+  """
+  copies of the best players of earlier generations take the reference seats
+  """
+  working_dir: str = os.getcwd()
+  np.random.seed(1)
+  population = [Tracked_Player() for _ in range(6)]
+  original_ids: set[int] = {id(player) for player in population}
+  with tempfile.TemporaryDirectory() as temp_dir, mp.Pool(1) as process_pool:
+    os.chdir(temp_dir) # the last generation is saved in the working directory
+    try:
+      train_genetic_ai(population, n_generations=3, n_games_per_generation=3, n_repetitions_per_game=1,
+          n_reference_seats=1, hall_of_fame_size=2, process_pool=process_pool)
+    finally:
+      os.chdir(working_dir)
+  # children of the first generation are plain `Genetic_Wizard_Player`s, so later bids of tracked players come from the hall of fame
+  hall_of_fame_ids: set[int] = Tracked_Player.bidding_players - original_ids
+  assert 1 <= len(hall_of_fame_ids) <= 3
+
+
+def test_flatten_parameters():
+  flat_parameters = flatten_parameters({"a": 1, "b": 2.5, "c": [3, 4.], "d": "name"})
+  assert flat_parameters.tolist() == [1, 2.5, 3, 4]
+  # integer parameters (e.g. from `init_population`) are compared with mutated float parameters
+  players = [Genetic_Wizard_Player(wizard_value=20), Genetic_Wizard_Player(wizard_value=20.5)]
+  assert np.isfinite(pairwise_distance(players))
+
+
+def all_tests():
+  test_reference_seats()
+  test_hall_of_fame()
+  test_flatten_parameters()
+
+if __name__ == "__main__":
+  all_tests()
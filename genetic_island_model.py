@@ -0,0 +1,238 @@
+"""
+This module implements an island model for the genetic algorithm in `genetic_algorithm.py`.
+The population is split into several islands that evolve independently in separate processes, each with its own pool of evaluation workers.
+Every `migration_interval` generations, each island sends copies of its best players to the next island (ring topology)
+through a `multiprocessing.Queue`. Immigrants replace random members of the new generation.
+
+Compared to `train_genetic_ai`, selection, crossover and pickling of players are distributed over the island processes,
+and the islands keep a higher diversity since they only exchange a few players.
+"""
+import os
+import time
+import queue
+import multiprocessing as mp
+
+import numpy as np
+
+from program_files.wizard_ais.ai_base_class import Wizard_Base_Ai
+from program_files.wizard_ais.genetic_rule_ai import Genetic_Wizard_Player
+from program_files.deal_bank import Deal_Bank
+from genetic_algorithm import evaluate_population, evolve_population, pairwise_distance, fitness_variance
+
+# time between checks whether all islands are still running while waiting for their messages
+ISLAND_POLL_INTERVAL_S: float = 1.
+
+
+def _run_island(
+    island_index: int,
+    population: list[Genetic_Wizard_Player],
+    settings: dict,
+    inbox: mp.Queue,
+    outbox: mp.Queue,
+    result_queue: mp.Queue) -> None:
+  """
+  evolve one island. Progress and results are sent to the main process through `result_queue`.
+
+  inputs:
+  -------
+      island_index (int): index of the island
+      population (list[Genetic_Wizard_Player]): initial population of the island
+      settings (dict): training settings (see `train_island_model`)
+      inbox (mp.Queue): queue to receive migrants from the previous island
+      outbox (mp.Queue): queue to send migrants to the next island
+      result_queue (mp.Queue): queue to send progress messages and results to the main process
+  """
+  # forked processes share the random state of the main process
+  np.random.seed(settings["seed"] + island_index)
+  process_pool: mp.Pool = mp.Pool(settings["n_processes_per_island"])
+  n_generations: int = settings["n_generations"]
+  best_player_evolution: list[list[tuple[float, Genetic_Wizard_Player]]] = []
+  pairwise_distances: list[float] = []
+  fitness_variances: list[float] = []
+  for generation in range(n_generations):
+    population_scores: list[float] = evaluate_population(
+        population,
+        settings["n_games_per_generation"],
+        settings["n_repetitions_per_game"],
+        process_pool,
+        score_estimator=settings["score_estimator"],
+        reference_players=settings["reference_players"],
+        n_reference_seats=settings["n_reference_seats"],
+        deal_bank=settings["deal_bank"])
+    population, best_players = evolve_population(
+        population,
+        population_scores,
+        crossover_range=settings["crossover_range"],
+        mutation_rate=settings["mutation_rate"],
+        mutation_range=settings["mutation_range"],
+        track_n_best_players=max(settings["track_n_best_players"], settings["n_migrants"]))
+    best_player_evolution.append(best_players[:settings["track_n_best_players"]])
+    pairwise_distances.append(pairwise_distance(population))
+    fitness_variances.append(fitness_variance(population_scores))
+    # exchange migrants with the neighboring islands
+    if (generation + 1) % settings["migration_interval"] == 0 and generation + 1 < n_generations:
+      outbox.put([player for _, player in best_players[:settings["n_migrants"]]])
+      try:
+        immigrants: list[Genetic_Wizard_Player] = inbox.get(timeout=settings["migration_timeout_s"])
+      except queue.Empty: # previous island stopped or is too slow
+        immigrants: list[Genetic_Wizard_Player] = []
+      replaced_indices: np.ndarray = np.random.choice(len(population), size=len(immigrants), replace=False)
+      for index, immigrant in zip(replaced_indices, immigrants):
+        population[index] = immigrant
+    result_queue.put(("progress", island_index, (generation, max(population_scores))))
+    if time.time() - settings["start_time"] > settings["max_time_s"]:
+      break
+  process_pool.close()
+  process_pool.join()
+  result_queue.put(("result", island_index, (population, best_player_evolution, pairwise_distances, fitness_variances)))
+
+
+def _terminate_islands(islands: list[mp.Process]) -> None:
+  """
+  stop all islands that are still running. Their evaluation workers exit once the islands' task queues are closed.
+  """
+  for island in islands:
+    if island.is_alive():
+      island.terminate()
+  for island in islands:
+    island.join()
+
+
+def train_island_model(
+    population: list[Genetic_Wizard_Player],
+    n_islands: int = 4,
+    n_generations: int = 100,
+    max_time_s: float = 60 * 60, # 1 hour
+    n_games_per_generation: int = 100,
+    n_repetitions_per_game: int = 30,
+    crossover_range: float = 0.1,
+    mutation_rate: float = 0.1,
+    mutation_range: float = 0.1,
+    track_n_best_players: int = 5,
+    migration_interval: int = 5,
+    n_migrants: int = 2,
+    migration_timeout_s: float = 600,
+    n_processes_per_island: int = None,
+    score_estimator: str = "lower_confidence_bound",
+    reference_players: list[Wizard_Base_Ai] = None,
+    n_reference_seats: int = 1,
+    deal_bank: Deal_Bank = None,
+    seed: int = None,
+    ):
+  """
+  Find good parameters for the genetic rule AI by evolving `n_islands` sub-populations in separate processes
+  that exchange their best players every `migration_interval` generations.
+
+  inputs:
+  -------
+      population (list[Genetic_Wizard_Player]): initial players, split evenly between the islands
+      n_islands (int): number of islands (processes)
+      n_generations (int): number of generations to train for
+      max_time_s (float): maximum training time. Each island stops after the first generation that exceeds it.
+      n_games_per_generation (int): number of games played per generation on each island
+      n_repetitions_per_game (int): number of repetitions of each game (keep players the same, shuffle their order)
+      crossover_range (float): how far outside the distance between the two parents' values the child's value can be
+      track_n_best_players (int): number of best players to track for each generation
+      migration_interval (int): number of generations between migrations
+      n_migrants (int): number of best players each island sends to the next island
+      migration_timeout_s (float): maximum time to wait for migrants. Migration is skipped if none arrive.
+      n_processes_per_island (int): number of evaluation workers of each island. Defaults to an even split of all CPUs.
+      score_estimator (str): how to calculate a player's score from repeated games (see `fitness_statistics.SCORE_ESTIMATORS`)
+      reference_players (list[Wizard_Base_Ai]): fixed opponents seated at every table (see `evaluate_population`)
+      n_reference_seats (int): number of seats at each table taken by reference players
+      deal_bank (Deal_Bank): pre-dealt games of 3 players to evaluate the populations with (see `evaluate_population`)
+      seed (int): seed of the islands' random number generators. A random seed is used if `None`.
+
+  returns:
+  --------
+      dict[str, float]: dictionary containing the best parameters found
+      list[list[list[tuple[float, Genetic_Wizard_Player]]]]: for each island, the best players of each generation and their score
+      list[list[float]]: for each island, pairwise distance of the players in each generation
+      list[list[float]]: for each island, fitness variance in each generation
+
+  raises:
+  -------
+      RuntimeError: if an island process stops without a result. All other islands are terminated.
+  """
+  if len(population) < 3 * n_islands:
+    raise ValueError(f"Each island needs at least 3 players, but only {len(population)} players were given for {n_islands} islands.")
+  if n_processes_per_island is None:
+    n_processes_per_island = max(1, mp.cpu_count() // n_islands)
+  settings: dict = {
+      "n_generations": n_generations,
+      "max_time_s": max_time_s,
+      "start_time": time.time(),
+      "n_games_per_generation": n_games_per_generation,
+      "n_repetitions_per_game": n_repetitions_per_game,
+      "crossover_range": crossover_range,
+      "mutation_rate": mutation_rate,
+      "mutation_range": mutation_range,
+      "track_n_best_players": track_n_best_players,
+      "migration_interval": migration_interval,
+      "n_migrants": n_migrants,
+      "migration_timeout_s": migration_timeout_s,
+      "n_processes_per_island": n_processes_per_island,
+      "score_estimator": score_estimator,
+      "reference_players": reference_players,
+      "n_reference_seats": n_reference_seats,
+      "deal_bank": deal_bank,
+      "seed": np.random.randint(2**31 - n_islands) if seed is None else seed,
+  }
+  print(f"Started training {n_islands} islands using {n_processes_per_island} processes each.")
+  # island i receives migrants from island i-1 through queue i
+  migration_queues: list[mp.Queue] = [mp.Queue() for _ in range(n_islands)]
+  result_queue: mp.Queue = mp.Queue()
+  islands: list[mp.Process] = []
+  for island_index, island_population in enumerate(np.array_split(np.array(population, dtype=object), n_islands)):
+    # islands have their own process pools, so they must not be daemonic
+    island = mp.Process(
+        target=_run_island,
+        args=(
+            island_index,
+            list(island_population),
+            settings,
+            migration_queues[island_index],
+            migration_queues[(island_index + 1) % n_islands],
+            result_queue),
+        daemon=False)
+    island.start()
+    islands.append(island)
+  # collect progress and results
+  generations_done: list[int] = [0] * n_islands
+  best_scores: list[float] = [-np.inf] * n_islands
+  island_results: list[tuple] = [None] * n_islands
+  while any(result is None for result in island_results):
+    try:
+      message_type, island_index, content = result_queue.get(timeout=ISLAND_POLL_INTERVAL_S)
+    except queue.Empty:
+      # islands flush their messages before they exit, so an island that exited without a result failed
+      failed_islands: list[int] = [i for i, island in enumerate(islands) if island_results[i] is None and island.exitcode is not None]
+      if failed_islands and result_queue.empty():
+        _terminate_islands(islands)
+        exit_codes: str = ", ".join(f"island {i}: {islands[i].exitcode}" for i in failed_islands)
+        raise RuntimeError(f"Islands stopped without a result (exit codes {exit_codes}). Stopped all other islands.")
+      continue
+    if message_type == "result":
+      island_results[island_index] = content
+      continue
+    generation, best_score = content
+    generations_done[island_index] = generation + 1
+    best_scores[island_index] = best_score
+    current_time = time.time() - settings["start_time"]
+    print(f"\rTraining islands: {min(generations_done)}-{max(generations_done)}/{n_generations} generations in {current_time: 6.0f} s.", end="")
+    print(f" Best score: {max(best_scores):.2f}", end="")
+  for island in islands:
+    island.join()
+  print("\nTraining complete.")
+  populations, best_player_evolutions, pairwise_distances, fitness_variances = zip(*island_results)
+  # best player of the last generation of all islands
+  best_score, best_player = max(
+      (evolution[-1][0] for evolution in best_player_evolutions), key=lambda score_player: score_player[0])
+  # save last generation of each island
+  training_name: str = time.strftime("%Y-%m-%d_%H-%M-%S") + f"_{population[0].__class__.__name__}_islands"
+  for island_index, island_population in enumerate(populations):
+    save_dir: str = os.path.join("genetic_ai_training_history_3", training_name, f"island_{island_index}")
+    os.makedirs(save_dir, exist_ok=True)
+    for i, player in enumerate(island_population):
+      player.save(save_dir, id=i)
+  return best_player.get_parameters(), list(best_player_evolutions), list(pairwise_distances), list(fitness_variances)
@@ -0,0 +1,63 @@
+"""
+smoke tests of the island model in `genetic_island_model.py`
+"""
+import os
+import time
+import tempfile
+
+from program_files.wizard_ais.genetic_rule_ai import Genetic_Wizard_Player
+from genetic_island_model import train_island_model
+
+ISLAND_SETTINGS: dict = {
+    "n_islands": 2,
+    "n_generations": 3,
+    "n_games_per_generation": 2,
+    "n_repetitions_per_game": 1,
+    "migration_interval": 1,
+    "n_migrants": 1,
+    "n_processes_per_island": 1,
+    "seed": 0,
+}
+
+
+def _train_in_temp_dir(**kwargs):
+  """
+  train the islands in a temporary working directory, since the last generations are saved relative to it
+  """
+  working_dir: str = os.getcwd()
+  with tempfile.TemporaryDirectory() as temp_dir:
+    os.chdir(temp_dir)
+    try:
+      return train_island_model([Genetic_Wizard_Player() for _ in range(6)], **ISLAND_SETTINGS, **kwargs)
+    finally:
+      os.chdir(working_dir)
+
+
+def test_train_islands():
+  best_parameters, best_player_evolutions, pairwise_distances, fitness_variances = _train_in_temp_dir()
+  assert set(best_parameters) == set(Genetic_Wizard_Player().get_parameters())
+  assert len(best_player_evolutions) == len(pairwise_distances) == len(fitness_variances) == 2
+  assert all(len(evolution) == 3 for evolution in best_player_evolutions)
+
+
+def test_failed_island():
+  """
+  the coordinator stops all islands with an error instead of waiting forever if an island crashes
+  """
+  start_time: float = time.time()
+  try:
+    # `None` players cannot make decisions, so every island crashes in its first game
+    _train_in_temp_dir(reference_players=[None], migration_timeout_s=60)
+  except RuntimeError:
+    pass
+  else:
+    assert False, "islands that crash should raise an error"
+  assert time.time() - start_time < 30
+
+
+def all_tests():
+  test_train_islands()
+  test_failed_island()
+
+if __name__ == "__main__":
+  all_tests()
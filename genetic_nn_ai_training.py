@@ -6,11 +6,6 @@ Author: Sebastian Jost
 import os
 import json
 import pickle
-from tkinter import Tk, filedialog
-
-import matplotlib.pyplot as plt
-from memory_profiler import profile
-
 from program_files.wizard_ais.genetic_nn_ai import Genetic_NN_Player
 from genetic_algorithm import train_genetic_ai, plot_diversity_measures, load_diversity_values, load_best_player_evolution
 
@@ -64,7 +59,6 @@ def load_genetic_nn_population(path: str) -> list[Genetic_NN_Player]:
   print(f"Loaded {len(population)} players from {path.strip(os.curdir)}")
   return population
 
-# @profile
 def main(
     population_size: int = 100,
     load_population: bool = False,
@@ -99,6 +93,7 @@ def main(
   if not load_population:
     population: list[Genetic_NN_Player] = init_population(population_size)
   else: # open filedialog to choose population folder
+    from tkinter import Tk, filedialog
     root = Tk()
     root.withdraw()
     path: str = filedialog.askdirectory(
@@ -141,6 +136,7 @@ def plot_score_evolution(best_player_evolution: list[list[tuple[float, Genetic_N
   -------
       best_player_evolution (list[Genetic_NN_Player]): list of best players
   """
+  import matplotlib.pyplot as plt
   n_players: int = len(best_player_evolution[0])
   player_scores: list[list[float]] = [[player_score for player_score, _ in generation] for generation in best_player_evolution]
   plt.plot(player_scores, label = [f"Player {player+1}" for player in range(n_players)])
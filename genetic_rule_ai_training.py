@@ -6,7 +6,6 @@ Author: Sebastian Jost
 import os
 
 import numpy as np
-import matplotlib.pyplot as plt
 
 from program_files.wizard_ais.genetic_rule_ai import Genetic_Wizard_Player
 from genetic_algorithm import train_genetic_ai, plot_diversity_measures, load_diversity_values
@@ -145,6 +144,7 @@ def plot_best_players_avg(best_players_evolution: list[list[tuple[float, Genetic
   for key in parameters.keys():
     parameters[key] /= n_players
 
+  import matplotlib.pyplot as plt
   fig, axes = plt.subplots(2, 2, figsize=(10, 10))
 
   axes[0, 0].plot(parameters["scores"])
@@ -201,6 +201,7 @@ def plot_best_players_individual(best_players_evolution: list[list[tuple[float,
         "remaining_cards_factor"
     ]
     # Set up the plot
+    import matplotlib.pyplot as plt
     fig, axes = plt.subplots(nrows=2, ncols=2)
     # Plot the evolution of the scores
     n_players: int = len(best_players_evolution[0])
@@ -0,0 +1,55 @@
+"""
+test the cached hand statistics in `hand_statistics.py`
+"""
+import numpy as np
+
+from program_files.wizard_card import Wizard_Card
+from program_files.hand_statistics import get_hand_statistics, count_at_least, get_cache_info
+from program_files.wizard_ais.genetic_rule_ai import Genetic_Wizard_Player
+
+
+def test_statistics():
+  rng = np.random.default_rng(0)
+  for _ in range(200):
+    hand = [Wizard_Card(int(raw_value)) for raw_value in rng.permutation(60)[:rng.integers(1, 16)]]
+    trump_color = int(rng.integers(-1, 4))
+    hand_statistics = get_hand_statistics(hand, trump_color)
+    for color in range(4):
+      values = [card.value for card in hand if card.color == color]
+      assert hand_statistics.color_counts[color] == len(values)
+      assert hand_statistics.color_sums[color] == sum(values)
+      assert hand_statistics.color_mins[color] == min(values, default=0)
+      assert hand_statistics.color_maxs[color] == max(values, default=0)
+    assert list(hand_statistics.color_order) == list(dict.fromkeys(card.color for card in hand))
+    assert hand_statistics.n_wizards == len([card for card in hand if card.value == 14])
+    assert hand_statistics.n_jesters == len([card for card in hand if card.value == 0])
+    assert count_at_least(hand_statistics.trump_values, 7.5) == \
+        len([card for card in hand if card.color == trump_color and card.value >= 7.5])
+    assert count_at_least(hand_statistics.other_values, 10) == \
+        len([card for card in hand if card.color != trump_color and card.value >= 10])
+
+
+def test_cache():
+  hits = get_cache_info().hits
+  hand = [Wizard_Card(3), Wizard_Card(59)]
+  assert get_hand_statistics(hand, 0) is get_hand_statistics([Wizard_Card(3), Wizard_Card(59)], 0)
+  assert get_cache_info().hits == hits + 1
+  assert get_hand_statistics(hand, 0) is not get_hand_statistics(hand, 1)
+
+
+def test_trump_choice_ties():
+  """
+  the genetic rule AI chooses the first color in the hand if several colors have the same value
+  """
+  player = Genetic_Wizard_Player(color_sum_weight=0, color_number_weight=1)
+  assert player.get_trump_color_choice([[Wizard_Card(50), Wizard_Card(20)]], 0, None) == 3
+  assert player.get_trump_color_choice([[Wizard_Card(20), Wizard_Card(50)]], 0, None) == 1
+
+
+def all_tests():
+  test_statistics()
+  test_cache()
+  test_trump_choice_ties()
+
+if __name__ == "__main__":
+  all_tests()
@@ -0,0 +1,66 @@
+"""
+test that simulation code paths do not import heavy modules (torch, matplotlib, scipy, tkinter).
+Each test runs in a fresh interpreter since other tests may have imported these modules already.
+"""
+import sys
+import subprocess
+
+HEAVY_MODULES: tuple[str] = ("torch", "matplotlib", "scipy", "tkinter", "memory_profiler")
+
+SIMULATION_MODULES: tuple[str] = (
+    "auto_play_genetics",
+    "genetic_algorithm",
+    "genetic_island_model",
+    "genetic_rule_ai_training",
+    "program_files.async_game_driver",
+    "program_files.auto_play_games",
+    "program_files.deal_bank",
+    "program_files.game_engine",
+    "program_files.game_records",
+    "program_files.hand_statistics",
+    "program_files.color_symmetry",
+    "program_files.wizard_ais.wizard_ai_classes",
+)
+
+
+def _get_loaded_heavy_modules(code: str) -> list[str]:
+  """
+  run `code` in a new python process and return the heavy modules that were imported afterwards
+  """
+  code += f"\nimport sys\nprint('loaded:', *[name for name in {HEAVY_MODULES} if name in sys.modules])"
+  result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+  return result.stdout.strip().splitlines()[-1].split()[1:]
+
+
+def test_simulation_imports():
+  """
+  test that importing the modules needed to simulate games and train rule based AIs does not import heavy modules
+  """
+  for module_name in SIMULATION_MODULES:
+    loaded_modules = _get_loaded_heavy_modules(f"import {module_name}")
+    assert loaded_modules == [], f"{module_name} imports {loaded_modules}"
+
+
+def test_lazy_nn_ai():
+  """
+  test that the neural network AI is only loaded when it is used and then imports torch
+  """
+  code = "\n".join([
+      "import sys",
+      "from program_files.auto_play_games import Wizard_Auto_Play",
+      "ai_names = ['simple rule ai', 'uniform random ai', 'genetic_nn_ai']",
+      "ai_types = [{'trump_choice_var': name, 'bids_choice_var': name, 'get_trick_action': name} for name in ai_names]",
+      "auto_game = Wizard_Auto_Play(3, ai_types[:2] * 2, max_rounds=3)",
+      "auto_game.play_game(ai_types[:2] + ai_types[:1])",
+      "assert 'torch' not in sys.modules",
+      "auto_game.play_game(ai_types)",
+  ])
+  assert _get_loaded_heavy_modules(code) == ["torch"]
+
+
+def all_tests():
+  test_simulation_imports()
+  test_lazy_nn_ai()
+
+if __name__ == "__main__":
+  all_tests()
@@ -0,0 +1,129 @@
+"""
+test building dataset shards from recorded games in `nn_datasets.py` and training the networks on them
+(`nn_supervised_training.py`, `nn_fitted_q_training.py`)
+"""
+import tempfile
+
+import numpy as np
+import torch
+
+from auto_play_genetics import Genetic_Auto_Play
+from program_files.game_records import get_record_writer
+from program_files.wizard_ais.genetic_rule_ai import Genetic_Wizard_Player
+from program_files.wizard_ais.nn_datasets import build_nn_datasets, list_shards, load_shard, Shard_Batch_Loader
+from nn_supervised_training import train_prediction_nn
+from nn_fitted_q_training import compute_q_targets, load_trick_transitions, train_trick_action_nn
+
+N_PLAYERS: int = 3
+MAX_ROUNDS: int = 4
+N_GAMES: int = 4
+# every player bids once in each round and plays one card in each trick
+N_BIDS_PER_GAME: int = N_PLAYERS * MAX_ROUNDS
+N_TRICK_DECISIONS_PER_GAME: int = N_PLAYERS * MAX_ROUNDS * (MAX_ROUNDS + 1) // 2
+
+
+def _build_datasets(dataset_dir: str, games_per_shard: int = 2) -> None:
+  """
+  record `N_GAMES` games of genetic rule AIs and build dataset shards from them in `dataset_dir`
+  """
+  with tempfile.TemporaryDirectory() as record_dir:
+    np.random.seed(0)
+    auto_game = Genetic_Auto_Play(
+        n_players=N_PLAYERS,
+        ai_instances=[Genetic_Wizard_Player() for _ in range(N_PLAYERS)],
+        max_rounds=MAX_ROUNDS,
+        record_dir=record_dir)
+    auto_game.auto_play_single_threaded(N_GAMES)
+    record_path: str = get_record_writer(record_dir).file_path
+    build_nn_datasets([record_path], dataset_dir, games_per_shard=games_per_shard, n_processes=1, verbosity=0)
+
+
+def test_shards():
+  with tempfile.TemporaryDirectory() as dataset_dir:
+    _build_datasets(dataset_dir)
+    assert list_shards(dataset_dir) == [0, 1]
+    for shard_id in (0, 1):
+      shard = load_shard(dataset_dir, shard_id, mmap_mode=None)
+      assert shard["bid_features"].shape == (2 * N_BIDS_PER_GAME, 20)
+      assert set(shard["bid_labels"][:, 1]) <= {0., 1.}
+      # rows of each trick decision (CSR offsets)
+      offsets = shard["trick_offsets"]
+      assert len(offsets) == 2 * N_TRICK_DECISIONS_PER_GAME + 1 and offsets[0] == 0 and offsets[-1] == len(shard["trick_features"])
+      n_rows = np.diff(offsets)
+      assert np.all(n_rows >= 1) and np.all(shard["trick_actions"] < n_rows)
+      # exactly one player wins each trick
+      n_tricks = 2 * MAX_ROUNDS * (MAX_ROUNDS + 1) // 2
+      assert np.sum(shard["trick_labels"][:, 0]) == n_tricks
+      # each player's last card of a round has no next decision
+      trick_next = shard["trick_next"]
+      assert np.sum(trick_next == -1) == 2 * N_PLAYERS * MAX_ROUNDS
+      assert np.all(trick_next[trick_next != -1] > np.flatnonzero(trick_next != -1))
+
+
+def test_batch_loader():
+  with tempfile.TemporaryDirectory() as dataset_dir:
+    _build_datasets(dataset_dir)
+    all_labels = np.concatenate([load_shard(dataset_dir, shard_id)["bid_labels"][:, 0] for shard_id in (0, 1)])
+    loader = Shard_Batch_Loader(dataset_dir, "bid_features", "bid_labels", 0, batch_size=7)
+    batches = list(loader)
+    assert all(features.shape[1] == 20 and labels.shape[1] == 1 for features, labels in batches)
+    # every sample is loaded exactly once per epoch
+    loaded_labels = torch.cat([labels for _, labels in batches])[:, 0].numpy()
+    assert np.array_equal(np.sort(loaded_labels), np.sort(all_labels))
+    # iteration can stop early
+    for _ in Shard_Batch_Loader(dataset_dir, "bid_features", "bid_labels", 0, batch_size=1):
+      break
+
+
+def test_missing_shard():
+  """
+  errors of the loading threads are raised instead of waiting forever for their batches
+  """
+  with tempfile.TemporaryDirectory() as dataset_dir:
+    try:
+      list(Shard_Batch_Loader(dataset_dir, "bid_features", "bid_labels", 0, shard_ids=[3]))
+    except FileNotFoundError:
+      pass
+    else:
+      assert False, "a missing shard should raise an error"
+
+
+def test_q_targets():
+  """
+  targets are the reward plus the discounted maximum action value of the player's next decision
+  """
+  transitions = {
+      "features": np.array([[1.], [5.], [2.], [3.], [4.]], dtype=np.float32),
+      "offsets": np.array([0, 2, 3, 5]),
+      "chosen_rows": np.array([0, 2, 4]),
+      "rewards": np.array([0., 1., 2.], dtype=np.float32),
+      "next": np.array([2, -1, -1]),
+  }
+  # the identity network values each action by its only feature
+  targets, row_values = compute_q_targets(torch.nn.Identity(), transitions, discount=0.5)
+  assert np.array_equal(row_values, transitions["features"][:, 0])
+  assert np.array_equal(targets, [0 + 0.5 * 4, 1, 2])
+
+
+def test_training_steps():
+  with tempfile.TemporaryDirectory() as dataset_dir:
+    _build_datasets(dataset_dir, games_per_shard=N_GAMES)
+    prediction_nn, loss_history = train_prediction_nn(dataset_dir, n_epochs=1, batch_size=16, verbosity=0)
+    assert len(loss_history) == 1 and np.isfinite(loss_history[0])
+    assert prediction_nn(torch.zeros(1, 20)).shape == (1, 1)
+    transitions = load_trick_transitions(dataset_dir)
+    assert len(transitions["chosen_rows"]) == N_GAMES * N_TRICK_DECISIONS_PER_GAME
+    trick_action_nn, loss_history = train_trick_action_nn(dataset_dir, n_iterations=2, n_epochs=1, batch_size=16, verbosity=0)
+    assert len(loss_history) == 2 and all(np.isfinite(loss_history))
+    assert trick_action_nn(torch.zeros(1, 22)).shape == (1, 1)
+
+
+def all_tests():
+  test_shards()
+  test_batch_loader()
+  test_missing_shard()
+  test_q_targets()
+  test_training_steps()
+
+if __name__ == "__main__":
+  all_tests()
@@ -0,0 +1,218 @@
+"""
+This file contains functions to train the trick action network of `Genetic_NN_Player` with fitted Q iteration
+on transitions from recorded games (see `program_files/wizard_ais/nn_datasets.py`).
+
+The network scores every valid card by its feature row. Its output is learned as the action value Q(s, a) of playing card `a` in state `s`:
+  - the reward of a transition is 0, except for the last card of a round, where it is the player's score of that round (scaled by `reward_scale`)
+  - the target for every other card is `discount * max_a' Q(s', a')` where `s'` is the same player's next decision in that round
+Targets for all transitions are computed in large batches with the network of the previous iteration, then the network is fitted to them with mini-batches.
+
+usage:
+  python nn_fitted_q_training.py <dataset_dir> --save_dir <dir> [--base_player <dir>] [--n_iterations 10] ...
+"""
+import os
+import time
+import argparse
+
+import numpy as np
+import torch
+
+from program_files.wizard_ais.genetic_nn_ai import Genetic_NN_Player
+from program_files.wizard_ais.pytorch_dense_nn import Dense_NN
+from program_files.wizard_ais.nn_datasets import list_shards, load_shard
+from nn_supervised_training import save_trained_player
+
+
+def load_trick_transitions(
+    dataset_dir: str,
+    shard_ids: list[int] = None,
+    reward_scale: float = 0.1) -> dict[str, np.ndarray]:
+  """
+  load the trick decisions of the given dataset shards into memory as one set of transitions
+
+  inputs:
+  -------
+      dataset_dir (str): directory containing the dataset shards
+      shard_ids (list[int]): shards to load. Defaults to all shards.
+      reward_scale (float): factor applied to the round scores to get the rewards
+
+  returns:
+  --------
+      dict[str, np.ndarray]: transitions with keys
+        - "features" (n_rows, 22): feature rows of all valid actions
+        - "offsets" (n_decisions + 1,): rows `offsets[i]:offsets[i+1]` belong to decision `i`
+        - "chosen_rows" (n_decisions,): row of the played card of each decision
+        - "rewards" (n_decisions,): reward of each decision
+        - "next" (n_decisions,): index of the next decision of the same player, -1 at the end of a round
+  """
+  if shard_ids is None:
+    shard_ids = list_shards(dataset_dir)
+  features, offsets, chosen_rows, rewards, next_decisions = [], [np.zeros(1, dtype=np.int64)], [], [], []
+  n_rows, n_decisions = 0, 0
+  for shard_id in shard_ids:
+    shard: dict[str, np.ndarray] = load_shard(dataset_dir, shard_id)
+    shard_next: np.ndarray = np.array(shard["trick_next"])
+    features.append(np.array(shard["trick_features"]))
+    offsets.append(shard["trick_offsets"][1:] + n_rows)
+    chosen_rows.append(shard["trick_offsets"][:-1] + shard["trick_actions"] + n_rows)
+    # only the last card of each round is rewarded with the round score
+    rewards.append(np.where(shard_next == -1, shard["trick_labels"][:, 1] * reward_scale, 0).astype(np.float32))
+    next_decisions.append(np.where(shard_next == -1, -1, shard_next + n_decisions))
+    n_rows += len(shard["trick_features"])
+    n_decisions += len(shard_next)
+  if n_decisions == 0:
+    raise FileNotFoundError(f"No trick decisions found in {dataset_dir}.")
+  return {
+      "features": np.concatenate(features),
+      "offsets": np.concatenate(offsets),
+      "chosen_rows": np.concatenate(chosen_rows),
+      "rewards": np.concatenate(rewards),
+      "next": np.concatenate(next_decisions),
+  }
+
+
+def evaluate_rows(network: Dense_NN, features: np.ndarray, batch_size: int = 65536) -> np.ndarray:
+  """
+  evaluate the network for all feature rows in large batches
+
+  inputs:
+  -------
+      network (Dense_NN): network with a single output
+      features (np.ndarray): feature rows of shape (n_rows, n_features)
+      batch_size (int): number of rows evaluated at once
+
+  returns:
+  --------
+      np.ndarray: network output for each row, shape (n_rows,)
+  """
+  network.eval()
+  values: np.ndarray = np.empty(len(features), dtype=np.float32)
+  with torch.no_grad():
+    for start in range(0, len(features), batch_size):
+      batch: torch.Tensor = torch.from_numpy(features[start:start + batch_size])
+      values[start:start + batch_size] = network(batch)[:, 0].numpy()
+  return values
+
+
+def compute_q_targets(
+    network: Dense_NN,
+    transitions: dict[str, np.ndarray],
+    discount: float = 1.) -> tuple[np.ndarray, np.ndarray]:
+  """
+  compute the fitted Q iteration targets of all transitions at once
+
+  inputs:
+  -------
+      network (Dense_NN): current action value network
+      transitions (dict[str, np.ndarray]): transitions as returned by `load_trick_transitions`
+      discount (float): discount factor for the value of the next decision
+
+  returns:
+  --------
+      np.ndarray: target action value of each decision
+      np.ndarray: action values of all feature rows
+  """
+  row_values: np.ndarray = evaluate_rows(network, transitions["features"])
+  # maximum action value of each decision (every decision has at least one valid action)
+  max_values: np.ndarray = np.maximum.reduceat(row_values, transitions["offsets"][:-1])
+  next_decisions: np.ndarray = transitions["next"]
+  has_next: np.ndarray = next_decisions >= 0
+  targets: np.ndarray = transitions["rewards"].copy()
+  targets[has_next] += discount * max_values[next_decisions[has_next]]
+  return targets, row_values
+
+
+def train_trick_action_nn(
+    dataset_dir: str,
+    trick_action_nn: Dense_NN = None,
+    hidden_layers: tuple[int] = (5,),
+    n_iterations: int = 10,
+    n_epochs: int = 2,
+    batch_size: int = 512,
+    learning_rate: float = 1e-3,
+    discount: float = 1.,
+    reward_scale: float = 0.1,
+    verbosity: int = 1,
+    ) -> tuple[Dense_NN, list[float]]:
+  """
+  train an action value network for playing cards with fitted Q iteration on recorded transitions.
+
+  inputs:
+  -------
+      dataset_dir (str): directory containing the dataset shards
+      trick_action_nn (Dense_NN): network to continue training. A new network with `hidden_layers` is created if `None`.
+      hidden_layers (tuple[int]): number of nodes in each hidden layer of a new network
+      n_iterations (int): number of times the targets are recomputed
+      n_epochs (int): number of passes over all transitions per iteration
+      batch_size (int): number of transitions per mini-batch
+      learning_rate (float): learning rate of the Adam optimizer
+      discount (float): discount factor for the value of the next decision
+      reward_scale (float): factor applied to the round scores to get the rewards
+      verbosity (int): print progress if at least 1
+
+  returns:
+  --------
+      Dense_NN: the trained network
+      list[float]: mean squared error of the fit in each iteration
+  """
+  transitions: dict[str, np.ndarray] = load_trick_transitions(dataset_dir, reward_scale=reward_scale)
+  chosen_features: torch.Tensor = torch.from_numpy(transitions["features"][transitions["chosen_rows"]])
+  n_decisions: int = len(chosen_features)
+  if trick_action_nn is None:
+    trick_action_nn = Dense_NN(22, 1, hidden_layers)
+  optimizer: torch.optim.Optimizer = torch.optim.Adam(trick_action_nn.parameters(), lr=learning_rate)
+  loss_function: torch.nn.Module = torch.nn.MSELoss()
+  loss_history: list[float] = []
+  start_time: float = time.time()
+  for iteration in range(n_iterations):
+    targets, row_values = compute_q_targets(trick_action_nn, transitions, discount)
+    target_tensor: torch.Tensor = torch.from_numpy(targets).unsqueeze(1)
+    trick_action_nn.train()
+    loss_sum: float = 0.
+    for _ in range(n_epochs):
+      permutation: torch.Tensor = torch.randperm(n_decisions)
+      for start in range(0, n_decisions, batch_size):
+        batch_indices: torch.Tensor = permutation[start:start + batch_size]
+        optimizer.zero_grad()
+        loss: torch.Tensor = loss_function(trick_action_nn(chosen_features[batch_indices]), target_tensor[batch_indices])
+        loss.backward()
+        optimizer.step()
+        loss_sum += loss.item() * len(batch_indices)
+    loss_history.append(loss_sum / (n_epochs * n_decisions))
+    if verbosity >= 1:
+      # fraction of recorded actions that the greedy policy of the previous iteration would have chosen as well
+      greedy_agreement: float = np.mean(
+          row_values[transitions["chosen_rows"]] == np.maximum.reduceat(row_values, transitions["offsets"][:-1]))
+      print(f"\rFitted Q iteration: {iteration + 1}/{n_iterations} iterations in {time.time() - start_time: 6.0f} s.", end="")
+      print(f" loss: {loss_history[-1]:.4f}, mean target: {np.mean(targets):.3f}, greedy agreement: {greedy_agreement:.3f}", end="")
+  if verbosity >= 1:
+    print()
+  return trick_action_nn, loss_history
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Train the trick action network of Genetic_NN_Player with fitted Q iteration on recorded games.")
+  parser.add_argument("dataset_dir", help="directory containing dataset shards built by nn_datasets.py")
+  # required, so the networks shipped in `program_files/wizard_ais/genetic_nn_ai` are not overwritten by accident
+  parser.add_argument("--save_dir", required=True, help="directory to save the trained player to")
+  parser.add_argument("--base_player", default=None, help="saved Genetic_NN_Player providing the other two networks")
+  parser.add_argument("--hidden_layers", type=int, nargs="+", default=[5])
+  parser.add_argument("--n_iterations", type=int, default=10)
+  parser.add_argument("--n_epochs", type=int, default=2)
+  parser.add_argument("--batch_size", type=int, default=512)
+  parser.add_argument("--learning_rate", type=float, default=1e-3)
+  parser.add_argument("--discount", type=float, default=1.)
+  parser.add_argument("--id", type=int, default=None, help="save the player in a subdirectory of save_dir with this id")
+  args = parser.parse_args()
+
+  base_player: Genetic_NN_Player = None if args.base_player is None else Genetic_NN_Player.load(args.base_player)
+  trick_action_nn, _ = train_trick_action_nn(
+      args.dataset_dir,
+      trick_action_nn=None if base_player is None else base_player.trick_action_nn,
+      hidden_layers=tuple(args.hidden_layers),
+      n_iterations=args.n_iterations,
+      n_epochs=args.n_epochs,
+      batch_size=args.batch_size,
+      learning_rate=args.learning_rate,
+      discount=args.discount)
+  save_trained_player(args.save_dir, base_player, id=args.id, trick_action_nn=trick_action_nn)
@@ -0,0 +1,196 @@
+"""
+This file contains functions to train the bid prediction network of `Genetic_NN_Player` by supervised learning
+on datasets built from recorded self-play (see `program_files/wizard_ais/nn_datasets.py`).
+The trained network is saved in the same format as `Genetic_NN_Player.save`, so it can be used directly or to warm-start the genetic algorithm.
+
+usage:
+  python nn_supervised_training.py <dataset_dir> --save_dir <dir> [--base_player <dir>] [--n_epochs 5] ...
+"""
+import os
+import time
+import argparse
+
+import torch
+
+from program_files.wizard_ais.genetic_nn_ai import Genetic_NN_Player
+from program_files.wizard_ais.pytorch_dense_nn import Dense_NN
+from program_files.wizard_ais.nn_datasets import Shard_Batch_Loader, list_shards
+
+
+def train_prediction_nn(
+    dataset_dir: str,
+    prediction_nn: Dense_NN = None,
+    hidden_layers: tuple[int] = (5,),
+    n_epochs: int = 5,
+    batch_size: int = 512,
+    learning_rate: float = 1e-3,
+    n_validation_shards: int = 1,
+    n_loader_threads: int = 2,
+    verbosity: int = 1,
+    ) -> tuple[Dense_NN, list[float]]:
+  """
+  Fit a bid prediction network to the number of tricks won with the bidding player's hand.
+  Mini-batches are loaded from memory-mapped dataset shards by background threads.
+
+  inputs:
+  -------
+      dataset_dir (str): directory containing the dataset shards
+      prediction_nn (Dense_NN): network to continue training. A new network with `hidden_layers` is created if `None`.
+      hidden_layers (tuple[int]): number of nodes in each hidden layer of a new network
+      n_epochs (int): number of passes over the training shards
+      batch_size (int): number of samples per mini-batch
+      learning_rate (float): learning rate of the Adam optimizer
+      n_validation_shards (int): number of shards held out for validation. Ignored if there is only one shard.
+      n_loader_threads (int): number of background threads loading batches
+      verbosity (int): print progress if at least 1
+
+  returns:
+  --------
+      Dense_NN: the trained network
+      list[float]: validation loss after each epoch (training loss if there are no validation shards)
+  """
+  shard_ids: list[int] = list_shards(dataset_dir)
+  if not shard_ids:
+    raise FileNotFoundError(f"No dataset shards found in {dataset_dir}.")
+  if len(shard_ids) <= n_validation_shards:
+    n_validation_shards = 0
+  train_shards: list[int] = shard_ids[n_validation_shards:]
+  validation_shards: list[int] = shard_ids[:n_validation_shards]
+  # label column 0 = number of won tricks
+  train_loader = Shard_Batch_Loader(dataset_dir, "bid_features", "bid_labels", 0,
+      batch_size=batch_size, shard_ids=train_shards, n_threads=n_loader_threads)
+  if prediction_nn is None:
+    prediction_nn = Dense_NN(20, 1, hidden_layers)
+  optimizer: torch.optim.Optimizer = torch.optim.Adam(prediction_nn.parameters(), lr=learning_rate)
+  loss_function: torch.nn.Module = torch.nn.MSELoss()
+  loss_history: list[float] = []
+  start_time: float = time.time()
+  for epoch in range(n_epochs):
+    prediction_nn.train()
+    train_loss_sum, n_train_samples = 0., 0
+    for features, labels in train_loader:
+      optimizer.zero_grad()
+      loss: torch.Tensor = loss_function(prediction_nn(features), labels)
+      loss.backward()
+      optimizer.step()
+      train_loss_sum += loss.item() * len(labels)
+      n_train_samples += len(labels)
+    train_loss: float = train_loss_sum / max(n_train_samples, 1)
+    if validation_shards:
+      validation_loss, bid_accuracy = evaluate_prediction_nn(prediction_nn, dataset_dir, validation_shards, batch_size)
+      loss_history.append(validation_loss)
+    else:
+      validation_loss, bid_accuracy = train_loss, float("nan")
+      loss_history.append(train_loss)
+    if verbosity >= 1:
+      print(f"\rTraining bid predictor: {epoch + 1}/{n_epochs} epochs in {time.time() - start_time: 6.0f} s.", end="")
+      print(f" train loss: {train_loss:.4f}, validation loss: {validation_loss:.4f}, bid accuracy: {bid_accuracy:.3f}", end="")
+  if verbosity >= 1:
+    print()
+  return prediction_nn, loss_history
+
+
+def evaluate_prediction_nn(
+    prediction_nn: Dense_NN,
+    dataset_dir: str,
+    shard_ids: list[int],
+    batch_size: int = 4096) -> tuple[float, float]:
+  """
+  evaluate a bid prediction network on the given dataset shards
+
+  inputs:
+  -------
+      prediction_nn (Dense_NN): the network to evaluate
+      dataset_dir (str): directory containing the dataset shards
+      shard_ids (list[int]): shards to evaluate on
+      batch_size (int): number of samples per batch
+
+  returns:
+  --------
+      float: mean squared error of the predicted number of tricks
+      float: fraction of bids that would have matched the number of won tricks (rounded prediction)
+  """
+  loader = Shard_Batch_Loader(dataset_dir, "bid_features", "bid_labels", 0,
+      batch_size=batch_size, shard_ids=shard_ids, shuffle=False)
+  prediction_nn.eval()
+  squared_error_sum, n_correct, n_samples = 0., 0, 0
+  with torch.no_grad():
+    for features, labels in loader:
+      output: torch.Tensor = prediction_nn(features)
+      squared_error_sum += torch.sum((output - labels) ** 2).item()
+      n_correct += torch.sum(torch.round(output).clamp(min=0) == labels).item()
+      n_samples += len(labels)
+  n_samples = max(n_samples, 1)
+  return squared_error_sum / n_samples, n_correct / n_samples
+
+
+def save_trained_player(
+    save_dir: str = None,
+    base_player: Genetic_NN_Player = None,
+    id: int = None,
+    prediction_nn: Dense_NN = None,
+    trick_action_nn: Dense_NN = None) -> Genetic_NN_Player:
+  """
+  replace networks of `base_player` with trained networks and save the player with `Genetic_NN_Player.save`.
+
+  inputs:
+  -------
+      save_dir (str): directory to save the player to. Defaults to the directory used by `Genetic_NN_Ai`.
+      base_player (Genetic_NN_Player): player providing all networks that are not given. A new random player is used if `None`.
+      id (int): id of the saved player. If `None`, the networks are saved directly in `save_dir` as loaded by `Genetic_NN_Ai`,
+          otherwise in a subdirectory that can be loaded with `Genetic_NN_Player.load` (see `Genetic_NN_Player.save`)
+      prediction_nn (Dense_NN): trained bid prediction network
+      trick_action_nn (Dense_NN): trained trick action network
+
+  returns:
+  --------
+      Genetic_NN_Player: the saved player
+  """
+  if base_player is None:
+    base_player = Genetic_NN_Player((4,), (5,), (5,))
+  if prediction_nn is None:
+    prediction_nn = base_player.prediction_nn
+  if trick_action_nn is None:
+    trick_action_nn = base_player.trick_action_nn
+  player: Genetic_NN_Player = Genetic_NN_Player(
+      trump_color_nn_layers=base_player.trump_color_nn_layers,
+      prediction_nn_layers=get_hidden_layers(prediction_nn),
+      trick_action_nn_layers=get_hidden_layers(trick_action_nn),
+      trump_color_nn_weights=base_player.trump_color_nn.get_weights(),
+      prediction_nn_weights=prediction_nn.get_weights(),
+      trick_action_nn_weights=trick_action_nn.get_weights())
+  if save_dir is not None:
+    os.makedirs(save_dir, exist_ok=True)
+  player.save(save_dir, id=id)
+  return player
+
+
+def get_hidden_layers(network: Dense_NN) -> tuple[int]:
+  """
+  get the number of nodes in each hidden layer of a `Dense_NN`
+  """
+  return tuple(layer.out_features for layer in [network.input, *network.hidden])
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Train the bid prediction network of Genetic_NN_Player on recorded games.")
+  parser.add_argument("dataset_dir", help="directory containing dataset shards built by nn_datasets.py")
+  # required, so the networks shipped in `program_files/wizard_ais/genetic_nn_ai` are not overwritten by accident
+  parser.add_argument("--save_dir", required=True, help="directory to save the trained player to")
+  parser.add_argument("--base_player", default=None, help="saved Genetic_NN_Player providing the other two networks")
+  parser.add_argument("--hidden_layers", type=int, nargs="+", default=[5])
+  parser.add_argument("--n_epochs", type=int, default=5)
+  parser.add_argument("--batch_size", type=int, default=512)
+  parser.add_argument("--learning_rate", type=float, default=1e-3)
+  parser.add_argument("--id", type=int, default=None, help="save the player in a subdirectory of save_dir with this id")
+  args = parser.parse_args()
+
+  base_player: Genetic_NN_Player = None if args.base_player is None else Genetic_NN_Player.load(args.base_player)
+  prediction_nn, _ = train_prediction_nn(
+      args.dataset_dir,
+      prediction_nn=None if base_player is None else base_player.prediction_nn,
+      hidden_layers=tuple(args.hidden_layers),
+      n_epochs=args.n_epochs,
+      batch_size=args.batch_size,
+      learning_rate=args.learning_rate)
+  save_trained_player(args.save_dir, base_player, id=args.id, prediction_nn=prediction_nn)
@@ -0,0 +1,107 @@
+"""
+test the phase timer and latency histograms in `profiling.py`
+"""
+import math
+
+from program_files.profiling import Phase_Timer, Latency_Histogram
+
+
+def test_timed():
+  timer = Phase_Timer(record_latencies=True)
+  add = timer.timed("bidding", "Test_Ai", lambda a, b=0: a + b, round_number=3)
+  assert add(1, b=2) == 3
+  assert add(4) == 4
+  assert timer.call_counts[("bidding", "Test_Ai")] == 2
+  assert timer.total_times[("bidding", "Test_Ai")] > 0
+  assert timer.latencies.get_statistics("bidding", "Test_Ai", round_number=3)[0] == 2
+  # latencies are only recorded for decisions with a round number
+  timer.timed("dealing", None, lambda: None)()
+  assert timer.call_counts[("dealing", None)] == 1
+  assert timer.latencies.get_statistics("dealing", None)[0] == 0
+
+
+def test_merge():
+  timer = Phase_Timer(record_latencies=True)
+  timer.add("scoring", None, 1.)
+  other = timer.new_like()
+  other.add("scoring", None, 2.)
+  other.add("trick play", "Test_Ai", 0.5)
+  other.latencies.add("trick play", "Test_Ai", 1, 0.5)
+  timer.merge(other)
+  assert timer.total_times[("scoring", None)] == 3.
+  assert timer.call_counts[("scoring", None)] == 2
+  assert timer.call_counts[("trick play", "Test_Ai")] == 1
+  assert timer.latencies.get_statistics("trick play", "Test_Ai")[0] == 1
+  # latencies are ignored if the other timer does not record them
+  timer_without_latencies = Phase_Timer()
+  timer_without_latencies.merge(timer)
+  assert timer_without_latencies.latencies is None
+  assert timer_without_latencies.call_counts[("scoring", None)] == 2
+
+
+def test_new_like():
+  timer = Phase_Timer(record_latencies=True)
+  timer.add("bidding", "Test_Ai", 1.)
+  new_timer = timer.new_like()
+  assert not new_timer.total_times and not new_timer.call_counts
+  assert new_timer.latencies is not None and new_timer.latencies is not timer.latencies
+  assert Phase_Timer().new_like().latencies is None
+  assert "bidding" in timer.report()
+
+
+def test_histogram_bins():
+  # bins: <= 1 ms, 1-10 ms, 10-100 ms, 100 ms-1 s, >= 1 s
+  histogram = Latency_Histogram(min_latency=1e-3, max_latency=1., bins_per_decade=1)
+  assert histogram.n_bins == 5
+  for latency in (1e-4, 1e-3, 5e-3, 1e-2, 0.5, 1., 1e6):
+    histogram.add("bidding", "Test_Ai", 1, latency)
+  assert histogram.counts[("bidding", "Test_Ai", 1)] == [2, 1, 1, 1, 2]
+  assert histogram.max_latencies[("bidding", "Test_Ai", 1)] == 1e6
+
+
+def test_histogram_percentiles():
+  histogram = Latency_Histogram(min_latency=1e-3, max_latency=1., bins_per_decade=1)
+  for _ in range(99):
+    histogram.add("trick play", "Test_Ai", 2, 5e-3)
+  histogram.add("trick play", "Test_Ai", 3, 0.5)
+  n_decisions, (p50, p99, p100), max_latency = histogram.get_statistics("trick play", "Test_Ai", percentiles=(50, 99, 100))
+  assert (n_decisions, max_latency) == (100, 0.5)
+  # percentiles are upper bin edges, but at most the maximum latency
+  assert math.isclose(p50, 1e-2) and math.isclose(p99, 1e-2)
+  assert p100 == 0.5
+  assert histogram.get_statistics("trick play", "Test_Ai", round_number=3)[0] == 1
+  n_decisions, percentiles, max_latency = histogram.get_statistics("bidding", "Test_Ai")
+  assert n_decisions == 0 and all(math.isnan(value) for value in percentiles + [max_latency])
+
+
+def test_histogram_merge():
+  histogram = Latency_Histogram()
+  histogram.add("bidding", "Test_Ai", 1, 1e-3)
+  other = Latency_Histogram()
+  other.add("bidding", "Test_Ai", 1, 2e-3)
+  other.add("bidding", "Test_Ai", 2, 1.)
+  histogram.merge(other)
+  assert histogram.get_statistics("bidding", "Test_Ai")[0] == 3
+  assert histogram.max_latencies[("bidding", "Test_Ai", 1)] == 2e-3
+  # new keys are copied, not shared
+  other.add("bidding", "Test_Ai", 2, 1.)
+  assert histogram.get_statistics("bidding", "Test_Ai", round_number=2)[0] == 1
+  for mismatched_histogram in (Latency_Histogram(bins_per_decade=10), Latency_Histogram(min_latency=1e-6)):
+    try:
+      histogram.merge(mismatched_histogram)
+    except ValueError:
+      pass
+    else:
+      assert False, "histograms with different bins should not be merged"
+
+
+def all_tests():
+  test_timed()
+  test_merge()
+  test_new_like()
+  test_histogram_bins()
+  test_histogram_percentiles()
+  test_histogram_merge()
+
+if __name__ == "__main__":
+  all_tests()
@@ -0,0 +1,164 @@
+"""
+This module estimates the value of each legal card of the active player with any AI, e.g. to show hints in the GUI.
+
+If the AI has a method `get_action_values(game_state)`, it is used directly.
+Otherwise the values are estimated with rollouts: the unknown cards of the other players are dealt randomly,
+the card is played, and the AI plays the rest of the round for all players.
+The value of a card is the average number of points the active player gains in the round.
+Rollouts are spread evenly over all legal cards until the time budget is used up.
+"""
+import copy
+import time
+
+import numpy as np
+
+from program_files.wizard_card import Wizard_Card
+from program_files.game_state import Game_State
+from program_files.helper_functions import check_action_invalid
+from program_files.wizard_ais.ai_base_class import Wizard_Base_Ai
+
+
+def get_game_state_key(game_state: Game_State) -> tuple:
+  """
+  key of everything the active player knows about the current trick situation.
+  Two game states with the same key have the same action values.
+  `public_card_states` only stores who played each card, so the current trick is encoded by its winning card,
+  its current winner and the number of cards still to be played.
+
+  inputs:
+  -------
+      game_state (Game_State): game state during a trick
+
+  returns:
+  --------
+      tuple: hashable key of the game state
+  """
+  return (
+      game_state.n_players,
+      game_state.round_number,
+      game_state.trick_active_player,
+      game_state.trump_color,
+      game_state.serving_color,
+      None if game_state.winning_card is None else game_state.winning_card.raw_value,
+      game_state.trick_winner_index,
+      game_state.n_cards_to_be_played,
+      tuple(card.raw_value for card in game_state.players_hands[game_state.trick_active_player]),
+      tuple(game_state.players_predictions),
+      tuple(game_state.players_won_tricks),
+      game_state.public_card_states.tobytes())
+
+
+def copy_game_state(game_state: Game_State) -> Game_State:
+  """
+  copy all parts of a game state that change during a round
+
+  inputs:
+  -------
+      game_state (Game_State): game state to copy
+
+  returns:
+  --------
+      Game_State: independent copy of `game_state`
+  """
+  game_state_copy: Game_State = copy.copy(game_state)
+  game_state_copy.players_hands = [list(hand) for hand in game_state.players_hands]
+  if game_state.players_predictions is not None: # bids are added during bidding
+    game_state_copy.players_predictions = game_state.players_predictions.copy()
+  game_state_copy.players_won_tricks = game_state.players_won_tricks.copy()
+  game_state_copy.players_gained_points_history = game_state.players_gained_points_history.copy()
+  game_state_copy.players_total_points = game_state.players_total_points.copy()
+  game_state_copy.public_card_states = game_state.public_card_states.copy()
+  return game_state_copy
+
+
+def get_legal_actions(game_state: Game_State) -> list:
+  """
+  return all cards the active player may play
+
+  inputs:
+  -------
+      game_state (Game_State): game state during a trick
+
+  returns:
+  --------
+      list[Wizard_Card]: legal cards of the active player
+  """
+  hand: list = game_state.players_hands[game_state.trick_active_player]
+  return [card for card in hand if not check_action_invalid(card, hand, game_state.serving_color)]
+
+
+def get_action_values(
+    game_state: Game_State,
+    ai: Wizard_Base_Ai,
+    time_budget_s: float = 0.5,
+    max_rollouts_per_action: int = 500,
+    rng: np.random.Generator = None) -> dict[int, float]:
+  """
+  estimate the value of each legal card of the active player
+
+  inputs:
+  -------
+      game_state (Game_State): game state during a trick. It is not changed.
+      ai (Wizard_Base_Ai): AI used to play the rest of the round (or to evaluate the cards if it has `get_action_values`)
+      time_budget_s (float): maximum time for rollouts. At least one rollout per card is played.
+      max_rollouts_per_action (int): stop early after this many rollouts per card
+      rng (np.random.Generator): random number generator to deal the unknown cards. A new one is created if `None`.
+
+  returns:
+  --------
+      dict[int, float]: estimated points gained this round for the raw value of each legal card
+  """
+  if hasattr(ai, "get_action_values"):
+    return ai.get_action_values(game_state)
+  legal_actions: list = get_legal_actions(game_state)
+  if rng is None:
+    rng = np.random.default_rng()
+  total_points: np.ndarray = np.zeros(len(legal_actions))
+  n_rollouts: int = 0
+  end_time: float = time.perf_counter() + time_budget_s
+  while n_rollouts < max_rollouts_per_action:
+    for i, action in enumerate(legal_actions):
+      total_points[i] += _rollout(game_state, action, ai, rng)
+    n_rollouts += 1
+    if time.perf_counter() > end_time:
+      break
+  return {action.raw_value: float(points) for action, points in zip(legal_actions, total_points / n_rollouts)}
+
+
+def _rollout(game_state: Game_State, action: Wizard_Card, ai: Wizard_Base_Ai, rng: np.random.Generator) -> int:
+  """
+  play `action` and the rest of the round with `ai` for all players after dealing the unknown cards randomly
+
+  returns:
+  --------
+      int: points gained by the active player this round
+  """
+  player_index: int = game_state.trick_active_player
+  round_number: int = game_state.round_number
+  rollout_state: Game_State = copy_game_state(game_state)
+  _deal_unknown_cards(rollout_state, rng)
+  state: int = rollout_state.perform_action(action)
+  while state != 2:
+    if state == 1:
+      rollout_state.start_trick()
+    state = rollout_state.perform_action(ai.get_trick_action(game_state=rollout_state))
+  return rollout_state.players_gained_points_history[round_number - 1, player_index]
+
+
+def _deal_unknown_cards(game_state: Game_State, rng: np.random.Generator) -> None:
+  """
+  replace the hands of all players except the active one with random cards the active player has not seen.
+  Known voids (players that did not serve a color) are ignored.
+  """
+  player_index: int = game_state.trick_active_player
+  own_values: set = {card.raw_value for card in game_state.players_hands[player_index]}
+  # cards that were neither played nor are the trump card are in other hands or undealt
+  unseen_cards: list[Wizard_Card] = [Wizard_Card(int(raw_value))
+      for raw_value in np.flatnonzero(game_state.public_card_states == -1) if raw_value not in own_values]
+  permutation: np.ndarray = rng.permutation(len(unseen_cards))
+  start: int = 0
+  for hand_index, hand in enumerate(game_state.players_hands):
+    if hand_index == player_index:
+      continue
+    game_state.players_hands[hand_index] = [unseen_cards[i] for i in permutation[start:start + len(hand)]]
+    start += len(hand)
@@ -0,0 +1,491 @@
+"""
+This module plays games of wizard on an asyncio event loop where every seat is an awaitable agent.
+While one agent thinks (in another process, on another machine or in a thread), the other games on the loop continue,
+so hundreds of games against slow or external agents can run concurrently without one thread per game.
+
+The games are played with `Game_Engine`. Agents have a coroutine `get_decision(engine)` that returns the decision of
+`engine.active_player` for `engine.next_event` (trump color, bid or card):
+  - `In_Process_Agent` wraps any AI of this repository (optionally running it in an executor).
+  - `Subprocess_Agent` starts a program and talks to it over its stdin and stdout.
+  - `Socket_Agent` connects to an agent server over TCP (usually on localhost).
+
+External agents use a line based JSON protocol. Each request is `{"id": int, "observation": dict}` with everything the deciding
+player knows (see `get_observation`), each reply is `{"id": int, "decision": int}` with a trump color, a bid or the raw value of a card
+(or `{"id": int, "error": str}`). One agent can play in many games at once: requests are matched to replies by their id,
+so replies may be sent in any order.
+
+Any AI of this repository can be run as an external agent:
+  python -m program_files.async_game_driver "simple rule ai"              # over stdin and stdout
+  python -m program_files.async_game_driver "simple rule ai" --port 6200  # as a server on localhost
+"""
+import sys
+import json
+import asyncio
+import argparse
+from concurrent.futures import Executor
+
+import numpy as np
+
+from program_files.wizard_card import Wizard_Card
+from program_files.game_state import Game_State
+from program_files.game_engine import Game_Engine, DEAL, TRUMP, BID, TRICK, GAME_END
+from program_files.game_records import Game_Record_Writer
+from program_files.helper_functions import check_action_invalid
+
+
+def get_observation(engine: Game_Engine) -> dict:
+  """
+  everything the active player knows before the next decision, encoded with JSON compatible types.
+  Cards are given by their raw value.
+
+  inputs:
+  -------
+      engine (Game_Engine): engine waiting for a trump choice, bid or card
+
+  returns:
+  --------
+      dict: observation of `engine.active_player`. Bids of players that did not bid yet are `None`.
+  """
+  game: Game_State = engine.game_state
+  event: str = engine.next_event
+  player_index: int = engine.active_player
+  hand: list[Wizard_Card] = engine.hands[player_index] if event == TRUMP else game.players_hands[player_index]
+  if event == TRICK:
+    predictions: list = [int(prediction) for prediction in engine.predictions]
+  elif event == BID:
+    predictions: list = [int(engine.predictions[player])
+        if (player - game.round_starting_player) % engine.n_players < game.n_predictions else None
+        for player in range(engine.n_players)]
+  else:
+    predictions = None
+  return {
+      "event": event,
+      "player_index": player_index,
+      "n_players": engine.n_players,
+      "round_number": game.round_number,
+      "round_starting_player": game.round_starting_player,
+      "trump_card": None if engine.trump_card is None else engine.trump_card.raw_value,
+      "trump_color": int(game.trump_color),
+      "hand": [card.raw_value for card in hand],
+      "predictions": predictions,
+      "won_tricks": game.players_won_tricks.tolist(),
+      "total_points": game.players_total_points.tolist(),
+      "gained_points_history": game.players_gained_points_history.tolist(),
+      "tricks_to_be_played": game.tricks_to_be_played,
+      "trick_active_player": game.trick_active_player,
+      "trick_winner_index": game.trick_winner_index,
+      "n_cards_to_be_played": game.n_cards_to_be_played,
+      "winning_card": None if game.winning_card is None else game.winning_card.raw_value,
+      "serving_color": None if game.serving_color is None else int(game.serving_color),
+      "public_card_states": game.public_card_states.tolist(),
+  }
+
+
+def observation_to_game_state(observation: dict) -> tuple[Game_State, list[list[Wizard_Card]]]:
+  """
+  rebuild the game state of the active player from an observation, so that any AI of this repository can make the decision.
+  The hands of the other players are empty.
+
+  inputs:
+  -------
+      observation (dict): observation as returned by `get_observation`
+
+  returns:
+  --------
+      Game_State: game state as seen by the active player
+      list[list[Wizard_Card]]: hands of all players (only the own hand is known)
+  """
+  n_players: int = observation["n_players"]
+  player_index: int = observation["player_index"]
+  game_state: Game_State = Game_State(n_players)
+  game_state.round_number = observation["round_number"]
+  game_state.round_starting_player = observation["round_starting_player"]
+  game_state.trump_card = None if observation["trump_card"] is None else Wizard_Card(observation["trump_card"])
+  game_state.trump_color = observation["trump_color"]
+  hands: list[list[Wizard_Card]] = [[] for _ in range(n_players)]
+  hands[player_index] = [Wizard_Card(raw_value) for raw_value in observation["hand"]]
+  game_state.players_hands = hands
+  if observation["predictions"] is not None:
+    game_state.players_predictions = np.array(
+        [0 if prediction is None else prediction for prediction in observation["predictions"]], dtype=np.int8)
+    game_state.n_predictions = n_players - observation["predictions"].count(None)
+  game_state.players_won_tricks = np.array(observation["won_tricks"], dtype=np.int8)
+  game_state.players_total_points = np.array(observation["total_points"], dtype=np.int16)
+  game_state.players_gained_points_history = np.array(observation["gained_points_history"])
+  game_state.tricks_to_be_played = observation["tricks_to_be_played"]
+  game_state.trick_active_player = observation["trick_active_player"]
+  game_state.trick_winner_index = observation["trick_winner_index"]
+  game_state.n_cards_to_be_played = observation["n_cards_to_be_played"]
+  game_state.winning_card = None if observation["winning_card"] is None else Wizard_Card(observation["winning_card"])
+  game_state.serving_color = observation["serving_color"]
+  game_state.public_card_states = np.array(observation["public_card_states"], dtype=np.int8)
+  return game_state, hands
+
+
+def get_ai_decision(ai, observation: dict) -> int:
+  """
+  let an AI of this repository make the decision for an observation
+
+  inputs:
+  -------
+      ai (Wizard_Base_Ai): AI with the methods of `Wizard_Base_Ai`
+      observation (dict): observation as returned by `get_observation`
+
+  returns:
+  --------
+      int: trump color, bid or raw value of the card to play
+  """
+  game_state, hands = observation_to_game_state(observation)
+  event: str = observation["event"]
+  player_index: int = observation["player_index"]
+  if event == TRICK:
+    return ai.get_trick_action(game_state=game_state).raw_value
+  if event == BID:
+    return int(ai.get_prediction(player_index=player_index, game_state=game_state))
+  if event == TRUMP:
+    return int(ai.get_trump_color_choice(hands=hands, active_player=player_index, game_state=game_state))
+  raise ValueError(f"Unknown event: {event}")
+
+
+def decode_decision(engine: Game_Engine, decision: int):
+  """
+  check the decision of an external agent and convert it to the input of `Game_Engine.step`
+
+  inputs:
+  -------
+      engine (Game_Engine): engine waiting for the decision
+      decision (int): trump color, bid or raw value of a card
+
+  returns:
+  --------
+      int | Wizard_Card: decision for `engine.step`
+
+  raises:
+  -------
+      ValueError: if the decision is not allowed
+  """
+  event: str = engine.next_event
+  if event == TRICK:
+    hand: list[Wizard_Card] = engine.game_state.players_hands[engine.active_player]
+    for card in hand:
+      if card.raw_value == decision:
+        if check_action_invalid(card, hand, engine.game_state.serving_color):
+          break
+        return card
+    raise ValueError(f"Player {engine.active_player} may not play card {decision}.")
+  if event == BID:
+    if not isinstance(decision, int) or not 0 <= decision <= engine.game_state.round_number:
+      raise ValueError(f"Invalid bid of player {engine.active_player}: {decision}")
+    return decision
+  if event == TRUMP:
+    if not isinstance(decision, int) or not 0 <= decision <= 3:
+      raise ValueError(f"Invalid trump color of player {engine.active_player}: {decision}")
+    return decision
+  raise ValueError(f"The next event ({event}) is not a decision.")
+
+
+class In_Process_Agent():
+  """
+  agent that makes decisions with an AI object in this process
+  """
+  def __init__(self, ai, executor: Executor = None):
+    """
+    inputs:
+    -------
+        ai (Wizard_Base_Ai): AI with the methods of `Wizard_Base_Ai`
+        executor (Executor): executor (e.g. a `ThreadPoolExecutor`) to run slow AIs in while other games continue.
+            If `None`, the AI blocks the event loop during its decisions.
+    """
+    self.ai = ai
+    self.executor: Executor = executor
+    self._methods: dict = {
+        TRUMP: ai.get_trump_color_choice,
+        BID: ai.get_prediction,
+        TRICK: ai.get_trick_action}
+
+
+  async def get_decision(self, engine: Game_Engine):
+    method = self._methods[engine.next_event]
+    kwargs: dict = engine.get_decision_kwargs()
+    if self.executor is None:
+      return method(**kwargs)
+    return await asyncio.get_running_loop().run_in_executor(self.executor, lambda: method(**kwargs))
+
+
+  async def close(self) -> None:
+    pass
+
+
+class Stream_Agent():
+  """
+  base class of agents that use the JSON protocol of this module over a pair of streams.
+  Subclasses implement `_open_streams` and may extend `close`.
+  """
+  def __init__(self, decision_timeout_s: float = None):
+    """
+    inputs:
+    -------
+        decision_timeout_s (float): maximum time for a decision before `get_decision` raises a `TimeoutError`. `None` waits indefinitely.
+    """
+    self.decision_timeout_s: float = decision_timeout_s
+    self._reader: asyncio.StreamReader = None
+    self._writer: asyncio.StreamWriter = None
+    self._reply_task: asyncio.Task = None
+    self._start_lock: asyncio.Lock = asyncio.Lock()
+    self._pending: dict[int, asyncio.Future] = {}
+    self._next_request_id: int = 0
+
+
+  async def _open_streams(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    raise NotImplementedError
+
+
+  async def start(self) -> None:
+    """
+    connect to the agent. Called automatically by the first request.
+    """
+    async with self._start_lock:
+      if self._writer is not None:
+        return
+      self._reader, self._writer = await self._open_streams()
+      self._reply_task = asyncio.create_task(self._read_replies())
+
+
+  async def get_decision(self, engine: Game_Engine):
+    if self._writer is None:
+      await self.start()
+    if self._reply_task.done():
+      raise ConnectionError("The agent closed the connection.")
+    request_id: int = self._next_request_id
+    self._next_request_id += 1
+    reply: asyncio.Future = asyncio.get_running_loop().create_future()
+    self._pending[request_id] = reply
+    request: dict = {"id": request_id, "observation": get_observation(engine)}
+    self._writer.write((json.dumps(request) + "\n").encode())
+    await self._writer.drain()
+    try:
+      decision: int = await asyncio.wait_for(reply, self.decision_timeout_s)
+    finally:
+      self._pending.pop(request_id, None)
+    return decode_decision(engine, decision)
+
+
+  async def _read_replies(self) -> None:
+    """
+    pass each reply to the request with the same id until the agent closes the connection
+    """
+    try:
+      while line := await self._reader.readline():
+        reply: dict = json.loads(line)
+        future: asyncio.Future = self._pending.get(reply["id"])
+        if future is None or future.done():
+          continue
+        if "error" in reply:
+          future.set_exception(RuntimeError(f"Agent error: {reply['error']}"))
+        else:
+          future.set_result(reply["decision"])
+    finally:
+      for future in self._pending.values():
+        if not future.done():
+          future.set_exception(ConnectionError("The agent closed the connection."))
+
+
+  async def close(self) -> None:
+    if self._writer is None:
+      return
+    self._writer.close()
+    try:
+      await self._writer.wait_closed()
+    except ConnectionError:
+      pass
+    self._reply_task.cancel()
+    self._writer = None
+
+
+class Subprocess_Agent(Stream_Agent):
+  """
+  agent in a subprocess that reads requests from its stdin and writes replies to its stdout
+  """
+  def __init__(self, command: list[str], cwd: str = None, decision_timeout_s: float = None):
+    """
+    inputs:
+    -------
+        command (list[str]): program and arguments to start, e.g. `[sys.executable, "-m", "program_files.async_game_driver", "simple rule ai"]`
+        cwd (str): working directory of the subprocess
+        decision_timeout_s (float): maximum time for a decision. `None` waits indefinitely.
+    """
+    super().__init__(decision_timeout_s)
+    self.command: list[str] = command
+    self.cwd: str = cwd
+    self.process: asyncio.subprocess.Process = None
+
+
+  async def _open_streams(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    self.process = await asyncio.create_subprocess_exec(*self.command,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        cwd=self.cwd)
+    return self.process.stdout, self.process.stdin
+
+
+  async def close(self) -> None:
+    await super().close()
+    if self.process is not None:
+      await self.process.wait()
+      self.process = None
+
+
+class Socket_Agent(Stream_Agent):
+  """
+  agent behind a TCP server, e.g. started with `serve_agent_socket`
+  """
+  def __init__(self, host: str = "localhost", port: int = 6200, decision_timeout_s: float = None):
+    """
+    inputs:
+    -------
+        host (str): host name or IP address of the agent server
+        port (int): port of the agent server
+        decision_timeout_s (float): maximum time for a decision. `None` waits indefinitely.
+    """
+    super().__init__(decision_timeout_s)
+    self.host: str = host
+    self.port: int = port
+
+
+  async def _open_streams(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    return await asyncio.open_connection(self.host, self.port)
+
+
+async def play_game_async(
+    agents: list,
+    max_rounds: int = 20,
+    record_writer: Game_Record_Writer = None,
+    seat_ids: list[int] = None) -> np.ndarray:
+  """
+  play a game in which each seat awaits the decisions of its agent
+
+  inputs:
+  -------
+      agents (list): agent in each seat (objects with a coroutine `get_decision(engine)`)
+      max_rounds (int): maximum number of rounds
+      record_writer (Game_Record_Writer): writer to record the game in. `None` disables recording.
+      seat_ids (list[int]): id of the player in each seat. Only used for game records.
+
+  returns:
+  --------
+      np.ndarray: total points of each player
+  """
+  engine: Game_Engine = Game_Engine(len(agents), max_rounds=max_rounds, record_writer=record_writer, seat_ids=seat_ids)
+  step = engine.step
+  while engine.next_event != GAME_END:
+    if engine.next_event == DEAL:
+      # let other games continue even if all agents of this game decide without waiting
+      await asyncio.sleep(0)
+      step()
+    else:
+      step(await agents[engine.active_player].get_decision(engine))
+  return engine.game_state.players_total_points
+
+
+async def play_games_async(agents: list, n_games: int, max_rounds: int = 20, max_concurrent_games: int = None) -> np.ndarray:
+  """
+  play several games concurrently with the same agents in the same seats
+
+  inputs:
+  -------
+      agents (list): agent in each seat. Each agent plays in all games at once.
+      n_games (int): number of games to play
+      max_rounds (int): maximum number of rounds per game
+      max_concurrent_games (int): maximum number of games in progress at the same time. `None` starts all games at once.
+
+  returns:
+  --------
+      np.ndarray: total points of each player (columns) in each game (rows)
+  """
+  semaphore: asyncio.Semaphore = asyncio.Semaphore(n_games if max_concurrent_games is None else max_concurrent_games)
+  async def play_limited_game() -> np.ndarray:
+    async with semaphore:
+      return await play_game_async(agents, max_rounds=max_rounds)
+  return np.array(await asyncio.gather(*[play_limited_game() for _ in range(n_games)]))
+
+
+def run_games(agents: list, n_games: int, max_rounds: int = 20, max_concurrent_games: int = None) -> np.ndarray:
+  """
+  play games with `play_games_async` on a new event loop and close all agents afterwards.
+  Agents must be created for this call since streams can not be used on another event loop.
+
+  returns:
+  --------
+      np.ndarray: total points of each player (columns) in each game (rows)
+  """
+  async def run() -> np.ndarray:
+    try:
+      return await play_games_async(agents, n_games, max_rounds=max_rounds, max_concurrent_games=max_concurrent_games)
+    finally:
+      for agent in set(agents):
+        await agent.close()
+  return asyncio.run(run())
+
+
+def _answer_request(ai, line: bytes) -> bytes:
+  request: dict = json.loads(line)
+  try:
+    reply: dict = {"id": request["id"], "decision": get_ai_decision(ai, request["observation"])}
+  except Exception as error:
+    reply: dict = {"id": request["id"], "error": repr(error)}
+  return (json.dumps(reply) + "\n").encode()
+
+
+def serve_agent_stdio(ai) -> None:
+  """
+  answer requests from stdin with an AI until stdin is closed (the side of `Subprocess_Agent`)
+
+  inputs:
+  -------
+      ai (Wizard_Base_Ai): AI that makes the decisions
+  """
+  for line in sys.stdin.buffer:
+    sys.stdout.buffer.write(_answer_request(ai, line))
+    sys.stdout.buffer.flush()
+
+
+async def serve_agent_socket(ai, host: str = "localhost", port: int = 0) -> asyncio.AbstractServer:
+  """
+  start a TCP server that answers requests of any number of `Socket_Agent`s with an AI
+
+  inputs:
+  -------
+      ai (Wizard_Base_Ai): AI that makes the decisions
+      host (str): host name or IP address to listen on
+      port (int): port to listen on. Port 0 chooses a free port (see `server.sockets[0].getsockname()`).
+
+  returns:
+  --------
+      asyncio.AbstractServer: the running server
+  """
+  async def answer_requests(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+      while line := await reader.readline():
+        writer.write(_answer_request(ai, line))
+        await writer.drain()
+    finally:
+      writer.close()
+  return await asyncio.start_server(answer_requests, host, port)
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Run an AI as an external agent for `Subprocess_Agent` or `Socket_Agent`.")
+  parser.add_argument("ai_name", help="name of the AI in the AI registry (see `wizard_ai_classes.py`)")
+  parser.add_argument("--port", type=int, default=None, help="serve on this port on localhost instead of stdin and stdout")
+  parser.add_argument("--host", default="localhost", help="host name or IP address to listen on (only with --port)")
+  args = parser.parse_args()
+  from program_files.wizard_ais.wizard_ai_classes import ai_classes
+  ai = ai_classes[args.ai_name]
+  if args.port is None:
+    serve_agent_stdio(ai)
+  else:
+    async def serve() -> None:
+      server: asyncio.AbstractServer = await serve_agent_socket(ai, args.host, args.port)
+      async with server:
+        await server.serve_forever()
+    asyncio.run(serve())
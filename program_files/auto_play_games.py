@@ -7,15 +7,18 @@ last edited: 26.05.2022
 author: Sebastian Jost
 version 0.2
 """
-import tkinter as tk
 import multiprocessing as mp
+from typing import TYPE_CHECKING
 
 import numpy as np
-import matplotlib.pyplot as plt
 
-from program_files.game_state import Game_State
-from program_files.helper_functions import get_hands
-from program_files.wizard_ais.wizard_ai_classes import ai_trump_chooser_methods, ai_bids_chooser_methods, ai_trick_play_methods
+from program_files.game_engine import Game_Engine
+from program_files.game_records import Game_Record_Writer, get_record_writer
+from program_files.profiling import Phase_Timer
+from program_files.deal_bank import Deal_Bank
+from program_files.wizard_ais.wizard_ai_classes import Mixed_Ai_Player
+if TYPE_CHECKING: # tkinter and matplotlib are only needed for plotting
+  import tkinter as tk
 
 
 class Wizard_Auto_Play():
@@ -24,7 +27,10 @@ class Wizard_Auto_Play():
                ai_player_types: list,
                limit_choices: bool = False,
                max_rounds: int = 20,
-               shuffle_players: bool = False):
+               shuffle_players: bool = False,
+               record_dir: str = None,
+               timer: Phase_Timer = None,
+               deal_bank: Deal_Bank = None):
     """
     initialize auto-play setup
 
@@ -35,12 +41,21 @@ class Wizard_Auto_Play():
         max_rounds (int): number of rounds to be played
         ai_player_choices (list) of (dict): settings for player names  to use AI to calculate actions during the game.
         shuffle_players (bool): whether to randomize the order of players between games for more general results.
+        record_dir (str): directory to record all played games in (see `game_records.py`). `None` disables recording.
+        timer (Phase_Timer): timer to record the time spent in each phase of the game and by each AI. `None` disables profiling.
+        deal_bank (Deal_Bank): pre-dealt games to play instead of shuffling cards. Game `n` uses game `n` of the bank
+          with the bank's seat order and starting player of that game. `None` shuffles new cards for every round.
     """
     self.n_players = n_players
     self.limit_choices = limit_choices
     self.n_rounds = min(max_rounds, 60 // self.n_players) + 1
     self.ai_player_types = ai_player_types
     self.shuffle_players = shuffle_players
+    self.record_dir = record_dir
+    self.timer = timer
+    self.deal_bank = deal_bank
+    if deal_bank is not None and (deal_bank.n_players != n_players or deal_bank.n_rounds < self.n_rounds - 1):
+      raise ValueError(f"The deal bank has games of {deal_bank.n_rounds} rounds for {deal_bank.n_players} players.")
 
     self.games_played = 0
     self.set_history_variables(n_players, 0)
@@ -87,11 +102,13 @@ class Wizard_Auto_Play():
 
     for n in range(n_games_start, n_games_end):
       if self.shuffle_players:
-        np.random.shuffle(self.random_order)
+        self._shuffle_seats(n)
         ai_player_types = [self.ai_player_types[i] for i in self.random_order]
+        seat_ids = self.random_order
       else:
         ai_player_types = self.ai_player_types
-      player_scores = self.play_game(ai_player_types)
+        seat_ids = None
+      player_scores = self.play_game(ai_player_types, seat_ids, self.timer, game_index=n)
       # update history variables
       self.games_played += 1
       if self.shuffle_players:
@@ -104,19 +121,34 @@ class Wizard_Auto_Play():
         self.average_scores[n, :] = self._score_sums / self.games_played
         self._win_counts += player_scores == np.max(player_scores)
         self.win_ratios[n, :] = self._win_counts / np.sum(self._win_counts)
+    if self.record_dir is not None:
+      get_record_writer(self.record_dir).flush()
 
     return self.average_scores, self.win_ratios
 
 
   def play_record_game(self, n: int) -> np.ndarray:
+    """
+    play a single game and return the final scores of the players.
+    If profiling is enabled, the times of this game are returned as a new `Phase_Timer` as well.
+    """
     if self.shuffle_players:
-      np.random.shuffle(self.random_order)
+      self._shuffle_seats(n)
       ai_player_types = [self.ai_player_types[i] for i in self.random_order]
+      seat_ids = self.random_order
     else:
       ai_player_types = self.ai_player_types
-    player_scores = self.play_game(ai_player_types)
-    player_scores[self.random_order] = player_scores # record results in proper order
-    return player_scores
+      seat_ids = None
+    game_timer: Phase_Timer = None if self.timer is None else self.timer.new_like()
+    player_scores = self.play_game(ai_player_types, seat_ids, game_timer, game_index=n)
+    if self.shuffle_players:
+      # record results in proper order. Assigning the scores into themselves through the index would overwrite scores before they are read.
+      seat_scores = player_scores
+      player_scores = np.empty_like(seat_scores)
+      player_scores[self.random_order] = seat_scores
+    if game_timer is None:
+      return player_scores
+    return player_scores, game_timer
 
 
   def auto_play_multi_threaded(self, 
@@ -154,6 +186,10 @@ class Wizard_Auto_Play():
     new_results = process_pool.map(self.play_record_game, range(n_games_start, n_games_end))
     process_pool.close()
     process_pool.join()
+    if self.timer is not None:
+      new_results, game_timers = zip(*new_results)
+      for game_timer in game_timers:
+        self.timer.merge(game_timer)
 
     # update history variables
     for i, player_scores in enumerate(new_results):
@@ -174,62 +210,44 @@ class Wizard_Auto_Play():
     return self.average_scores, self.win_ratios
 
 
-  def play_game(self, ai_player_types: list):
+  def _shuffle_seats(self, n: int) -> None:
     """
-    play one game with the rules set in `self`
+    set `self.random_order` to the player in each seat of game `n`: the seat order of the deal bank or a random order
     """
-    game = Game_State(n_players=self.n_players, verbosity=0)
-    for round_nbr in range(1, self.n_rounds):
-      self.play_round(round_nbr, game, self.limit_choices, ai_player_types)
-    return game.players_total_points
+    if self.deal_bank is not None:
+      self.random_order = self.deal_bank.get_seat_order(n)
+    else:
+      np.random.shuffle(self.random_order)
 
 
-  def play_round(self, round_nbr: int, game: Game_State, limit_choices: bool, ai_player_types: list):
+  def play_game(self, ai_player_types: list, seat_ids: list = None, timer: Phase_Timer = None, game_index: int = 0):
     """
-    play the given round with `self.n_players` players.
-    """
-    # generate hands and determine trump
-    # print(f"Starting round {round_nbr}")
-    hands, trump_card = get_hands(game.n_players, round_nbr)
-    if trump_card is None:
-      trump_color = -1
-    elif trump_card.value != 14:
-      trump_color = trump_card.color
-    else:  # trump card is a wizard -> player who "gave cards" determines trump
-      player_mode = ai_player_types[game.round_starting_player]["trump_choice_var"]
-      trump_color = ai_trump_chooser_methods[player_mode](
-          hands=hands,
-          active_player=game.round_starting_player,
-          game_state=game)  # game.round_starting_player(
-      # game.round_starting_player,
-      # hands[game.round_starting_player])
-    game.start_round(hands, trump_card, trump_color)
-    # handle player predictions
-    predictions = np.zeros(game.n_players, dtype=np.int8)
-    player_index = game.round_starting_player
-    for _ in range(self.n_players):
-      player_mode = ai_player_types[game.trick_active_player]["bids_choice_var"]
-      ai_bid = ai_bids_chooser_methods[player_mode](
-          player_index=player_index,
-          game_state=game)
-      predictions[player_index] = ai_bid
-      player_index = (player_index + 1) % game.n_players
-    game.set_predictions(predictions)
-    # play tricks of the round
-    while game.tricks_to_be_played > 0:
-      self.play_trick(game, ai_player_types)
-
-
-  def play_trick(self, game, ai_player_types):
-    """
-    play one trick and advance the game object accordingly
+    play one game with the rules set in `self`
+
+    inputs:
+    -------
+        ai_player_types (list[dict]): AI types of the player in each seat
+        seat_ids (list[int]): index of the configured player in each seat. Only used for game records.
+        timer (Phase_Timer): timer to record the time of each phase in. `None` disables profiling.
+        game_index (int): index of the game in `self.deal_bank`. It determines the deal and the starting player. Ignored without a deal bank.
     """
-    game.start_trick()
-    for _ in range(game.n_players):
-      player_mode = ai_player_types[game.trick_active_player]["get_trick_action"]
-      action = ai_trick_play_methods[player_mode](
-          game_state=game)
-      game.perform_action(action)
+    if self.record_dir is None:
+      record_writer: Game_Record_Writer = None
+    else:
+      record_writer: Game_Record_Writer = get_record_writer(self.record_dir)
+    players: list[Mixed_Ai_Player] = [
+        Mixed_Ai_Player(player_types["trump_choice_var"], player_types["bids_choice_var"], player_types["get_trick_action"])
+        for player_types in ai_player_types]
+    engine = Game_Engine(
+        self.n_players,
+        max_rounds=self.n_rounds - 1,
+        players=players,
+        record_writer=record_writer,
+        seat_ids=seat_ids,
+        timer=timer,
+        deal_function=None if self.deal_bank is None else self.deal_bank.get_dealer(game_index),
+        starting_player=None if self.deal_bank is None else self.deal_bank.get_starting_player(game_index))
+    return engine.play_game()
 
   def get_player_labels(self):
     """
@@ -247,7 +265,7 @@ class Wizard_Auto_Play():
       player_labels[i] = player_label
     return player_labels
 
-  def plot_results(self, tkinter_embedded: tk.Frame = None, highlight_final_value=True):
+  def plot_results(self, tkinter_embedded: "tk.Frame" = None, highlight_final_value=True):
     """
     plot average scores and win ratios currently saved
 
@@ -255,6 +273,7 @@ class Wizard_Auto_Play():
     -------
       tkinter_embedded (tkinter.Frame): a tkinter frame where the plot is to be shown. If none is given, the plot is shown in a seperate window created by matplotlib.
     """
+    import matplotlib.pyplot as plt
     player_labels = self.get_player_labels()
     colors = ["#22dd22", "#00aaaa", "#5588ff", "#bb00bb", "#dd2222", "#ff8800"]
     if tkinter_embedded is None:
@@ -0,0 +1,105 @@
+"""
+This module implements the covariance matrix adaptation evolution strategy (CMA-ES) with an ask-and-tell interface.
+It only needs NumPy. The update rules and default parameters follow N. Hansen, "The CMA Evolution Strategy: A Tutorial" (2016).
+
+CMA-ES samples candidates from a multivariate normal distribution and adapts its mean, step size and covariance matrix
+from the ranking of the candidates. Since only the ranking is used, the fitness may be relative (e.g. scores of games between the candidates).
+"""
+import numpy as np
+
+
+class CMA_ES():
+  """
+  maximize a function of a real vector with CMA-ES
+  """
+  def __init__(self,
+      initial_mean: np.ndarray,
+      initial_step_size: float = 0.3,
+      population_size: int = None,
+      rng: np.random.Generator = None):
+    """
+    inputs:
+    -------
+        initial_mean (np.ndarray): initial mean of the search distribution
+        initial_step_size (float): initial standard deviation of the search distribution in each coordinate.
+            Coordinates should be scaled so that one step size is a sensible change for all of them.
+        population_size (int): number of candidates per generation. Defaults to `4 + 3 * ln(n_dimensions)`.
+        rng (np.random.Generator): random number generator. A new one is created if `None`.
+    """
+    self.mean: np.ndarray = np.array(initial_mean, dtype=float)
+    self.n_dimensions: int = len(self.mean)
+    n: int = self.n_dimensions
+    self.step_size: float = initial_step_size
+    self.population_size: int = 4 + int(3 * np.log(n)) if population_size is None else population_size
+    self.rng: np.random.Generator = np.random.default_rng() if rng is None else rng
+    # recombination weights of the best half of the candidates
+    self.n_parents: int = self.population_size // 2
+    weights: np.ndarray = np.log(self.n_parents + 0.5) - np.log(np.arange(1, self.n_parents + 1))
+    self.weights: np.ndarray = weights / np.sum(weights)
+    self.mu_eff: float = 1 / np.sum(self.weights**2)
+    # adaptation rates
+    self.c_c: float = (4 + self.mu_eff / n) / (n + 4 + 2 * self.mu_eff / n)
+    self.c_sigma: float = (self.mu_eff + 2) / (n + self.mu_eff + 5)
+    self.c_1: float = 2 / ((n + 1.3)**2 + self.mu_eff)
+    self.c_mu: float = min(1 - self.c_1, 2 * (self.mu_eff - 2 + 1 / self.mu_eff) / ((n + 2)**2 + self.mu_eff))
+    self.damping: float = 1 + 2 * max(0, np.sqrt((self.mu_eff - 1) / (n + 1)) - 1) + self.c_sigma
+    # expected length of a standard normal vector
+    self.chi_n: float = np.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n**2))
+    # state of the search distribution
+    self.p_c: np.ndarray = np.zeros(n)
+    self.p_sigma: np.ndarray = np.zeros(n)
+    self.covariance: np.ndarray = np.eye(n)
+    self.eigenvectors: np.ndarray = np.eye(n)
+    self.eigenvalue_roots: np.ndarray = np.ones(n)
+    self.n_generations: int = 0
+    self._steps: np.ndarray = None
+
+
+  def ask(self) -> np.ndarray:
+    """
+    sample the candidates of the next generation
+
+    returns:
+    --------
+        np.ndarray: candidates of shape (population_size, n_dimensions)
+    """
+    normal_samples: np.ndarray = self.rng.standard_normal((self.population_size, self.n_dimensions))
+    # steps y = B D z, candidates x = m + sigma * y
+    self._steps = (normal_samples * self.eigenvalue_roots) @ self.eigenvectors.T
+    return self.mean + self.step_size * self._steps
+
+
+  def tell(self, fitness: np.ndarray) -> None:
+    """
+    update the search distribution with the fitness of the candidates returned by the last call of `ask`
+
+    inputs:
+    -------
+        fitness (np.ndarray): fitness of each candidate (higher is better)
+    """
+    if self._steps is None:
+      raise ValueError("`ask` has to be called before `tell`.")
+    n: int = self.n_dimensions
+    order: np.ndarray = np.argsort(-np.asarray(fitness), kind="stable")
+    parent_steps: np.ndarray = self._steps[order[:self.n_parents]]
+    mean_step: np.ndarray = self.weights @ parent_steps
+    self.mean = self.mean + self.step_size * mean_step
+    self.n_generations += 1
+    # step size path uses C^(-1/2) * mean_step
+    inverse_root_step: np.ndarray = self.eigenvectors @ ((self.eigenvectors.T @ mean_step) / self.eigenvalue_roots)
+    self.p_sigma = (1 - self.c_sigma) * self.p_sigma \
+        + np.sqrt(self.c_sigma * (2 - self.c_sigma) * self.mu_eff) * inverse_root_step
+    p_sigma_norm: float = np.linalg.norm(self.p_sigma)
+    # stall the covariance path if the step size path is long (prevents a too fast increase of C after step size increases)
+    h_sigma: float = float(p_sigma_norm / np.sqrt(1 - (1 - self.c_sigma)**(2 * self.n_generations)) / self.chi_n < 1.4 + 2 / (n + 1))
+    self.p_c = (1 - self.c_c) * self.p_c + h_sigma * np.sqrt(self.c_c * (2 - self.c_c) * self.mu_eff) * mean_step
+    rank_mu_update: np.ndarray = (parent_steps.T * self.weights) @ parent_steps
+    self.covariance = (1 - self.c_1 - self.c_mu) * self.covariance \
+        + self.c_1 * (np.outer(self.p_c, self.p_c) + (1 - h_sigma) * self.c_c * (2 - self.c_c) * self.covariance) \
+        + self.c_mu * rank_mu_update
+    self.step_size *= np.exp((self.c_sigma / self.damping) * (p_sigma_norm / self.chi_n - 1))
+    # update B and D
+    self.covariance = (self.covariance + self.covariance.T) / 2
+    eigenvalues, self.eigenvectors = np.linalg.eigh(self.covariance)
+    self.eigenvalue_roots = np.sqrt(np.maximum(eigenvalues, 1e-20))
+    self._steps = None
@@ -0,0 +1,146 @@
+"""
+This module maps decision points of wizard to a canonical form under permutations of the four colors.
+
+Apart from the trump color and the serving color, all colors follow the same rules. Game states that only differ by a
+permutation of colors are therefore equivalent, and caches keyed by the canonical form are up to 24 times smaller.
+This only pays off for caches whose entries repeat across games and whose values are slower to compute than the canonical form
+(e.g. search results). The GUI hint cache is cleared every round, and the hand statistics are faster to compute than their
+canonical key (see `hand_statistics.py`), so neither uses it.
+
+In the canonical form, the trump color is color 0 and the serving color (if it is neither the trump color nor unknown) is the next color.
+The remaining colors are ordered by the states of their cards (played, in the player's own hand or unknown, see `get_color_permutation`),
+so equivalent game states have exactly the same canonical form.
+Colors are permuted by moving whole blocks of 15 raw values, so wizards and jesters keep their position within their block
+and every permutation is a bijection on raw values. Actions chosen in the canonical game state are mapped back with the inverse permutation.
+"""
+import numpy as np
+
+from program_files.wizard_card import Wizard_Card
+from program_files.game_state import Game_State
+from program_files.action_values import copy_game_state
+
+# one shared card object for each raw value
+_cards: tuple = tuple(Wizard_Card(raw_value) for raw_value in range(60))
+# marker for cards in the player's own hand in the card states of a color
+_OWN_CARD: int = 100
+
+
+def get_color_permutation(game_state: Game_State, player_index: int = None) -> tuple[int, int, int, int]:
+  """
+  return the permutation that maps the colors of a decision point to its canonical colors
+
+  inputs:
+  -------
+      game_state (Game_State): game state during bidding or a trick
+      player_index (int): player who makes the decision. Defaults to the active player of the trick.
+
+  returns:
+  --------
+      tuple[int, int, int, int]: canonical color of each color (0-3)
+  """
+  if player_index is None:
+    player_index = game_state.trick_active_player
+  # states of all cards with the cards in the own hand marked
+  card_states: list[int] = game_state.public_card_states.tolist()
+  for card in game_state.players_hands[player_index]:
+    card_states[card.raw_value] = _OWN_CARD
+  fixed_colors: list[int] = []
+  if game_state.trump_color in (0, 1, 2, 3):
+    fixed_colors.append(game_state.trump_color)
+  # the serving color of the last trick is meaningless during bidding
+  serving_color: int = game_state.serving_color if game_state.n_predictions == game_state.n_players else None
+  if serving_color in (0, 1, 2, 3) and serving_color not in fixed_colors:
+    fixed_colors.append(serving_color)
+  # colors with equal card states are interchangeable, so their order does not matter
+  other_colors: list[int] = sorted((color for color in range(4) if color not in fixed_colors),
+      key=lambda color: card_states[15 * color:15 * color + 15])
+  permutation: list[int] = [0] * 4
+  for canonical_color, color in enumerate(fixed_colors + other_colors):
+    permutation[color] = canonical_color
+  return tuple(permutation)
+
+
+def invert_permutation(permutation: tuple[int, int, int, int]) -> tuple[int, int, int, int]:
+  """
+  return the inverse of a color permutation, e.g. to map actions from canonical colors back to the actual colors
+  """
+  inverse: list[int] = [0] * 4
+  for color, canonical_color in enumerate(permutation):
+    inverse[canonical_color] = color
+  return tuple(inverse)
+
+
+def permute_raw_value(raw_value: int, permutation: tuple[int, int, int, int]) -> int:
+  """
+  return the raw value of a card after permuting the colors
+  """
+  return 15 * permutation[raw_value // 15] + raw_value % 15
+
+
+def permute_card(card: Wizard_Card, permutation: tuple[int, int, int, int]) -> Wizard_Card:
+  """
+  return a card after permuting the colors. `None` is returned unchanged.
+  """
+  if card is None:
+    return None
+  return _cards[permute_raw_value(card.raw_value, permutation)]
+
+
+def _permute_color(color: int, permutation: tuple[int, int, int, int]) -> int:
+  """
+  permute a color. No trump or serving color (-1 or `None`) is returned unchanged.
+  """
+  if color in (0, 1, 2, 3):
+    return permutation[color]
+  return color
+
+
+def permute_game_state(game_state: Game_State, permutation: tuple[int, int, int, int]) -> Game_State:
+  """
+  return a copy of a game state with permuted colors. Hands are sorted like dealt hands
+  (ties between jesters and between wizards are broken by raw value, so equivalent hands are equal).
+
+  inputs:
+  -------
+      game_state (Game_State): game state to permute. It is not changed.
+      permutation (tuple[int, int, int, int]): new color of each color
+
+  returns:
+  --------
+      Game_State: permuted copy of `game_state`
+  """
+  permuted_state: Game_State = copy_game_state(game_state)
+  permuted_state.trump_card = permute_card(game_state.trump_card, permutation)
+  permuted_state.trump_color = _permute_color(game_state.trump_color, permutation)
+  permuted_state.serving_color = _permute_color(game_state.serving_color, permutation)
+  permuted_state.winning_card = permute_card(game_state.winning_card, permutation)
+  permuted_state.players_hands = [
+      sorted((permute_card(card, permutation) for card in hand), key=lambda card: (-card.color, card.value, card.raw_value))
+      for hand in game_state.players_hands]
+  raw_value_map: np.ndarray = np.array([permute_raw_value(raw_value, permutation) for raw_value in range(60)])
+  permuted_state.public_card_states[raw_value_map] = game_state.public_card_states
+  return permuted_state
+
+
+def get_canonical_game_state(game_state: Game_State, player_index: int = None) -> tuple[Game_State, tuple[int, int, int, int]]:
+  """
+  return the canonical form of a decision point
+
+  inputs:
+  -------
+      game_state (Game_State): game state during bidding or a trick. It is not changed.
+      player_index (int): player who makes the decision. Defaults to the active player of the trick.
+
+  returns:
+  --------
+      Game_State: copy of `game_state` in canonical colors
+      tuple[int, int, int, int]: permutation from the actual to the canonical colors.
+          Map actions back with `invert_permutation`.
+  """
+  permutation: tuple[int, int, int, int] = get_color_permutation(game_state, player_index)
+  canonical_state: Game_State = permute_game_state(game_state, permutation)
+  if game_state.n_predictions < game_state.n_players:
+    # remove the last trick of the previous round during bidding
+    canonical_state.serving_color = None
+    canonical_state.winning_card = None
+  return canonical_state, permutation
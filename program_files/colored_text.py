@@ -1,5 +1,4 @@
 import colored
-import matplotlib.colors as mplcolors
 
 
 def colored_text(text, color):
@@ -0,0 +1,228 @@
+"""
+this module implements deal banks: files of pre-dealt games that replace shuffling and sorting cards (`get_hands`) during evaluation.
+When all candidates of an evaluation draw their games from the same bank, they are compared on exactly the same deals,
+which lowers the variance of the comparison.
+
+Seats and the player who starts the game are derived from the game index as well (`get_seat_order`, `get_starting_player`),
+so a candidate gets the same hands and bidding position in game `n` of every evaluation. Over `n * n` consecutive games,
+every player sits in every seat once with each starting player.
+
+A deal bank file starts with an 8 byte header: `DEAL_BANK_FILE_HEADER` (5 bytes), the number of players `n`,
+the number of rounds per game `R` and a padding byte. It is followed by the deals of each game, all of the same size,
+so the file can be memory-mapped as a 2D array and any game can be read without an index.
+The deal of a game is laid out as follows (unsigned bytes):
+    for each round `r` (starting at 1):
+      - `n * r` raw values of the dealt cards: the sorted hand of each player in seat order
+      - raw value of the trump card (255 = no trump card)
+
+usage:
+  python -m program_files.deal_bank deals_4p.wdb 4 100000 --seed 0
+  Genetic_Auto_Play(4, ai_instances, deal_bank=Deal_Bank("deals_4p.wdb"))
+"""
+import argparse
+from typing import Callable
+
+import numpy as np
+
+from program_files.wizard_card import Wizard_Card
+
+DEAL_BANK_FILE_HEADER: bytes = b"WZDB\x01"
+DEAL_BANK_FILE_EXTENSION: str = ".wdb"
+NO_CARD: int = 255
+# games are dealt in blocks with their own random number generator,
+# so a bank only depends on the seed and smaller banks are prefixes of larger ones
+DEAL_BLOCK_SIZE: int = 4096
+
+# one shared card object for each raw value
+_cards: tuple = tuple(Wizard_Card(raw_value) for raw_value in range(60))
+# sort key of each raw value that orders hands like `sorted` orders `Wizard_Card`s: by color (descending), then value.
+# Jesters and wizards have color -1.
+_sort_keys: np.ndarray = np.array([-card.color * 16 + card.value for card in _cards], dtype=np.int8)
+
+
+def get_deal_size(n_players: int, n_rounds: int) -> int:
+  """
+  number of bytes of one game in a deal bank
+
+  inputs:
+  -------
+      n_players (int): number of players
+      n_rounds (int): number of rounds per game
+
+  returns:
+  --------
+      int: size of a game's deal in bytes
+  """
+  return n_players * n_rounds * (n_rounds + 1) // 2 + n_rounds
+
+
+def deal_games(n_players: int, n_rounds: int, n_games: int, rng: np.random.Generator) -> np.ndarray:
+  """
+  deal the cards of all rounds of several games
+
+  inputs:
+  -------
+      n_players (int): number of players
+      n_rounds (int): number of rounds per game
+      n_games (int): number of games
+      rng (np.random.Generator): random number generator to shuffle the decks
+
+  returns:
+  --------
+      np.ndarray: deals of all games (shape: (n_games, get_deal_size(n_players, n_rounds)), dtype: uint8)
+  """
+  deals: np.ndarray = np.empty((n_games, get_deal_size(n_players, n_rounds)), dtype=np.uint8)
+  offset: int = 0
+  for round_nbr in range(1, n_rounds + 1):
+    decks: np.ndarray = rng.permuted(np.tile(np.arange(60, dtype=np.uint8), (n_games, 1)), axis=1)
+    n_cards: int = n_players * round_nbr
+    hands: np.ndarray = decks[:, :n_cards].reshape(n_games, n_players, round_nbr)
+    # stable sort keeps jesters and wizards in dealing order like `sorted`
+    hand_order: np.ndarray = np.argsort(_sort_keys[hands], axis=2, kind="stable")
+    deals[:, offset:offset + n_cards] = np.take_along_axis(hands, hand_order, axis=2).reshape(n_games, n_cards)
+    deals[:, offset + n_cards] = decks[:, n_cards] if n_cards < 60 else NO_CARD
+    offset += n_cards + 1
+  return deals
+
+
+def write_deal_bank(
+    file_path: str,
+    n_players: int,
+    n_games: int,
+    max_rounds: int = 20,
+    seed: int = None) -> None:
+  """
+  deal `n_games` games and save them as a deal bank. An existing file is overwritten.
+
+  inputs:
+  -------
+      file_path (str): path of the deal bank file
+      n_players (int): number of players
+      n_games (int): number of games to deal
+      max_rounds (int): maximum number of rounds per game. Games have fewer rounds if there are not enough cards.
+      seed (int): seed of the random number generators. A random seed is used if `None`.
+  """
+  n_rounds: int = min(max_rounds, 60 // n_players)
+  entropy: int = np.random.SeedSequence(seed).entropy
+  with open(file_path, "wb") as file:
+    file.write(DEAL_BANK_FILE_HEADER + bytes([n_players, n_rounds, 0]))
+    for block_index, start in enumerate(range(0, n_games, DEAL_BLOCK_SIZE)):
+      rng: np.random.Generator = np.random.default_rng([entropy, block_index])
+      # the last block is dealt completely as well, so its games do not depend on `n_games`
+      file.write(deal_games(n_players, n_rounds, DEAL_BLOCK_SIZE, rng)[:n_games - start].tobytes())
+
+
+class Deal_Bank():
+  """
+  read-only access to a memory-mapped deal bank file
+  """
+  def __init__(self, file_path: str):
+    """
+    inputs:
+    -------
+        file_path (str): path of a deal bank file (see `write_deal_bank`)
+    """
+    self.file_path: str = file_path
+    data: np.ndarray = np.memmap(file_path, dtype=np.uint8, mode="r")
+    if data[:5].tobytes() != DEAL_BANK_FILE_HEADER:
+      raise ValueError(f"{file_path} is not a deal bank file.")
+    self.n_players: int = int(data[5])
+    self.n_rounds: int = int(data[6])
+    deal_size: int = get_deal_size(self.n_players, self.n_rounds)
+    self.deals: np.ndarray = data[8:].reshape(-1, deal_size)
+    # offset of each round in a game's deal
+    self._round_offsets: list[int] = [get_deal_size(self.n_players, round_nbr - 1) for round_nbr in range(1, self.n_rounds + 1)]
+
+
+  def __len__(self) -> int:
+    return self.deals.shape[0]
+
+
+  def __getstate__(self) -> dict:
+    # workers open the file themselves instead of receiving a copy of the deals
+    return {"file_path": self.file_path}
+
+  def __setstate__(self, state: dict) -> None:
+    self.__init__(state["file_path"])
+
+
+  def get_hands(self, game_index: int, round_nbr: int) -> tuple[list[list[Wizard_Card]], Wizard_Card]:
+    """
+    return the hands and trump card of a round like `helper_functions.get_hands`
+
+    inputs:
+    -------
+        game_index (int): index of the game in the bank. Indices larger than the bank wrap around.
+        round_nbr (int): round number (starting at 1)
+
+    returns:
+    --------
+        list[list[Wizard_Card]]: sorted hand of each player
+        Wizard_Card: trump card or `None` if all cards were dealt
+    """
+    offset: int = self._round_offsets[round_nbr - 1]
+    raw_values: list[int] = self.deals[game_index % len(self), offset:offset + self.n_players * round_nbr + 1].tolist()
+    hands: list[list[Wizard_Card]] = [[_cards[raw_value] for raw_value in raw_values[i * round_nbr:(i + 1) * round_nbr]]
+        for i in range(self.n_players)]
+    trump_card: Wizard_Card = None if raw_values[-1] == NO_CARD else _cards[raw_values[-1]]
+    return hands, trump_card
+
+
+  def get_seat_order(self, game_index: int) -> np.ndarray:
+    """
+    return the player in each seat of a game. Players rotate by one seat each game.
+
+    inputs:
+    -------
+        game_index (int): index of the game in the bank
+
+    returns:
+    --------
+        np.ndarray: index of the player in each seat
+    """
+    return (np.arange(self.n_players) - game_index) % self.n_players
+
+
+  def get_starting_player(self, game_index: int) -> int:
+    """
+    return the seat that starts the first round of a game. It changes every `n_players` games,
+    so it cycles independently of the seat rotation of `get_seat_order`.
+
+    inputs:
+    -------
+        game_index (int): index of the game in the bank
+
+    returns:
+    --------
+        int: seat of the first bidder of round 1
+    """
+    return game_index // self.n_players % self.n_players
+
+
+  def get_dealer(self, game_index: int) -> Callable:
+    """
+    return a function with the signature of `helper_functions.get_hands` that deals the rounds of one game of the bank,
+    e.g. as `deal_function` of a `Game_Engine`
+
+    inputs:
+    -------
+        game_index (int): index of the game in the bank. Indices larger than the bank wrap around.
+
+    returns:
+    --------
+        Callable: function (n_players, round_nbr) -> (hands, trump card)
+    """
+    def deal(n_players: int, round_nbr: int) -> tuple[list[list[Wizard_Card]], Wizard_Card]:
+      return self.get_hands(game_index, round_nbr)
+    return deal
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Deal games and save them as a deal bank.")
+  parser.add_argument("file_path", help=f"path of the deal bank file (usually with extension {DEAL_BANK_FILE_EXTENSION})")
+  parser.add_argument("n_players", type=int, help="number of players")
+  parser.add_argument("n_games", type=int, help="number of games to deal")
+  parser.add_argument("--max_rounds", type=int, default=20, help="maximum number of rounds per game")
+  parser.add_argument("--seed", type=int, default=None, help="seed of the random number generator")
+  args = parser.parse_args()
+  write_deal_bank(args.file_path, args.n_players, args.n_games, args.max_rounds, args.seed)
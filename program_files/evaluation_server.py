@@ -0,0 +1,333 @@
+"""
+This module implements a work-queue server to play evaluation games on the cores of several machines.
+
+An `Evaluation_Coordinator` listens on a TCP socket (`multiprocessing.connection`, authenticated with a shared key).
+Any number of workers on any host connect to it, pull jobs (a function, its inputs and a random seed), and send back the results.
+The coordinator's `map` method is a drop-in replacement for `multiprocessing.Pool.map`,
+so it can be passed as `process_pool` to `evaluate_population`, `train_genetic_ai` or `Genetic_Auto_Play.auto_play_multi_threaded`.
+If a worker disconnects or does not answer within `job_timeout_s`, its job is sent to another worker.
+`map` raises an error instead of waiting forever if the coordinator is closed, if no worker is connected for `no_worker_timeout_s`
+or if the results do not arrive within its `timeout_s`.
+
+Jobs are pickled, so workers need the same version of this repository and must be started from its root directory.
+Only use the server in trusted networks: anyone with the key can run code on the workers.
+
+usage:
+  # on the training machine
+  coordinator = Evaluation_Coordinator(("0.0.0.0", 6100), authkey=b"secret")
+  train_genetic_ai(population, process_pool=coordinator, ...)
+  # on each worker machine (in the repository root)
+  python -m program_files.evaluation_server training-host 6100 --authkey secret --n_processes 8
+"""
+import time
+import queue
+import pickle
+import random
+import argparse
+import threading
+import traceback
+import multiprocessing as mp
+from multiprocessing.connection import Listener, Client, Connection
+from typing import Any, Callable, Iterable
+
+import numpy as np
+
+
+class Evaluation_Coordinator():
+  """
+  serve jobs to remote workers and collect their results
+  """
+  def __init__(self,
+      address: tuple[str, int] = ("localhost", 0),
+      authkey: bytes = None,
+      chunksize: int = 1,
+      job_timeout_s: float = None,
+      max_retries: int = 3,
+      no_worker_timeout_s: float = None,
+      seed: int = None):
+    """
+    start listening for workers
+
+    inputs:
+    -------
+        address (tuple[str, int]): host and port to listen on. Port 0 chooses a free port (see `self.address`).
+        authkey (bytes): shared key that workers need to connect
+        chunksize (int): default number of inputs per job
+        job_timeout_s (float): maximum time a worker may take for a job before it is considered lost. `None` waits indefinitely.
+        max_retries (int): maximum number of times a job is resent after losing a worker before `map` fails
+        no_worker_timeout_s (float): maximum time `map` waits while no worker is connected before it fails. `None` waits indefinitely.
+        seed (int): seed for the random seeds sent with each job. A random seed is used if `None`.
+    """
+    if authkey is None:
+      raise ValueError("An authkey is required since workers execute the jobs they receive.")
+    self.authkey: bytes = authkey
+    self.chunksize: int = chunksize
+    self.job_timeout_s: float = job_timeout_s
+    self.max_retries: int = max_retries
+    self.no_worker_timeout_s: float = no_worker_timeout_s
+    self.rng: np.random.Generator = np.random.default_rng(seed)
+    self.listener: Listener = Listener(address, authkey=authkey)
+    self.address: tuple[str, int] = self.listener.address
+    self.n_workers: int = 0
+    self._closed: bool = False
+    self._next_job_id: int = 0
+    # jobs: (job_id, payload, seed, n_retries)
+    self._jobs: queue.Queue = queue.Queue()
+    self._results: dict[int, tuple[str, Any]] = {}
+    # jobs of running `map` calls. Jobs of failed calls are skipped by the workers.
+    self._pending_job_ids: set[int] = set()
+    self._results_changed: threading.Condition = threading.Condition()
+    self._accept_thread: threading.Thread = threading.Thread(target=self._accept_workers, daemon=True)
+    self._accept_thread.start()
+
+
+  def __enter__(self) -> "Evaluation_Coordinator":
+    return self
+
+  def __exit__(self, *_) -> None:
+    self.close()
+
+
+  def _accept_workers(self) -> None:
+    """
+    accept new workers and serve each of them in a separate thread
+    """
+    while not self._closed:
+      try:
+        connection: Connection = self.listener.accept()
+      except mp.AuthenticationError:
+        continue
+      except OSError: # listener was closed
+        break
+      if self._closed:
+        connection.close()
+        break
+      with self._results_changed:
+        self.n_workers += 1
+      threading.Thread(target=self._serve_worker, args=(connection,), daemon=True).start()
+
+
+  def _serve_worker(self, connection: Connection) -> None:
+    """
+    send jobs to one worker until it disconnects or the coordinator is closed. Jobs of lost workers are put back into the queue.
+    """
+    while not self._closed:
+      try:
+        job: tuple = self._jobs.get(timeout=0.2)
+      except queue.Empty:
+        continue
+      job_id, payload, seed, n_retries = job
+      if job_id not in self._pending_job_ids:
+        continue
+      try:
+        connection.send(("job", job_id, seed, payload))
+        if self.job_timeout_s is not None and not connection.poll(self.job_timeout_s):
+          raise TimeoutError(f"Worker did not finish job {job_id} within {self.job_timeout_s} s.")
+        message_type, result_id, content = connection.recv()
+      except (EOFError, OSError, TimeoutError):
+        self._requeue(job)
+        break
+      self._set_result(result_id, message_type, content)
+    else:
+      try:
+        connection.send(("stop", None, None, None))
+      except OSError:
+        pass
+    connection.close()
+    with self._results_changed:
+      self.n_workers -= 1
+
+
+  def _requeue(self, job: tuple) -> None:
+    """
+    resend a job of a lost worker or fail it after `max_retries` attempts
+    """
+    job_id, payload, seed, n_retries = job
+    if n_retries >= self.max_retries:
+      self._set_result(job_id, "error", f"Job {job_id} failed: lost {n_retries + 1} workers while playing it.")
+    else:
+      self._jobs.put((job_id, payload, seed, n_retries + 1))
+
+
+  def _set_result(self, job_id: int, message_type: str, content: Any) -> None:
+    with self._results_changed:
+      if job_id in self._pending_job_ids:
+        self._results[job_id] = (message_type, content)
+      self._results_changed.notify_all()
+
+
+  def map(self, function: Callable, iterable: Iterable, chunksize: int = None, timeout_s: float = None) -> list:
+    """
+    apply `function` to each element of `iterable` on the workers and return the results in order.
+    Blocks until all results arrived, so at least one worker has to connect within `self.no_worker_timeout_s`.
+
+    inputs:
+    -------
+        function (Callable): picklable function with one argument
+        iterable (Iterable): inputs of the function
+        chunksize (int): number of inputs per job. Defaults to `self.chunksize`.
+        timeout_s (float): maximum time to wait for all results. `None` waits indefinitely.
+
+    returns:
+    --------
+        list: results of the function for each input
+
+    raises:
+    -------
+        RuntimeError: if a job fails, the coordinator is closed or no worker is connected for `self.no_worker_timeout_s`
+        TimeoutError: if the results do not arrive within `timeout_s`
+    """
+    if self._closed:
+      raise ValueError("Evaluation_Coordinator is closed.")
+    chunksize = self.chunksize if chunksize is None else chunksize
+    items: list = list(iterable)
+    job_ids: list[int] = []
+    for start in range(0, len(items), chunksize):
+      payload: bytes = pickle.dumps((function, items[start:start + chunksize]))
+      job_id: int = self._next_job_id
+      self._next_job_id += 1
+      job_ids.append(job_id)
+      with self._results_changed:
+        self._pending_job_ids.add(job_id)
+      self._jobs.put((job_id, payload, int(self.rng.integers(2**32)), 0))
+    start_time: float = time.time()
+    no_worker_since: float = start_time
+    try:
+      with self._results_changed:
+        while not all(job_id in self._results for job_id in job_ids):
+          if self._closed:
+            raise RuntimeError("Evaluation_Coordinator was closed before all results arrived.")
+          current_time: float = time.time()
+          if timeout_s is not None and current_time - start_time > timeout_s:
+            raise TimeoutError(f"Evaluation results did not arrive within {timeout_s} s.")
+          if self.n_workers > 0:
+            no_worker_since = current_time
+          elif self.no_worker_timeout_s is not None and current_time - no_worker_since > self.no_worker_timeout_s:
+            raise RuntimeError(f"No evaluation worker was connected for {self.no_worker_timeout_s} s.")
+          # wake up regularly to check the timeouts
+          self._results_changed.wait(timeout=0.5)
+        job_results: list[tuple[str, Any]] = [self._results[job_id] for job_id in job_ids]
+    finally:
+      # workers skip the remaining jobs of a failed call
+      with self._results_changed:
+        for job_id in job_ids:
+          self._pending_job_ids.discard(job_id)
+          self._results.pop(job_id, None)
+    results: list = []
+    for message_type, content in job_results:
+      if message_type == "error":
+        raise RuntimeError(f"Evaluation job failed:\n{content}")
+      results.extend(content)
+    return results
+
+
+  def close(self) -> None:
+    """
+    stop serving jobs and tell all connected workers to stop. Running `map` calls fail.
+    """
+    if self._closed:
+      return
+    self._closed = True
+    with self._results_changed:
+      for job_id in self._pending_job_ids:
+        if job_id not in self._results:
+          self._results[job_id] = ("error", f"Job {job_id} failed: the coordinator was closed.")
+      self._results_changed.notify_all()
+    # wake up the accept thread
+    try:
+      Client(self.address, authkey=self.authkey).close()
+    except OSError:
+      pass
+    self.listener.close()
+
+  def join(self) -> None:
+    """
+    wait until all worker connections are closed (for compatibility with `multiprocessing.Pool`)
+    """
+    with self._results_changed:
+      self._results_changed.wait_for(lambda: self.n_workers == 0, timeout=5)
+    self._accept_thread.join(timeout=5)
+
+
+def run_worker(address: tuple[str, int], authkey: bytes) -> int:
+  """
+  connect to a coordinator and play jobs until the coordinator stops or disconnects
+
+  inputs:
+  -------
+      address (tuple[str, int]): host and port of the coordinator
+      authkey (bytes): shared key of the coordinator
+
+  returns:
+  --------
+      int: number of finished jobs
+  """
+  connection: Connection = Client(address, authkey=authkey)
+  n_jobs: int = 0
+  while True:
+    try:
+      message_type, job_id, seed, payload = connection.recv()
+    except (EOFError, OSError):
+      break
+    if message_type == "stop":
+      break
+    # every job gets its own seed, so workers forked from the same process do not play identical games
+    np.random.seed(seed)
+    random.seed(seed)
+    try:
+      function, items = pickle.loads(payload)
+      message: tuple = ("result", job_id, [function(item) for item in items])
+    except Exception:
+      message: tuple = ("error", job_id, traceback.format_exc())
+    try:
+      connection.send(message)
+    except OSError:
+      break
+    n_jobs += 1
+  connection.close()
+  return n_jobs
+
+
+def run_workers(address: tuple[str, int], authkey: bytes, n_processes: int = None, reconnect_delay_s: float = None) -> None:
+  """
+  run `n_processes` workers on this machine
+
+  inputs:
+  -------
+      address (tuple[str, int]): host and port of the coordinator
+      authkey (bytes): shared key of the coordinator
+      n_processes (int): number of worker processes. Defaults to the number of CPUs.
+      reconnect_delay_s (float): if given, workers reconnect after this delay when the coordinator is not reachable or stops
+  """
+  if n_processes is None:
+    n_processes = mp.cpu_count()
+  workers: list[mp.Process] = [
+      mp.Process(target=_run_worker_loop, args=(address, authkey, reconnect_delay_s)) for _ in range(n_processes)]
+  for worker in workers:
+    worker.start()
+  for worker in workers:
+    worker.join()
+
+
+def _run_worker_loop(address: tuple[str, int], authkey: bytes, reconnect_delay_s: float = None) -> None:
+  while True:
+    try:
+      run_worker(address, authkey)
+    except ConnectionError:
+      if reconnect_delay_s is None:
+        raise
+    if reconnect_delay_s is None:
+      break
+    time.sleep(reconnect_delay_s)
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Run evaluation workers for an `Evaluation_Coordinator`.")
+  parser.add_argument("host", help="host name or IP address of the coordinator")
+  parser.add_argument("port", type=int, help="port of the coordinator")
+  parser.add_argument("--authkey", required=True, help="shared key of the coordinator")
+  parser.add_argument("--n_processes", type=int, default=None, help="number of worker processes (default: number of CPUs)")
+  parser.add_argument("--reconnect_delay", type=float, default=None,
+      help="keep running and reconnect after this many seconds when the coordinator is unavailable")
+  args = parser.parse_args()
+  run_workers((args.host, args.port), args.authkey.encode(), args.n_processes, args.reconnect_delay)
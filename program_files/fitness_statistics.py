@@ -0,0 +1,165 @@
+"""
+This module implements estimators for the fitness of players from the scores of repeated games.
+All estimators work on a score matrix of shape (n_games, n_players) and return one value per player.
+They only need NumPy and the standard library. Critical values of the normal distribution are cached.
+"""
+from functools import lru_cache
+from statistics import NormalDist
+from typing import Callable
+
+import numpy as np
+
+
+@lru_cache(maxsize=None)
+def get_critical_value(confidence_level: float, two_sided: bool = True) -> float:
+  """
+  get the critical value z of the standard normal distribution for the given confidence level
+
+  inputs:
+  -------
+      confidence_level (float): probability that the true value lies in the confidence interval, e.g. 0.95
+      two_sided (bool): whether the interval is bounded on both sides (z = 1.96 for 0.95) or only on one side (z = 1.645 for 0.95)
+
+  returns:
+  --------
+      float: critical value z
+  """
+  if not 0 < confidence_level < 1:
+    raise ValueError(f"Confidence level must be in (0, 1), got {confidence_level}.")
+  if two_sided:
+    return NormalDist().inv_cdf(1 - (1 - confidence_level) / 2)
+  return NormalDist().inv_cdf(confidence_level)
+
+
+def get_standard_errors(scores: np.ndarray) -> np.ndarray:
+  """
+  calculate the standard error of the mean score of each player (sample standard deviation / sqrt(n_games)).
+  For a single game the standard error is 0.
+
+  inputs:
+  -------
+      scores (np.ndarray): scores of shape (n_games, n_players)
+
+  returns:
+  --------
+      np.ndarray: standard error for each player
+  """
+  n_games: int = scores.shape[0]
+  if n_games < 2:
+    return np.zeros(scores.shape[1])
+  return np.std(scores, axis=0, ddof=1) / np.sqrt(n_games)
+
+
+def confidence_interval(scores: np.ndarray, confidence_level: float = 0.95) -> tuple[np.ndarray, np.ndarray]:
+  """
+  calculate the two-sided confidence interval of the mean score of each player using the normal approximation
+
+  inputs:
+  -------
+      scores (np.ndarray): scores of shape (n_games, n_players)
+      confidence_level (float): confidence level of the interval
+
+  returns:
+  --------
+      np.ndarray: lower bound for each player
+      np.ndarray: upper bound for each player
+  """
+  mean_scores: np.ndarray = np.mean(scores, axis=0)
+  half_width: np.ndarray = get_critical_value(confidence_level) * get_standard_errors(scores)
+  return mean_scores - half_width, mean_scores + half_width
+
+
+def lower_confidence_bound(scores: np.ndarray, confidence_level: float = 0.95) -> np.ndarray:
+  """
+  lower bound of the two-sided confidence interval of the mean score of each player
+  """
+  return confidence_interval(scores, confidence_level)[0]
+
+
+def mean_score(scores: np.ndarray, confidence_level: float = None) -> np.ndarray:
+  """
+  mean score of each player. `confidence_level` is ignored.
+  """
+  return np.mean(scores, axis=0)
+
+
+def trimmed_mean(scores: np.ndarray, confidence_level: float = None, proportion: float = 0.1) -> np.ndarray:
+  """
+  mean score of each player after removing the `proportion` lowest and highest scores. `confidence_level` is ignored.
+
+  inputs:
+  -------
+      scores (np.ndarray): scores of shape (n_games, n_players)
+      confidence_level (float): ignored, for compatibility with the other estimators
+      proportion (float): fraction of games to cut off on each side (in [0, 0.5))
+
+  returns:
+  --------
+      np.ndarray: trimmed mean for each player
+  """
+  n_games: int = scores.shape[0]
+  n_cut: int = int(proportion * n_games)
+  if n_cut == 0:
+    return np.mean(scores, axis=0)
+  # partition instead of a full sort: only the cut off values need to be separated
+  sorted_scores: np.ndarray = np.partition(scores, (n_cut, n_games - n_cut - 1), axis=0)
+  return np.mean(sorted_scores[n_cut:n_games - n_cut], axis=0)
+
+
+def bootstrap_lower_bound(
+    scores: np.ndarray,
+    confidence_level: float = 0.95,
+    n_resamples: int = 1000,
+    rng: np.random.Generator = None) -> np.ndarray:
+  """
+  lower bound of the two-sided percentile bootstrap confidence interval of the mean score of each player.
+  Games are resampled with replacement. Resampling a whole game keeps the scores of all players of that game together.
+
+  inputs:
+  -------
+      scores (np.ndarray): scores of shape (n_games, n_players)
+      confidence_level (float): confidence level of the interval
+      n_resamples (int): number of bootstrap resamples
+      rng (np.random.Generator): random number generator. A new one is created if `None`.
+
+  returns:
+  --------
+      np.ndarray: lower bound for each player
+  """
+  if rng is None:
+    rng = np.random.default_rng()
+  n_games: int = scores.shape[0]
+  # how often each game is drawn in each resample: (n_resamples, n_games)
+  draw_counts: np.ndarray = rng.multinomial(n_games, np.full(n_games, 1 / n_games), size=n_resamples)
+  resampled_means: np.ndarray = draw_counts @ scores / n_games
+  return np.quantile(resampled_means, (1 - confidence_level) / 2, axis=0)
+
+
+SCORE_ESTIMATORS: dict[str, Callable[[np.ndarray, float], np.ndarray]] = {
+    "lower_confidence_bound": lower_confidence_bound,
+    "bootstrap_lower_bound": bootstrap_lower_bound,
+    "trimmed_mean": trimmed_mean,
+    "mean": mean_score,
+}
+
+
+def estimate_fitness(
+    scores: np.ndarray,
+    estimator: str = "lower_confidence_bound",
+    confidence_level: float = 0.95) -> np.ndarray:
+  """
+  estimate the fitness of each player from the scores of repeated games
+
+  inputs:
+  -------
+      scores (np.ndarray): scores of shape (n_games, n_players)
+      estimator (str): name of the estimator in `SCORE_ESTIMATORS`
+      confidence_level (float): confidence level for estimators based on confidence intervals
+
+  returns:
+  --------
+      np.ndarray: fitness of each player
+  """
+  if estimator not in SCORE_ESTIMATORS:
+    raise ValueError(f"Unknown score estimator {estimator}. Choose one of {list(SCORE_ESTIMATORS.keys())}.")
+  return SCORE_ESTIMATORS[estimator](np.asarray(scores, dtype=float), confidence_level)
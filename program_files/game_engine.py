@@ -1,27 +1,244 @@
-from game_state import Game_State
+"""
+This module implements the game loop of wizard as a state machine that is shared by all front ends
+(`Wizard_Auto_Play`, `Genetic_Auto_Play`, `tournament.py` and `Game_Gui`).
 
-class Game_Engine:
-  def __init__(self, n_players: int, verbosity: int = 0):
-    """this class handles all the game logic during play
+A game is a sequence of events: dealing, choosing a trump color (only if the trump card is a wizard), bidding and playing cards.
+`Game_Engine.step` performs the next event (`Game_Engine.next_event`). Decisions are either passed to `step`
+(asynchronous players, e.g. humans or AIs on another thread in the GUI) or requested from the player in that seat (synchronous players).
+Bids are recorded in the `Game_State` as they are made, so each bidder sees all earlier bids.
+Tricks and rounds are scored automatically after their last card. `play_game` plays a whole game with synchronous players.
 
-    Args:
+Players are objects with the methods of `Wizard_Base_Ai` (`get_trump_color_choice`, `get_prediction`, `get_trick_action`).
+Their methods are looked up once, so the loop only calls them. Game records and profiling are optional hooks of the engine.
+"""
+from typing import Callable
+
+import numpy as np
+
+from program_files.wizard_card import Wizard_Card
+from program_files.game_state import Game_State
+from program_files.helper_functions import get_hands
+from program_files.game_records import Game_Record_Writer
+from program_files.profiling import Phase_Timer
+
+# events of the game (values of `Game_Engine.next_event`)
+DEAL: str = "deal"
+TRUMP: str = "trump"
+BID: str = "bid"
+TRICK: str = "trick"
+GAME_END: str = "game end"
+
+
+class Game_Engine():
+  """
+  play a game of wizard step by step
+  """
+  def __init__(self,
+      n_players: int,
+      max_rounds: int = 20,
+      players: list = None,
+      record_writer: Game_Record_Writer = None,
+      seat_ids: list[int] = None,
+      timer: Phase_Timer = None,
+      verbosity: int = 0,
+      deal_function: Callable = None,
+      starting_player: int = None):
+    """
+    start a new game. The first event is dealing the cards of round 1.
+
+    inputs:
+    -------
         n_players (int): number of players
-        verbosity (int, optional): verbosity = how much text output to give. Defaults to 0 meaning no output except in case of fatal errors. Higher values indicate more output.
+        max_rounds (int): maximum number of rounds. Games end earlier if there are not enough cards.
+        players (list): player in each seat used for decisions that are not passed to `step`. `None` (for all or single seats) if all decisions are passed to `step`.
+        record_writer (Game_Record_Writer): writer to record the game in. `None` disables recording.
+        seat_ids (list[int]): id of the player in each seat. Only used for game records.
+        timer (Phase_Timer): timer to record the time of each phase in. Players may define a dict `decision_names` (phase -> AI name)
+            to be profiled under these names instead of their class name. `None` disables profiling.
+        verbosity (int): verbosity of the `Game_State`
+        deal_function (Callable): function with the signature of `get_hands` that deals each round,
+            e.g. `Deal_Bank.get_dealer`. `None` shuffles a new deck for each round.
+        starting_player (int): seat that starts round 1, e.g. `Deal_Bank.get_starting_player`. `None` picks a random seat.
+    """
+    self.n_players: int = n_players
+    self.n_rounds: int = min(max_rounds, 60 // n_players)
+    self.players: list = [None] * n_players if players is None else players
+    self.record_writer: Game_Record_Writer = record_writer
+    self.timer: Phase_Timer = timer
+    self._get_hands: Callable = get_hands if deal_function is None else deal_function
+    self.game_state: Game_State = Game_State(n_players=n_players, verbosity=verbosity)
+    if starting_player is not None:
+      # `start_round` moves on to the next player before round 1
+      self.game_state.round_starting_player = (starting_player - 1) % n_players
+
+    self.next_event: str = DEAL
+    # player who makes the next decision. `None` if the next event is not a decision.
+    self.active_player: int = None
+    # dealt hands and trump card of the current round
+    self.hands: list[list[Wizard_Card]] = None
+    self.trump_card: Wizard_Card = None
+    # bids of the current round made so far (`game_state.players_predictions`)
+    self.predictions: np.ndarray = None
+    # winner of the current trick so far or of the last finished trick
+    self.trick_winner: int = None
+    self.last_decision = None
+
+    self._perform_action = self.game_state.perform_action
+    self._bind_players()
+    if record_writer is not None:
+      record_writer.start_game(self.game_state, seat_ids)
+
+
+  def _bind_players(self, round_number: int = None) -> None:
+    """
+    look up the decision methods of all players and wrap them with the timer if profiling is enabled
+    """
+    self._trump_choosers: list = []
+    self._bidders: list = []
+    self._trick_players: list = []
+    for player in self.players:
+      for phase, method_name, methods in (
+          ("trump choice", "get_trump_color_choice", self._trump_choosers),
+          ("bidding", "get_prediction", self._bidders),
+          ("trick play", "get_trick_action", self._trick_players)):
+        method = None if player is None else getattr(player, method_name)
+        if method is not None and self.timer is not None:
+          decision_names: dict[str, str] = getattr(player, "decision_names", None)
+          name: str = type(player).__name__ if decision_names is None else decision_names[phase]
+          method = self.timer.timed(phase, name, method, round_number)
+        methods.append(method)
+    if self.timer is not None:
+      self._perform_action = self.timer.timed("scoring", None, self.game_state.perform_action)
+
+
+  def get_decision_kwargs(self) -> dict:
+    """
+    keyword arguments of the AI method for the next decision (see `Wizard_Base_Ai`)
+
+    returns:
+    --------
+        dict: arguments of `get_trump_color_choice`, `get_prediction` or `get_trick_action`
+    """
+    if self.next_event == TRICK:
+      return {"game_state": self.game_state}
+    if self.next_event == BID:
+      return {"player_index": self.active_player, "game_state": self.game_state}
+    if self.next_event == TRUMP:
+      return {"hands": self.hands, "active_player": self.active_player, "game_state": self.game_state}
+    raise ValueError(f"The next event ({self.next_event}) is not a decision.")
+
+
+  def step(self, decision=None) -> int:
+    """
+    perform the next event of the game
+
+    inputs:
+    -------
+        decision (int | Wizard_Card): trump color, bid or card of `self.active_player`.
+            If `None`, the decision is requested from the player in that seat. Ignored when dealing.
+
+    returns:
+    --------
+        int: 1 if a trick was finished, 2 if a round was finished (and scored), 0 otherwise (like `Game_State.perform_action`)
+    """
+    event: str = self.next_event
+    if event == TRICK:
+      if decision is None:
+        decision = self._trick_players[self.active_player](game_state=self.game_state)
+      return self._play_card(decision)
+    if event == BID:
+      if decision is None:
+        decision = self._bidders[self.active_player](player_index=self.active_player, game_state=self.game_state)
+      self._set_bid(decision)
+      return 0
+    if event == DEAL:
+      self._deal()
+      return 0
+    if event == TRUMP:
+      if decision is None:
+        decision = self._trump_choosers[self.active_player](
+            hands=self.hands,
+            active_player=self.active_player,
+            game_state=self.game_state)
+      self.last_decision = decision
+      self._start_round(decision)
+      return 0
+    raise ValueError("The game is over.")
+
+
+  def play_game(self) -> np.ndarray:
+    """
+    play the rest of the game with the synchronous players
+
+    returns:
+    --------
+        np.ndarray: total points of each player
+    """
+    step = self.step
+    while self.next_event != GAME_END:
+      step()
+    return self.game_state.players_total_points
+
+
+  def _deal(self) -> None:
+    """
+    deal the cards of the next round and determine the trump color unless the trump card is a wizard
     """
-    self.n_players = n_players
-    self.verbosity = verbosity
+    round_number: int = self.game_state.round_number
+    if self.timer is None:
+      self.hands, self.trump_card = self._get_hands(self.n_players, round_number)
+    else:
+      # record latencies by round number
+      self._bind_players(round_number)
+      self.hands, self.trump_card = self.timer.timed("dealing", None, self._get_hands)(self.n_players, round_number)
+    if self.trump_card is None:
+      self._start_round(-1)
+    elif self.trump_card.value != 14: # trump card determines trump color (including jester -> no trump)
+      self._start_round(self.trump_card.color)
+    else: # trump card is a wizard -> player who "gave cards" determines trump
+      self.next_event = TRUMP
+      self.active_player = self.game_state.round_starting_player
 
-    self.next_function_call: callable = self._start_game
-    self.next_event: str = "start game"
 
-  def _start_game(self):
-    """start a game"""
-    self.game_obj = Game_State(self.n_players, self.verbosity)
+  def _start_round(self, trump_color: int) -> None:
+    self.game_state.start_round(self.hands, self.trump_card, trump_color)
+    self.predictions = self.game_state.players_predictions
+    self.next_event = BID
+    self.active_player = self.game_state.round_starting_player
 
 
+  def _set_bid(self, bid: int) -> None:
+    self.last_decision = bid
+    game: Game_State = self.game_state
+    # players bid in seat order, so the next bidder is known without a lookup
+    next_bidder: int = game.add_prediction(bid)
+    if next_bidder != -1:
+      self.active_player = next_bidder
+      return
+    if self.record_writer is not None:
+      self.record_writer.record_round(self.trump_card, game.trump_color, self.predictions)
+    game.start_trick()
+    self.next_event = TRICK
+    self.active_player = game.trick_active_player
 
-  def _start_round(self):
-    """start a round"""
 
-  def _start_trick(self):
-    """start a trick"""
\ No newline at end of file
+  def _play_card(self, action: Wizard_Card) -> int:
+    self.last_decision = action
+    if self.record_writer is not None:
+      self.record_writer.record_action(action)
+    result: int = self._perform_action(action)
+    game: Game_State = self.game_state
+    self.trick_winner = game.trick_winner_index
+    if result == 2: # round done
+      self.active_player = None
+      if game.round_number > self.n_rounds:
+        self.next_event = GAME_END
+        if self.record_writer is not None:
+          self.record_writer.end_game()
+      else:
+        self.next_event = DEAL
+      return result
+    if result == 1: # trick done
+      game.start_trick()
+    self.active_player = game.trick_active_player
+    return result
@@ -1,14 +1,17 @@
 import tkinter as tk
-import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
 
 import numpy as np
 
 from program_files.wizard_card import Wizard_Card
 from program_files.game_state import Game_State
+from program_files.game_engine import Game_Engine, TRUMP, BID, GAME_END, TRICK
 # from pogram_files.wizard_menu_gui import Wizard_Menu_Gui # only imported for type hints
-from program_files.helper_functions import get_hands, check_action_invalid
+from program_files.helper_functions import check_action_invalid
+from program_files.action_values import get_action_values, get_game_state_key, copy_game_state
 # imports for AI
-from program_files.wizard_ais.wizard_ai_classes import ai_classes, ai_trump_chooser_methods, ai_bids_chooser_methods, ai_trick_play_methods
+from program_files.wizard_ais.wizard_ai_classes import ai_classes, ai_trump_chooser_methods, ai_bids_chooser_methods, ai_trick_play_methods, Mixed_Ai_Player
 
 
 class Game_Gui():
@@ -20,7 +23,10 @@ class Game_Gui():
                ai_player_types: list,
                sleep_times: dict = {
                    "end_of_trick_delay": 0.2,
-                   "end_of_round_delay": 0.8}):
+                   "end_of_round_delay": 0.8},
+               spectator_speed: tk.IntVar = None,
+               round_snapshots_only: bool = False,
+               hint_time_budget: float = 0.5):
     """
     create a gui that handles playing a game of wizard with the given settings
 
@@ -34,6 +40,16 @@ class Game_Gui():
       sleep_times (dict): setting for delays before moving on to the next section of the game.
         should contain two keys: `'end_of_trick_delay'` and `'end_of_round_delay'`.
         values are sleeptimes in seconds.
+      spectator_speed (tk.IntVar): if given, all players must be AIs and the game runs in spectator mode:
+        each round is played at once on the AI thread and then shown trick by trick.
+        Delays are divided by the value of this variable, which can be changed during the game with a slider.
+        <space> pauses the game and <Right> shows the next trick while it is paused.
+      round_snapshots_only (bool): in spectator mode, skip the tricks and only show the result of each round.
+      hint_time_budget (float): maximum time in seconds to estimate the values of the cards shown as AI hints during tricks.
+
+    AI decisions are computed on a background thread and delays are scheduled with `after`,
+    so the window stays responsive while an AI is thinking or the game waits.
+    Card widgets are created once and reused, so each turn only reconfigures the widgets that changed.
     """
     self.wizard_menu = wizard_menu
     self.n_players = n_players
@@ -43,10 +59,25 @@ class Game_Gui():
 
     self.end_of_trick_delay = sleep_times["end_of_trick_delay"]  # in seconds
     self.end_of_round_delay = sleep_times["end_of_round_delay"]  # in seconds
+    self.spectator_speed = spectator_speed
+    self.spectator_mode = spectator_speed is not None
+    self.round_snapshots_only = round_snapshots_only
+    self.spectator_paused = False
+    # step of the spectator mode that waits until the game is resumed
+    self.spectator_next_step = None
+    self.hint_time_budget = hint_time_budget
+    # estimated card values for AI hints by game state key (see `action_values.get_game_state_key`)
+    self.hint_cache = {}
+    self.ai_poll_interval = 10  # in milliseconds
     self.card_width = 160
     self.card_height = 240
 
     self.trick_players = set()
+    # AI decisions run on this thread. Results are only used if no other decision was made in the meantime.
+    self.ai_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wizard_ai")
+    self.decision_id = 0
+    self.game_closed = False
+    self.scheduled_callbacks = set()
 
     self.master_window = self.wizard_menu.master_window
     self.gui_colors = self.wizard_menu.gui_colors
@@ -79,10 +110,21 @@ class Game_Gui():
       """
       close game frame and reopen the menu.
       """
+      self.game_closed = True
+      for after_id in self.scheduled_callbacks:
+        self.master_window.after_cancel(after_id)
+      self.scheduled_callbacks.clear()
+      self.ai_executor.shutdown(wait=False, cancel_futures=True)
       self.main_game_frame.destroy()
       self.wizard_menu.open_main_window()
       self.master_window.unbind("<Escape>")
+      if self.spectator_mode:
+        self.master_window.unbind("<space>")
+        self.master_window.unbind("<Right>")
     self.master_window.bind("<Escape>", close_game)
+    if self.spectator_mode:
+      self.master_window.bind("<space>", self._toggle_spectator_pause)
+      self.master_window.bind("<Right>", self._show_next_spectator_step)
     row_index = 0
     # `played_cards_frame` shows which card each player played in a trick and highlights the winning card. Also shows player names and how many tricks they predicted as well as how many they already won
     self.played_cards_frame = tk.Frame(
@@ -155,6 +197,7 @@ class Game_Gui():
     self._fill_trump_frame()
     self._fill_round_info_frame()
     self._fill_players_points_frame()
+    self._fill_players_hand_frame()
     self.master_window.update()
     self._start_game()
 
@@ -188,14 +231,7 @@ class Game_Gui():
         padx=5,
         pady=10)
 
-    self.trump_card_frame = tk.Frame(
-        master=self.trump_frame,
-        bg=self.gui_colors["card_color"],
-        highlightbackground=self.gui_colors["card_border"],
-        highlightthickness=5,
-        width=self.card_width,
-        height=self.card_height)
-    self.trump_card_frame.grid_propagate(False)
+    self.trump_card_frame = self._create_card_view(self.trump_frame)
     self.trump_card_frame.grid(
         sticky="sw",
         row=0,
@@ -278,6 +314,32 @@ class Game_Gui():
         padx=(5, 0),
         pady=(5, 0))
 
+    if self.spectator_mode:
+      speed_label = tk.Label(
+          master=self.round_info_frame,
+          text="Speed:")
+      self.wizard_menu.add_label_style(speed_label)
+      speed_label.grid(
+          sticky="sw",
+          row=2,
+          column=0,
+          padx=(0, 5),
+          pady=(5, 0))
+      speed_scale = tk.Scale(
+          master=self.round_info_frame,
+          variable=self.spectator_speed,
+          from_=1,
+          to=100,
+          orient="horizontal")
+      self.wizard_menu.add_scale_style(speed_scale)
+      speed_scale.grid(
+          sticky="sw",
+          row=2,
+          column=1,
+          columnspan=3,
+          padx=(5, 0),
+          pady=(5, 0))
+
 
   def _fill_players_points_frame(self):
     """
@@ -363,11 +425,54 @@ class Game_Gui():
             pady=pady)
 
 
+  def _fill_players_hand_frame(self):
+    """
+    create a label for the player name and one card view for each of the 60 cards inside `self.players_hand_frame`.
+    The card views are placed and hidden by `self._show_hand()` and `self._hide_hand()`.
+    """
+    self.hand_name_label = tk.Label(
+        master=self.players_hand_frame,
+        text="")
+    self.wizard_menu.add_label_style(self.hand_name_label)
+    self.hand_card_views = [self._create_card_view(self.players_hand_frame) for _ in range(60)]
+    for raw_value, card_view in enumerate(self.hand_card_views):
+      card_view.show_card(Wizard_Card(raw_value))
+      self._make_clickable(card_view)
+    # raw values of the shown cards in the order they are shown
+    self.shown_hand = []
+    self.hand_clickable = False
+    self.hand_frame_size = None
+
+
+  def _create_card_view(self, master: tk.Widget) -> "Card_View":
+    """
+    create an empty card view with the style of this gui
+
+    inputs:
+    -------
+      master (tk.Widget): parent widget of the card view
+    """
+    return Card_View(
+        master=master,
+        gui_colors=self.gui_colors,
+        card_color_to_str=self.card_color_to_str,
+        width=self.card_width,
+        height=self.card_height)
+
+
   def _start_game(self):
     """
-    create a `Wizard_Game_State` object and start the game by allowing player action inputs.
+    create a `Game_Engine` and start the game by allowing player action inputs.
+    Decisions are passed to the engine when they are made, except in spectator mode where the engine asks the AIs itself.
     """
-    self.game_obj = Game_State(self.n_players, verbosity=0)
+    if self.spectator_mode:
+      players = [
+          Mixed_Ai_Player(player_types["trump_choice_var"], player_types["bids_choice_var"], player_types["trick_play_var"])
+          for player_types in self.ai_player_types]
+    else:
+      players = None
+    self.engine = Game_Engine(self.n_players, max_rounds=self.n_rounds - 1, players=players)
+    self.game_obj = self.engine.game_state
     # for round_nbr in range(1, self.n_rounds):
     round_nbr = self.game_obj.round_number
     self._initialize_round(self.game_obj, round_nbr)
@@ -387,11 +492,13 @@ class Game_Gui():
     self.n_bids.set(0)
     self.n_tricks.set(round_nbr)
     self.round_nbr.set(round_nbr)
-    clear_frame(self.trump_card_frame)
+    self.hint_cache.clear()
+    if self.spectator_mode:
+      self._run_ai(self._play_round_headless, self._show_round_result, game=game, round_nbr=round_nbr)
+      return
     # generate hands and determine trump
-    hands, trump_card = get_hands(game.n_players, round_nbr)
-    # hands, trump_card = get_hands(game.n_players, 9)
-    self._determine_trump(game, hands, trump_card)
+    self.engine.step()
+    self._determine_trump(game, self.engine.hands, self.engine.trump_card)
 
 
   def _determine_trump(self,
@@ -399,16 +506,12 @@ class Game_Gui():
                        hands: list,
                        trump_card: Wizard_Card):
     # show trump card
-    self._show_card(self.trump_card_frame, trump_card)
+    self.trump_card_frame.show_card(trump_card)
     # determine trump color
-    if trump_card is None:  # no trump card
-      trump_color = None
-      self._start_round(game, hands, trump_card, trump_color)
-    elif trump_card.value != 14:  # trump card determines trump color (including jester -> no trump)
-      trump_color = trump_card.color
-      self._start_round(game, hands, trump_card, trump_color)
+    if self.engine.next_event != TRUMP:  # trump card determines trump color (or there is no trump)
+      self._start_round(game)
     else:  # trump card is a wizard -> dealer determines trump
-      active_player = game.round_starting_player
+      active_player = self.engine.active_player
       clear_frame(self.played_cards_frame)
       self._show_hand(hands[active_player], active_player)
       choose_trump_label = tk.Label(
@@ -432,23 +535,28 @@ class Game_Gui():
         -------
           color_index (int: - index of the chosen trump color
         """
-        clear_frame(self.players_hand_frame)
+        self.decision_id += 1
+        self._hide_hand()
         # reset column weights
         self.played_cards_frame.columnconfigure(0, weight=0)
         self.played_cards_frame.columnconfigure(5, weight=0)
         # start round
-        self._start_round(game, hands, trump_card, int(color_index))
+        self.engine.step(int(color_index))
+        self._start_round(game)
 
       player_mode = self.ai_player_types[active_player]["trump_choice_var"]
+      # buttons to choose each trump color. The AI's choice is highlighted as a hint.
+      color_button_frames: list[tk.Frame] = []
       if player_mode != "human input":
-        ai_trump_choice = ai_trump_chooser_methods[player_mode](
-            hands=hands,
-            active_player=active_player,
-            game_state=game)
-        if self.ai_player_types[active_player]["hints_var"] is False:
-          self.master_window.after(10, lambda: set_trump(color_index=ai_trump_choice))
-        else:
-          print(f"{ai_trump_choice=}")  # TODO: show ai trump hint in GUI
+        def use_ai_trump_choice(ai_trump_choice: int):
+          if self.ai_player_types[active_player]["hints_var"] is False:
+            set_trump(color_index=ai_trump_choice)
+          else:
+            color_button_frames[ai_trump_choice].config(highlightbackground=self.gui_colors["card_highlight_border"])
+        self._run_ai(
+            ai_trump_chooser_methods[player_mode],
+            use_ai_trump_choice,
+            **self._get_decision_kwargs_copy())
       if self.ai_player_types[active_player]["hints_var"] or player_mode == "human input":
         # create buttons to choose trump color
         for color_index in range(4):
@@ -466,34 +574,23 @@ class Game_Gui():
               padx=5,
               pady=5)
           color_button_frame.bind("<Button-1>", lambda _, i=color_index: set_trump(i))
+          color_button_frames.append(color_button_frame)
 
 
-  def _start_round(self,
-                   game: Game_State,
-                   hands: list,
-                   trump_card: Wizard_Card,
-                   trump_color: int):
+  def _start_round(self, game: Game_State):
     """
-    show trump color and start playing the round
+    show trump color and start bidding after the round was started by the engine
 
     inputs:
     -------
       game (Wizard_Game_State: - game state encoded in an object
-      hands (list: - hands of each player
-      trump_card (Wizard_Card: - trump card
-      trump_color (int: - trump color (important if trump card is a wizard)
     """
     # show trump color
-    if trump_card is None:
-      trump_color = -1
-    bg_color = self.gui_colors[self.card_color_to_str[trump_color]]
+    bg_color = self.gui_colors[self.card_color_to_str[game.trump_color]]
     self.trump_color_frame.config(
         bg=bg_color)
-    # start round in `game`
-    game.start_round(hands, trump_card, trump_color)
     # get predictions from each player
-    self.predictions = np.zeros(game.n_players, dtype=np.int8)
-    self._get_player_prediction(game, game.round_number, game.round_starting_player)
+    self._get_player_prediction(game, game.round_number, self.engine.active_player)
 
 
   def _get_player_prediction(self,
@@ -521,59 +618,30 @@ class Game_Gui():
       -------
         n_bids (int) - number of predicted won tricks
       """
-      self.predictions[player_index] = n_bids
-      clear_frame(self.players_hand_frame)
+      self.decision_id += 1
+      self._hide_hand()
       self.bids_label_matrix[round_nbr - 1][player_index].config(text=n_bids)
-      player_index = (player_index + 1) % game.n_players
       self.n_bids.set(self.n_bids.get() + n_bids)
-      if player_index != game.round_starting_player:
-        self._get_player_prediction(game, round_nbr, player_index)
+      self.engine.step(n_bids)
+      if self.engine.next_event == BID:
+        self._get_player_prediction(game, round_nbr, self.engine.active_player)
       else:
-        game.set_predictions(self.predictions)
-        clear_frame(self.played_cards_frame)
-        # show how many tricks each player bid and won this round
-        self.player_bids_labels = [0] * game.n_players
-        for player_index in range(game.n_players):
-          player_name_label = tk.Label(
-              master=self.played_cards_frame,
-              text=self.ai_player_types[player_index]["player_name_var"])
-          self.wizard_menu.add_label_style(player_name_label)
-          player_name_label.grid(
-              row=0,
-              column=player_index + 1,
-              padx=5,
-              pady=(0, 5))
-
-          player_bids_label = tk.Label(
-              master=self.played_cards_frame,
-              text=f"0 / {self.predictions[player_index]}")
-          self.wizard_menu.add_label_style(player_bids_label)
-          player_bids_label.grid(
-              row=1,
-              column=player_index + 1,
-              padx=5,
-              pady=(0, 15))
-          self.player_bids_labels[player_index] = player_bids_label
-          card_width_frame = tk.Frame(
-              master=self.played_cards_frame,
-              width=self.card_width,
-              height=1,
-              bg=self.gui_colors["bg"])
-          card_width_frame.grid(
-              row=2,
-              column=player_index + 1,
-              padx=5)
+        self._show_trick_table(game.players_predictions)
         self._initialize_trick(game)
 
     player_mode = self.ai_player_types[player_index]["bids_choice_var"]
+    # buttons to place each bid. The AI's bid is highlighted as a hint.
+    bid_buttons: dict[int, tk.Button] = {}
     if player_mode != "human input":
-      ai_bid = ai_bids_chooser_methods[player_mode](
-          player_index=player_index,
-          game_state=game)
-      if self.ai_player_types[player_index]["hints_var"] is False:
-        self.master_window.after(10, lambda: set_bids(n_bids=ai_bid, player_index=player_index))
-      else:
-        print(f"{ai_bid=}")  # TODO: show ai bid hint in GUI
+      def use_ai_bid(ai_bid: int):
+        if self.ai_player_types[player_index]["hints_var"] is False:
+          set_bids(n_bids=ai_bid, player_index=player_index)
+        elif ai_bid in bid_buttons:
+          bid_buttons[ai_bid].config(bg=self.gui_colors["card_highlight_border"])
+      self._run_ai(
+          ai_bids_chooser_methods[player_mode],
+          use_ai_bid,
+          **self._get_decision_kwargs_copy())
     if self.ai_player_types[player_index]["hints_var"] or player_mode == "human input":
       self._show_hand(game.players_hands[player_index], player_index)
       # create buttons to place bitds
@@ -581,7 +649,7 @@ class Game_Gui():
         # implement special rule `n_bids != n_tricks`
         if self.limit_choices \
                 and player_index == (game.round_starting_player - 1) % game.n_players \
-                and np.sum(self.predictions) + n_bids == round_nbr:
+                and np.sum(self.engine.predictions) + n_bids == round_nbr:
           continue
         bid_button = tk.Button(
             master=self.played_cards_frame,
@@ -589,6 +657,7 @@ class Game_Gui():
             text=n_bids,
             width=2)
         self.wizard_menu.add_button_style(bid_button)
+        bid_buttons[n_bids] = bid_button
         bid_button.grid(
             sticky="nw",
             row=n_bids // 11 + 1,
@@ -599,38 +668,72 @@ class Game_Gui():
 
 
 
-  def _initialize_trick(self, game: Game_State):
+  def _show_trick_table(self, predictions: np.ndarray):
     """
-    set up everything for playing a trick
+    show the names, bids and won tricks of all players above an empty card view for each player in `self.played_cards_frame`
 
     inputs:
     -------
-      game (Wizard_Game_State): game state object
+      predictions (np.ndarray): number of tricks each player bid this round
     """
-    if game.tricks_to_be_played != game.round_number:
-      for frame in self.played_cards:
-        frame.destroy()
-    # print("init trick")
-    self.played_cards_frame.columnconfigure(game.n_players + 1, weight=1)  # TODO undo this after each round
-    self.played_cards = [0] * game.n_players
-    for player_index in range(game.n_players):
-      played_card_frame = tk.Frame(
+    clear_frame(self.played_cards_frame)
+    # show how many tricks each player bid and won this round
+    self.player_bids_labels = [0] * self.n_players
+    for player_index in range(self.n_players):
+      player_name_label = tk.Label(
+          master=self.played_cards_frame,
+          text=self.ai_player_types[player_index]["player_name_var"])
+      self.wizard_menu.add_label_style(player_name_label)
+      player_name_label.grid(
+          row=0,
+          column=player_index + 1,
+          padx=5,
+          pady=(0, 5))
+
+      player_bids_label = tk.Label(
+          master=self.played_cards_frame,
+          text=f"0 / {predictions[player_index]}")
+      self.wizard_menu.add_label_style(player_bids_label)
+      player_bids_label.grid(
+          row=1,
+          column=player_index + 1,
+          padx=5,
+          pady=(0, 15))
+      self.player_bids_labels[player_index] = player_bids_label
+      card_width_frame = tk.Frame(
           master=self.played_cards_frame,
-          bg=self.gui_colors["card_color"],
-          highlightbackground=self.gui_colors["card_border"],
-          highlightthickness=5,
           width=self.card_width,
-          height=self.card_height)
-      played_card_frame.grid_propagate(False)
-      played_card_frame.grid(
+          height=1,
+          bg=self.gui_colors["bg"])
+      card_width_frame.grid(
+          row=2,
+          column=player_index + 1,
+          padx=5)
+    self.played_cards_frame.columnconfigure(self.n_players + 1, weight=1)  # TODO undo this after each round
+    self.played_cards = [self._create_card_view(self.played_cards_frame) for _ in range(self.n_players)]
+    for player_index, card_view in enumerate(self.played_cards):
+      card_view.grid(
           sticky="nw",
           row=3,
           column=player_index + 1,
           padx=5,
           pady=0)
-      self.played_cards[player_index] = played_card_frame
 
-    game.start_trick()
+
+  def _initialize_trick(self, game: Game_State):
+    """
+    set up everything for playing a trick
+
+    inputs:
+    -------
+      game (Wizard_Game_State): game state object
+    """
+    # print("init trick")
+    # reuse the card views of the previous trick
+    for card_view in self.played_cards:
+      card_view.show_card(None)
+      card_view.set_highlight(False)
+    # the engine already started the trick
     self._play_trick(game)
 
 
@@ -642,18 +745,61 @@ class Game_Gui():
     -------
       game (Wizard_Game_State) - game state object
     """
-    player_index = game.trick_active_player
+    player_index = self.engine.active_player
 
     player_mode = self.ai_player_types[player_index]["trick_play_var"]
-    if player_mode != "human input":
-      ai_action = ai_trick_play_methods[player_mode](
-          game_state=game)
-      if self.ai_player_types[player_index]["hints_var"] is False:
-        self.master_window.after(10, lambda: self._perform_action(action=ai_action))
-      else:
-        print(f"{ai_action=}")  # TODO: show ai action hint in GUI
-    if self.ai_player_types[player_index]["hints_var"] or player_mode == "human input":
+    show_hints = self.ai_player_types[player_index]["hints_var"]
+    if player_mode != "human input" and not show_hints:
+      self._run_ai(
+          ai_trick_play_methods[player_mode],
+          self._perform_action,
+          **self.engine.get_decision_kwargs())
+    if show_hints or player_mode == "human input":
       self._show_hand(game.players_hands[player_index], player_index, clickable=True)
+      if show_hints and player_mode != "human input":
+        self._show_action_hints(game, player_mode)
+
+
+  def _show_action_hints(self, game: Game_State, player_mode: str):
+    """
+    show the values of all legal cards of the active player estimated by an AI on the cards of the shown hand.
+    The values are computed on the AI thread within `self.hint_time_budget` and cached for each game state.
+
+    inputs:
+    -------
+      game (Game_State): game state object
+      player_mode (str): name of the AI that estimates the values
+    """
+    key = (player_mode, get_game_state_key(game))
+    if key in self.hint_cache:
+      self._show_hints(self.hint_cache[key])
+      return
+    def use_action_values(action_values: dict):
+      self.hint_cache[key] = action_values
+      self._show_hints(action_values)
+    # the AI thread works on a copy since the human may play while the values are computed
+    self._run_ai(
+        get_action_values,
+        use_action_values,
+        game_state=copy_game_state(game),
+        ai=ai_classes[player_mode],
+        time_budget_s=self.hint_time_budget)
+
+
+  def _show_hints(self, action_values: dict):
+    """
+    show action values on the cards of the shown hand and highlight the best one
+
+    inputs:
+    -------
+      action_values (dict): estimated points for the raw value of each legal card
+    """
+    best_value = max(action_values.values())
+    for raw_value in self.shown_hand:
+      if raw_value in action_values:
+        self.hand_card_views[raw_value].set_hint(
+            f"{action_values[raw_value]:+.1f}",
+            best=action_values[raw_value] == best_value)
 
 
   def _check_action(self, action: Wizard_Card):
@@ -664,47 +810,49 @@ class Game_Gui():
 
 
   def _perform_action(self, action: Wizard_Card):
-    clear_frame(self.players_hand_frame)
+    self.decision_id += 1
+    self._hide_hand()
 
-    print(f"player {self.game_obj.trick_active_player+1} action: {action}")
-    self.trick_players.add(self.game_obj.trick_active_player)
+    active_player = self.engine.active_player
+    print(f"player {active_player+1} action: {action}")
+    self.trick_players.add(active_player)
+    self.played_cards[active_player].show_card(action)
 
-    active_player = self.game_obj.trick_active_player
-    played_card_frame = self.played_cards[active_player]
-    self._show_card(played_card_frame, action)
+    # winner of the trick so far (or of the last trick before the first card)
+    old_winner = self.engine.trick_winner
+    if old_winner is not None:
+      self.played_cards[old_winner].set_highlight(False)
 
-    old_winner = self.game_obj.trick_winner_index
-    self.played_cards[old_winner].config(
-        highlightbackground=self.gui_colors["card_border"])
+    game_state = self.engine.step(action)
 
-    game_state = self.game_obj.perform_action(action)
-
-    winner = self.game_obj.trick_winner_index
-    self.played_cards[winner].config(
-        highlightbackground=self.gui_colors["card_highlight_border"])
+    winner = self.engine.trick_winner
+    self.played_cards[winner].set_highlight(True)
 
     if game_state == 1:  # trick done
-      self._end_trick(start_new_trick=True)
+      self._end_trick(next_step=lambda: self._initialize_trick(self.game_obj))
     elif game_state == 2:  # round done
-      self._end_trick(start_new_trick=False)
-      self._end_round()
+      self._end_trick(next_step=self._end_round)
     else:
       self._play_trick(self.game_obj)
 
 
-  def _end_trick(self, start_new_trick=True):
+  def _end_trick(self, next_step: Callable[[], None]):
+    """
+    update the won tricks of the trick winner and continue with `next_step` after `self.end_of_trick_delay`
+
+    inputs:
+    -------
+      next_step (Callable): function to start the next trick or end the round
+    """
     assert len(self.trick_players) == self.n_players
     self.trick_players = set()
     # update won trick counter of the trick winner
-    winner_label = self.player_bids_labels[self.game_obj.trick_winner_index]
-    print(f"winner of trick {self.game_obj.round_number-self.game_obj.tricks_to_be_played} in round {self.game_obj.round_number} is: player {self.game_obj.trick_winner_index+1}")
+    winner_label = self.player_bids_labels[self.engine.trick_winner]
+    print(f"winner of trick {self.game_obj.round_number-self.game_obj.tricks_to_be_played} in round {self.game_obj.round_number} is: player {self.engine.trick_winner+1}")
     old_text = winner_label["text"].split(" / ")
     new_won_tricks = 1 + int(old_text[0])
     winner_label.config(text=f"{new_won_tricks} / {old_text[1]}")
-    self.played_cards_frame.update()
-    time.sleep(self.end_of_trick_delay)
-    if start_new_trick:
-      self._initialize_trick(self.game_obj)
+    self._schedule_step(self.end_of_trick_delay, next_step)
 
 
   def _end_round(self):
@@ -721,11 +869,183 @@ class Game_Gui():
       else:
         player_points_label.config(font=("", 12, "bold"))
       player_points_label.config(text=value)
-    time.sleep(self.end_of_round_delay)
-    if game.round_number < self.n_rounds:
-      self._initialize_round(game, game.round_number)
+    if self.engine.next_event != GAME_END:
+      self._schedule_step(self.end_of_round_delay, lambda: self._initialize_round(game, game.round_number))
     else:
-      self._show_winner()
+      self._schedule_step(self.end_of_round_delay, self._show_winner)
+
+
+  def _play_round_headless(self, game: Game_State, round_nbr: int) -> dict:
+    """
+    play a whole round with the engine's AI players without touching any widgets (runs on the AI thread in spectator mode)
+
+    inputs:
+    -------
+      game (Game_State): game state object
+      round_nbr (int): round number = number of tricks in the round
+
+    returns:
+    --------
+      dict: trump card and color, bids of all players and for each trick the played cards (by player index) and the index of its winner
+    """
+    engine = self.engine
+    engine.step()  # deal
+    tricks = []
+    played_cards = [None] * game.n_players
+    result = 0
+    while result != 2:
+      if engine.next_event != TRICK:  # trump choice and bids
+        engine.step()
+        continue
+      player_index = engine.active_player
+      result = engine.step()
+      played_cards[player_index] = engine.last_decision
+      if result != 0:  # trick done
+        tricks.append((played_cards, engine.trick_winner))
+        played_cards = [None] * game.n_players
+    return {
+        "trump_card": engine.trump_card,
+        "trump_color": int(game.trump_color),
+        "predictions": game.players_predictions,
+        "tricks": tricks}
+
+
+  def _show_round_result(self, round_result: dict):
+    """
+    show a round played by `self._play_round_headless()` trick by trick (or only its last trick if `self.round_snapshots_only`)
+
+    inputs:
+    -------
+      round_result (dict): result of `self._play_round_headless()`
+    """
+    # round number has already been increased at this point
+    round_nbr = self.game_obj.round_number - 1
+    self.trump_card_frame.show_card(round_result["trump_card"])
+    self.trump_color_frame.config(bg=self.gui_colors[self.card_color_to_str[round_result["trump_color"]]])
+    predictions = round_result["predictions"]
+    for player_index, n_bids in enumerate(predictions):
+      self.bids_label_matrix[round_nbr - 1][player_index].config(text=n_bids)
+    self.n_bids.set(int(np.sum(predictions)))
+    self._show_trick_table(predictions)
+    won_tricks = np.zeros(self.n_players, dtype=np.int8)
+    tricks = round_result["tricks"]
+    if self.round_snapshots_only:
+      for _, winner in tricks[:-1]:
+        won_tricks[winner] += 1
+      tricks = tricks[-1:]
+
+    def show_trick(trick_index: int):
+      played_cards, winner = tricks[trick_index]
+      for card_view, card in zip(self.played_cards, played_cards):
+        card_view.show_card(card)
+        card_view.set_highlight(False)
+      self.played_cards[winner].set_highlight(True)
+      won_tricks[winner] += 1
+      self.player_bids_labels[winner].config(text=f"{won_tricks[winner]} / {predictions[winner]}")
+      if trick_index + 1 < len(tricks):
+        self._schedule_step(self.end_of_trick_delay, lambda: show_trick(trick_index + 1))
+      else:
+        self._schedule_step(self.end_of_trick_delay, self._end_round)
+    if self.round_snapshots_only:
+      # show the final number of won tricks of all players
+      for player_index in range(self.n_players):
+        self.player_bids_labels[player_index].config(text=f"{won_tricks[player_index]} / {predictions[player_index]}")
+    show_trick(0)
+
+
+  def _schedule_step(self, delay: float, function: Callable[[], None]):
+    """
+    continue the game with `function` after `delay` seconds.
+    In spectator mode, the delay is divided by the chosen speed and the step waits while the game is paused.
+
+    inputs:
+    -------
+      delay (float): delay in seconds
+      function (Callable): function without arguments
+    """
+    if not self.spectator_mode:
+      self._schedule(int(delay * 1000), function)
+      return
+    def run_step():
+      if self.spectator_paused:
+        self.spectator_next_step = function
+      else:
+        function()
+    self._schedule(int(delay * 1000 / max(1, self.spectator_speed.get())), run_step)
+
+
+  def _toggle_spectator_pause(self, *_):
+    """
+    pause or resume a game in spectator mode
+    """
+    self.spectator_paused = not self.spectator_paused
+    if not self.spectator_paused:
+      self._show_next_spectator_step()
+
+
+  def _show_next_spectator_step(self, *_):
+    """
+    continue a paused game in spectator mode by one step (e.g. show the next trick)
+    """
+    if self.spectator_next_step is None or self.game_closed:
+      return
+    next_step = self.spectator_next_step
+    self.spectator_next_step = None
+    next_step()
+
+
+  def _schedule(self, delay: int, function: Callable[[], None]):
+    """
+    call `function` after `delay` milliseconds on the Tk main thread unless the game was closed
+
+    inputs:
+    -------
+      delay (int): delay in milliseconds
+      function (Callable): function without arguments
+    """
+    if self.game_closed:
+      return
+    def run_callback():
+      self.scheduled_callbacks.discard(after_id)
+      if not self.game_closed:
+        function()
+    after_id = self.master_window.after(delay, run_callback)
+    self.scheduled_callbacks.add(after_id)
+
+
+  def _get_decision_kwargs_copy(self) -> dict:
+    """
+    arguments of the next AI decision (see `Game_Engine.get_decision_kwargs`) with copies of the game state and the dealt hands,
+    since the human may decide and change the game state on the Tk thread while the AI computes a hint
+    """
+    kwargs: dict = self.engine.get_decision_kwargs()
+    kwargs["game_state"] = copy_game_state(kwargs["game_state"])
+    if "hands" in kwargs:
+      kwargs["hands"] = [list(hand) for hand in kwargs["hands"]]
+    return kwargs
+
+
+  def _run_ai(self, ai_method: Callable, use_result: Callable, **kwargs):
+    """
+    compute an AI decision on the background thread and pass the result to `use_result` on the Tk main thread.
+    The result is discarded if another decision was made in the meantime (e.g. a human played before a hint was ready).
+
+    inputs:
+    -------
+      ai_method (Callable): AI method to call with `kwargs`
+      use_result (Callable): function called with the result of `ai_method`
+      **kwargs: keyword arguments of `ai_method`
+    """
+    decision_id = self.decision_id
+    future: Future = self.ai_executor.submit(ai_method, **kwargs)
+    def check_result():
+      if decision_id != self.decision_id:
+        return
+      if not future.done():
+        self._schedule(self.ai_poll_interval, check_result)
+        return
+      use_result(future.result())
+    self._schedule(self.ai_poll_interval, check_result)
 
 
   def _show_winner(self):
@@ -753,7 +1073,7 @@ class Game_Gui():
                  hand: list,
                  player_index: int,
                  clickable: bool = False):
-    """show the given hand of a player
+    """show the given hand of a player. Only card views that are not yet shown at the right position are moved.
 
     inputs:
     -------
@@ -761,22 +1081,14 @@ class Game_Gui():
       player_infex (int) - index of the player to label the hand
       clickable (bool) - whether or not clicking the cards triggers an action # TODO
     """
-    clear_frame(self.players_hand_frame)
     player_name = f"Hand of Player {player_index+1}:"
-    player_name_label = tk.Label(
-        master=self.players_hand_frame,
-        text=player_name)
-    self.wizard_menu.add_label_style(player_name_label)
-    player_name_label.place(
-        anchor="nw",
-        x=0,
-        y=0)
-    # player_name_label.grid(
-    #     sticky="sw",
-    #     row=0,
-    #     column=0,
-    #     padx=0,
-    #     pady=10)
+    if self.hand_name_label["text"] != player_name:
+      self.hand_name_label.config(text=player_name)
+    if not self.hand_name_label.winfo_manager():
+      self.hand_name_label.place(
+          anchor="nw",
+          x=0,
+          y=0)
 
     frame_width = self.master_window.winfo_width() - self.players_points_frame.winfo_width() - 100
     if len(hand) > 1:
@@ -785,123 +1097,261 @@ class Game_Gui():
     else:
       card_x_shift = 0
 
-    self.players_hand_frame.config(width=frame_width, height=self.card_height + 50),
-    x_position = 0
-    for i, card in enumerate(hand):
-      card_frame = tk.Frame(
-          master=self.players_hand_frame,
-          bg=self.gui_colors["card_color"],
-          highlightbackground=self.gui_colors["card_border"],
-          highlightthickness=5,
-          width=self.card_width,
-          height=self.card_height)
-      card_frame.grid_propagate(False)
-      card_frame.place(
-          anchor="nw",
-          x=x_position,
-          y=50)
-      self._show_card(card_frame, card)
-      if clickable:
-        self._make_clickable(card_frame, card)
-      x_position += card_x_shift
+    if self.hand_frame_size != (frame_width, self.card_height + 50):
+      self.hand_frame_size = (frame_width, self.card_height + 50)
+      self.players_hand_frame.config(width=frame_width, height=self.card_height + 50)
+    new_hand = [card.raw_value for card in hand]
+    for raw_value in set(self.shown_hand) - set(new_hand):
+      self.hand_card_views[raw_value].hide()
+      self.hand_card_views[raw_value].set_hint(None)
+    for i, raw_value in enumerate(new_hand):
+      card_view = self.hand_card_views[raw_value]
+      card_view.place_at(i * card_x_shift, 50)
+      card_view.set_highlight(False)
+    if new_hand != self.shown_hand:
+      # cards further right are shown on top
+      for raw_value in new_hand:
+        self.hand_card_views[raw_value].lift()
+    self.shown_hand = new_hand
+    self.hand_clickable = clickable
+
+
+  def _hide_hand(self):
+    """
+    hide the currently shown hand
+    """
+    for raw_value in self.shown_hand:
+      self.hand_card_views[raw_value].hide()
+      self.hand_card_views[raw_value].set_hint(None)
+    self.shown_hand = []
+    self.hand_clickable = False
+    self.hand_name_label.place_forget()
 
 
-  def _make_clickable(self, frame: tk.Frame, card: Wizard_Card):
+  def _make_clickable(self, card_view: "Card_View"):
     """
-    Make a wizard card frame clickable as well as highlight it when the mouse hovers over it.
+    Make a card view of the hand clickable as well as highlight it when the mouse hovers over it.
+    Both only have an effect while `self.hand_clickable` is True.
 
     inputs:
     -------
-      frame (tk.Frame: - the frame that should be clickable
-      card (Wizard_Card: - the card that is represented by the frame. When clicked, `self.check_action()` will be executed with this card as the argument.
+      card_view (Card_View): card view of `self.hand_card_views`. When clicked, `self._check_action()` will be executed with the corresponding card of the active player's hand.
     """
     def on_enter_card(_):
-      frame.place(
-          anchor="nw",
-          x=frame.winfo_x(),
-          y=frame.winfo_y() - 40)
-      frame.config(highlightbackground=self.gui_colors["card_highlight_border"])
-
-    def on_leave_card(_):
-      frame.place(
-          anchor="nw",
-          x=frame.winfo_x(),
-          y=frame.winfo_y() + 40)
-      frame.config(highlightbackground=self.gui_colors["card_border"])
+      if self.hand_clickable:
+        card_view.place_at(card_view.position[0], 10)
+        card_view.set_highlight(True)
+
+    def on_leave_card(event):
+      # moving the mouse onto a label of the card also leaves the frame
+      if self.master_window.winfo_containing(event.x_root, event.y_root) in card_view.parts:
+        return
+      if self.hand_clickable:
+        card_view.place_at(card_view.position[0], 50)
+        card_view.set_highlight(False)
 
     def on_click_card(_):
-      # print(card)
-      self._check_action(card)
+      if not self.hand_clickable:
+        return
+      hand = self.game_obj.players_hands[self.game_obj.trick_active_player]
+      for card in hand:
+        if card.raw_value == card_view.card.raw_value:
+          self._check_action(card)
+          return
 
-    frame.bind("<Enter>", on_enter_card)
-    frame.bind("<Leave>", on_leave_card)
-    frame.bind("<Button-1>", on_click_card)
+    card_view.bind("<Enter>", on_enter_card)
+    card_view.bind("<Leave>", on_leave_card)
+    for part in card_view.parts:
+      part.bind("<Button-1>", on_click_card)
 
 
-  def _show_card(self, frame: tk.Frame, card: Wizard_Card):
+class Card_View(tk.Frame):
+  """
+  a frame that shows a wizard card or an empty card slot.
+  The labels are created once, `show_card` only reconfigures them if the shown card changes.
+  """
+  def __init__(self,
+               master: tk.Widget,
+               gui_colors: dict,
+               card_color_to_str: dict,
+               width: int,
+               height: int):
     """
-    show a wizard card
+    create an empty card view
 
     inputs:
     -------
-      frame (tk.Frame: - the tkinter frame where the card is to be shown
-      card (Wizard_Card: - the card to be displayed
+      master (tk.Widget): parent widget
+      gui_colors (dict): colors of the gui (see `Menu_Gui`)
+      card_color_to_str (dict): maps card colors to keys of `gui_colors`
+      width (int): width of the card in pixels
+      height (int): height of the card in pixels
     """
-    if card is None:
-      return
+    super().__init__(
+        master=master,
+        bg=gui_colors["card_color"],
+        highlightbackground=gui_colors["card_border"],
+        highlightthickness=5,
+        width=width,
+        height=height)
+    self.grid_propagate(False)
+    self.gui_colors = gui_colors
+    self.card_color_to_str = card_color_to_str
+    self.card = None
+    self.highlighted = False
+    # shown hint text and whether it is the best hint, None if no hint is shown
+    self.hint = None
+    # position when placed with `place_at`, None if hidden
+    self.position = None
+
     card_font = "cooper black"
-    if card.value == 0:
-      card_text = "J"
-    elif card.value == 14:
-      card_text = "W"
-    else:
-      card_text = card.value
-    card_value_labels = [tk.Label(
-        master=frame,
-        text=card_text,
+    self.card_value_labels = [tk.Label(
+        master=self,
+        text="",
         width=2,
-        bg=self.gui_colors["card_color"],
-        fg=self.gui_colors[self.card_color_to_str[card.color]],
+        bg=gui_colors["card_color"],
+        fg=gui_colors["card_color"],
         font=(card_font, "15", "")) for _ in range(4)]
-
-    card_value_labels[0].grid(
+    self.card_value_labels[0].grid(
         sticky="nw",
         row=0,
         column=0,
         padx=(5, 0),
         pady=(5, 0))
-    card_value_labels[1].grid(
+    self.card_value_labels[1].grid(
         sticky="ne",
         row=0,
         column=2,
         padx=(0, 5),
         pady=(5, 0))
-    card_value_labels[2].grid(
+    self.card_value_labels[2].grid(
         sticky="sw",
         row=2,
         column=0,
         padx=(5, 0),
         pady=(5, 0))
-    card_value_labels[3].grid(
+    self.card_value_labels[3].grid(
         sticky="se",
         row=2,
         column=2,
         padx=(5, 0),
         pady=(5, 0))
 
-    card_big_value_label = tk.Label(
-        master=frame,
-        text=card_text,
+    self.card_big_value_label = tk.Label(
+        master=self,
+        text="",
         width=2,
-        bg=self.gui_colors["card_color"],
-        fg=self.gui_colors[self.card_color_to_str[card.color]],
+        bg=gui_colors["card_color"],
+        fg=gui_colors["card_color"],
         font=(card_font, "25", ""))
-    card_big_value_label.grid(
+    self.card_big_value_label.grid(
         sticky="se",
         row=1,
         column=1,
         padx=10,
         pady=55)
+    # placed on the card by `set_hint`
+    self.hint_label = tk.Label(
+        master=self,
+        fg=gui_colors["white"],
+        font=("", "12", "bold"))
+    # all widgets of the card view (e.g. to bind mouse clicks)
+    self.parts = (self, *self.card_value_labels, self.card_big_value_label, self.hint_label)
+
+
+  def show_card(self, card: Wizard_Card):
+    """
+    show a wizard card
+
+    inputs:
+    -------
+      card (Wizard_Card): the card to be displayed. `None` shows an empty card.
+    """
+    if card == self.card:
+      return
+    self.card = card
+    if card is None:
+      card_text = ""
+      text_color = self.gui_colors["card_color"]
+    else:
+      if card.value == 0:
+        card_text = "J"
+      elif card.value == 14:
+        card_text = "W"
+      else:
+        card_text = card.value
+      text_color = self.gui_colors[self.card_color_to_str[card.color]]
+    for label in (*self.card_value_labels, self.card_big_value_label):
+      label.config(text=card_text, fg=text_color)
+
+
+  def set_hint(self, text: str, best: bool = False):
+    """
+    show a short hint (e.g. the estimated value of the card) at the bottom of the card
+
+    inputs:
+    -------
+      text (str): hint text. `None` removes the hint.
+      best (bool): whether to highlight the hint as the best one
+    """
+    hint = None if text is None else (text, best)
+    if hint == self.hint:
+      return
+    self.hint = hint
+    if text is None:
+      self.hint_label.place_forget()
+      return
+    self.hint_label.config(
+        text=text,
+        bg=self.gui_colors["card_highlight_border"] if best else self.gui_colors["card_border"])
+    self.hint_label.place(
+        anchor="s",
+        relx=.5,
+        rely=1,
+        y=-5)
+
+
+  def set_highlight(self, highlighted: bool):
+    """
+    highlight the border of the card (e.g. for the winning card of a trick)
+
+    inputs:
+    -------
+      highlighted (bool): whether or not to highlight the card
+    """
+    if highlighted == self.highlighted:
+      return
+    self.highlighted = highlighted
+    border_color = self.gui_colors["card_highlight_border"] if highlighted else self.gui_colors["card_border"]
+    self.config(highlightbackground=border_color)
+
+
+  def place_at(self, x: int, y: int):
+    """
+    place the card view at the given position in its parent if it is not already there
+
+    inputs:
+    -------
+      x (int): x position of the top left corner
+      y (int): y position of the top left corner
+    """
+    if self.position == (x, y):
+      return
+    self.position = (x, y)
+    self.place(
+        anchor="nw",
+        x=x,
+        y=y)
+
+
+  def hide(self):
+    """
+    remove a card view placed with `place_at` from its parent
+    """
+    if self.position is None:
+      return
+    self.position = None
+    self.place_forget()
 
 
 def clear_frame(frame: tk.Frame):
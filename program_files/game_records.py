@@ -0,0 +1,483 @@
+"""
+this module implements a compact binary format to record complete games of wizard
+and a buffered, append-only writer for it.
+
+A record file starts with an 8 byte file header (`RECORD_FILE_HEADER`), followed by any number of game records.
+Each game record is laid out as follows (all values are unsigned bytes unless stated otherwise):
+    - record length in bytes including this field (uint16, little endian)
+    - number of players `n`
+    - number of played rounds
+    - round starting player of the `Game_State` before the first round was started
+    - `n` seat ids: index of the configured player sitting in each seat (255 = unknown)
+    for each round `r` (starting at 1):
+      - raw value of the trump card (255 = no trump card)
+      - trump color (int8, -1 = no trump)
+      - `n` predictions in seat order
+      - `n * r` raw values of the played cards in the order they were played
+
+Dealt hands are not stored explicitly: every card a player is dealt gets played during the round,
+so the hands can be reconstructed from the played cards and the trick winners. This keeps rounds at a few dozen bytes.
+
+Record files are read with `Game_Record_Reader`, which memory-maps the file and replays single games through `Game_State`.
+"""
+import os
+import time
+import multiprocessing.util as mp_util
+from collections import namedtuple
+from typing import Iterator
+
+import numpy as np
+
+from program_files.game_state import Game_State
+from program_files.wizard_card import Wizard_Card
+from program_files.scoring_functions import update_winning_card
+
+RECORD_FILE_HEADER: bytes = b"WZGR\x01\x00\x00\x00"
+RECORD_FILE_EXTENSION: str = ".wgr"
+NO_CARD: int = 255
+
+# writers for each record directory in the current process, see `get_record_writer`
+_process_writers: dict = dict()
+# one shared card object for each raw value, used when replaying games
+_cards: tuple = tuple(Wizard_Card(raw_value) for raw_value in range(60))
+
+# index entry for each game in a record file
+GAME_INDEX_DTYPE: np.dtype = np.dtype([
+    ("offset", np.int64),
+    ("length", np.uint16),
+    ("n_players", np.uint8),
+    ("n_rounds", np.uint8),
+    ("starting_player", np.uint8)])
+# entry for each round in a record file
+ROUND_DTYPE: np.dtype = np.dtype([
+    ("game", np.int64),
+    ("round_number", np.uint8),
+    ("offset", np.int64),
+    ("trump_card", np.uint8),
+    ("trump_color", np.int8)])
+
+# a single decision in a replayed game. `kind` is one of "trump", "bid" and "trick" (or "round_end", see `replay_game`).
+# `action` is the chosen trump color, bid or played card. `hands` are the hands of all players.
+Replay_Step = namedtuple("Replay_Step", ["kind", "player_index", "action", "game_state", "hands"])
+
+
+class Game_Record_Writer():
+  """
+  Buffered, append-only writer for game records.
+  Games are collected in memory and appended to the file in large blocks. Only complete games are ever written,
+  so a record file stays readable even if a process gets killed while playing.
+  """
+  def __init__(self,
+      file_path: str,
+      buffer_size: int = 1 << 20,
+      flush_interval: float = 5.):
+    """
+    inputs:
+    -------
+        file_path (str): path of the record file. New games are appended if the file already exists.
+        buffer_size (int): number of bytes to collect before writing them to the file
+        flush_interval (float): maximum time in seconds that finished games are kept in memory
+    """
+    self.file_path: str = file_path
+    self.buffer_size: int = buffer_size
+    self.flush_interval: float = flush_interval
+    self.n_games: int = 0
+
+    self._buffer: bytearray = bytearray()
+    self._game_buffer: bytearray = bytearray()
+    self._n_rounds: int = 0
+    self._last_flush: float = time.monotonic()
+    if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+      with open(file_path, "wb") as file:
+        file.write(RECORD_FILE_HEADER)
+
+
+  def start_game(self, game_state: Game_State, seat_ids: list = None) -> None:
+    """
+    start recording a new game. Must be called before the first round is started in `game_state`.
+
+    inputs:
+    -------
+        game_state (Game_State): the game state of the new game
+        seat_ids (list[int]): index of the configured player sitting in each seat. `None` if unknown.
+    """
+    self._game_buffer = bytearray(b"\x00\x00")  # placeholder for the record length
+    self._game_buffer.append(game_state.n_players)
+    self._game_buffer.append(0)  # placeholder for the number of rounds
+    self._game_buffer.append(game_state.round_starting_player)
+    if seat_ids is None:
+      self._game_buffer.extend([NO_CARD] * game_state.n_players)
+    else:
+      self._game_buffer.extend([int(seat_id) for seat_id in seat_ids])
+    self._n_rounds = 0
+
+
+  def record_round(self,
+      trump_card: Wizard_Card,
+      trump_color: int,
+      predictions: "np.ndarray") -> None:
+    """
+    record the start of a round once all players made their predictions.
+
+    inputs:
+    -------
+        trump_card (Wizard_Card): trump card of the round, `None` if there is no trump card
+        trump_color (int): trump color of the round, -1 for no trump
+        predictions (np.ndarray): predicted number of tricks of each player
+    """
+    self._game_buffer.append(NO_CARD if trump_card is None else trump_card.raw_value)
+    self._game_buffer.append(trump_color & 0xFF)
+    self._game_buffer.extend([int(prediction) for prediction in predictions])
+    self._n_rounds += 1
+
+
+  def record_action(self, action: Wizard_Card) -> None:
+    """
+    record a played card
+
+    inputs:
+    -------
+        action (Wizard_Card): the card that was played
+    """
+    self._game_buffer.append(action.raw_value)
+
+
+  def end_game(self) -> None:
+    """
+    finish the current game record and move it to the write buffer.
+    The buffer is written to file if it's full or hasn't been written for `flush_interval` seconds.
+    """
+    game_buffer: bytearray = self._game_buffer
+    game_buffer[0:2] = len(game_buffer).to_bytes(2, "little")
+    game_buffer[3] = self._n_rounds
+    self._buffer.extend(game_buffer)
+    self._game_buffer = bytearray()
+    self.n_games += 1
+    if len(self._buffer) >= self.buffer_size \
+        or time.monotonic() - self._last_flush > self.flush_interval:
+      self.flush()
+
+
+  def flush(self) -> None:
+    """
+    write all finished games to the record file
+    """
+    if self._buffer:
+      with open(self.file_path, "ab") as file:
+        file.write(self._buffer)
+      self._buffer = bytearray()
+    self._last_flush = time.monotonic()
+
+
+  def close(self) -> None:
+    """
+    write all finished games to the record file. Unfinished games are discarded.
+    """
+    self.flush()
+    self._game_buffer = bytearray()
+
+
+def get_record_writer(record_dir: str) -> Game_Record_Writer:
+  """
+  get the record writer of the current process for the given directory.
+  Every process writes to its own file, so multiprocessing workers never have to share a file.
+  The writer is flushed automatically when the process exits.
+
+  inputs:
+  -------
+      record_dir (str): directory where the record files are stored
+
+  returns:
+  --------
+      Game_Record_Writer: writer appending to `record_dir/game_records_<pid>.wgr`
+  """
+  key: tuple = (record_dir, os.getpid())
+  writer: Game_Record_Writer = _process_writers.get(key)
+  if writer is None:
+    os.makedirs(record_dir, exist_ok=True)
+    writer = Game_Record_Writer(
+        os.path.join(record_dir, f"game_records_{os.getpid()}{RECORD_FILE_EXTENSION}"))
+    _process_writers[key] = writer
+    # also runs in multiprocessing workers that exit without calling `atexit` handlers
+    mp_util.Finalize(writer, writer.close, exitpriority=10)
+  return writer
+
+
+def list_record_files(record_dir: str) -> list[str]:
+  """
+  list all game record files in a directory
+
+  inputs:
+  -------
+      record_dir (str): directory containing record files
+
+  returns:
+  --------
+      list[str]: sorted paths of all record files
+  """
+  return sorted(
+      os.path.join(record_dir, file_name) for file_name in os.listdir(record_dir)
+      if file_name.endswith(RECORD_FILE_EXTENSION))
+
+
+class Game_Record_Reader():
+  """
+  Read game records from a memory-mapped record file.
+
+  The file is indexed once and the index is cached next to the record file (`<file>.idx.npy`),
+  so any single game can be accessed without parsing the rest of the file.
+  If the record file has grown since the index was written, only the new games are indexed.
+  """
+  def __init__(self, file_path: str, cache_index: bool = True):
+    """
+    inputs:
+    -------
+        file_path (str): path of the record file
+        cache_index (bool): whether to load and save the game index from/ to `<file_path>.idx.npy`
+    """
+    self.file_path: str = file_path
+    self.data: np.ndarray = np.memmap(file_path, dtype=np.uint8, mode="r")
+    if bytes(self.data[:len(RECORD_FILE_HEADER)]) != RECORD_FILE_HEADER:
+      raise ValueError(f"{file_path} is not a game record file.")
+    self.index_path: str = file_path + ".idx.npy"
+    self.games: np.ndarray = self._load_index(cache_index)
+    self._rounds: np.ndarray = None
+
+
+  def __len__(self) -> int:
+    return len(self.games)
+
+
+  def _load_index(self, cache_index: bool) -> np.ndarray:
+    """
+    load the game index from the cache file and index all games that are not contained in it yet
+
+    returns:
+    --------
+        np.ndarray: structured array with dtype `GAME_INDEX_DTYPE`
+    """
+    old_index: np.ndarray = np.zeros(0, dtype=GAME_INDEX_DTYPE)
+    if cache_index and os.path.exists(self.index_path):
+      old_index = np.load(self.index_path)
+      if len(old_index) > 0 and old_index[-1]["offset"] + old_index[-1]["length"] > len(self.data):
+        old_index = np.zeros(0, dtype=GAME_INDEX_DTYPE)  # record file was replaced
+    if len(old_index) > 0:
+      offset: int = int(old_index[-1]["offset"]) + int(old_index[-1]["length"])
+    else:
+      offset: int = len(RECORD_FILE_HEADER)
+    data: np.ndarray = self.data
+    new_entries: list[tuple] = []
+    end: int = len(data)
+    while offset + 2 <= end:
+      length: int = int(data[offset]) | int(data[offset + 1]) << 8
+      if length == 0 or offset + length > end:
+        break  # incomplete game at the end of the file
+      new_entries.append((offset, length, data[offset + 2], data[offset + 3], data[offset + 4]))
+      offset += length
+    if not new_entries:
+      return old_index
+    index: np.ndarray = np.concatenate([old_index, np.array(new_entries, dtype=GAME_INDEX_DTYPE)])
+    if cache_index:
+      np.save(self.index_path, index)
+    return index
+
+
+  @property
+  def rounds(self) -> np.ndarray:
+    """
+    structured array (dtype `ROUND_DTYPE`) with one entry for every round in the file.
+    Predictions and played cards of a round start at `offset + 2` and `offset + 2 + n_players` respectively.
+    """
+    if self._rounds is None:
+      n_rounds: np.ndarray = self.games["n_rounds"].astype(np.int64)
+      n_players: np.ndarray = np.repeat(self.games["n_players"].astype(np.int64), n_rounds)
+      game_indices: np.ndarray = np.repeat(np.arange(len(self.games)), n_rounds)
+      # round number within each game, starting at 1
+      round_numbers: np.ndarray = np.arange(len(game_indices)) - np.repeat(np.cumsum(n_rounds) - n_rounds, n_rounds) + 1
+      # size of all previous rounds: sum over k < r of (2 + n + n*k)
+      previous_rounds: np.ndarray = round_numbers - 1
+      offsets: np.ndarray = self.games["offset"][game_indices] + 5 + n_players \
+          + previous_rounds * (2 + n_players) + n_players * previous_rounds * round_numbers // 2
+      rounds: np.ndarray = np.zeros(len(game_indices), dtype=ROUND_DTYPE)
+      rounds["game"] = game_indices
+      rounds["round_number"] = round_numbers
+      rounds["offset"] = offsets
+      rounds["trump_card"] = self.data[offsets]
+      rounds["trump_color"] = self.data[offsets + 1].view(np.int8)
+      self._rounds = rounds
+    return self._rounds
+
+
+  def get_seat_ids(self, game_index: int) -> np.ndarray:
+    """
+    get the seat ids of the given game (index of the configured player in each seat, 255 = unknown)
+    """
+    offset, _, n_players, _, _ = self.games[game_index]
+    return np.array(self.data[offset + 5:offset + 5 + n_players])
+
+
+  def get_game_rounds(self, game_index: int) -> list[tuple[int, int, np.ndarray, np.ndarray]]:
+    """
+    parse the rounds of a single game
+
+    inputs:
+    -------
+        game_index (int): index of the game in the file
+
+    returns:
+    --------
+        list[tuple[int, int, np.ndarray, np.ndarray]]: for each round: trump card raw value (255 = none),
+            trump color, predictions in seat order and raw values of the played cards in the order they were played
+    """
+    offset, _, n_players, n_rounds, _ = self.games[game_index]
+    offset, n_players = int(offset), int(n_players)
+    data: np.ndarray = self.data
+    offset += 5 + n_players
+    rounds: list[tuple[int, int, np.ndarray, np.ndarray]] = []
+    for round_nbr in range(1, int(n_rounds) + 1):
+      trump_card: int = int(data[offset])
+      trump_color: int = int(data[offset + 1].view(np.int8))
+      predictions: np.ndarray = np.array(data[offset + 2:offset + 2 + n_players], dtype=np.int8)
+      cards_offset: int = offset + 2 + n_players
+      played_cards: np.ndarray = np.array(data[cards_offset:cards_offset + n_players * round_nbr])
+      rounds.append((trump_card, trump_color, predictions, played_cards))
+      offset = cards_offset + n_players * round_nbr
+    return rounds
+
+
+  def replay_game(self,
+      game_index: int,
+      verbosity: int = 0,
+      yield_round_ends: bool = False) -> Iterator[Replay_Step]:
+    """
+    replay a recorded game through `Game_State` and yield every decision point before the decision is applied.
+    The yielded `Game_State` object is advanced in-place by the replay, so copy anything that is needed later.
+
+    inputs:
+    -------
+        game_index (int): index of the game in the file
+        verbosity (int): verbosity of the replayed `Game_State`
+        yield_round_ends (bool): whether to additionally yield a step of kind "round_end" after each scored round.
+            Its `player_index` is the winner of the last trick, `action` is `None`.
+
+    yields:
+    -------
+        Replay_Step: kind of decision, deciding player, chosen action, game state and hands of all players
+    """
+    _, _, n_players, _, starting_player = self.games[game_index]
+    n_players = int(n_players)
+    game: Game_State = Game_State(n_players=n_players, verbosity=verbosity)
+    game.round_starting_player = int(starting_player)
+    for round_nbr, (trump_card_value, trump_color, predictions, played_cards) \
+        in enumerate(self.get_game_rounds(game_index), start=1):
+      trump_card: Wizard_Card = None if trump_card_value == NO_CARD else _cards[trump_card_value]
+      round_starting_player: int = (game.round_starting_player + 1) % n_players
+      hands: list[list[Wizard_Card]] = _reconstruct_hands(
+          played_cards, n_players, round_starting_player, trump_color)
+      if trump_card is not None and trump_card.value == 14:
+        yield Replay_Step("trump", game.round_starting_player, trump_color, game, hands)
+      game.start_round(hands, trump_card, trump_color)
+      player_index: int = game.round_starting_player
+      for _ in range(n_players):
+        yield Replay_Step("bid", player_index, int(predictions[player_index]), game, hands)
+        game.add_prediction(predictions[player_index])
+        player_index = (player_index + 1) % n_players
+      for card_index, raw_value in enumerate(played_cards):
+        if card_index % n_players == 0:
+          game.start_trick()
+        action: Wizard_Card = _cards[raw_value]
+        yield Replay_Step("trick", game.trick_active_player, action, game, hands)
+        game.perform_action(action)
+      if yield_round_ends:
+        yield Replay_Step("round_end", game.trick_winner_index, None, game, hands)
+
+
+  def get_game_state(self, game_index: int, round_number: int, kind: str = "trick", n_decision: int = 0) -> Replay_Step:
+    """
+    reconstruct the game state at a specific decision point of a game.
+    Only the requested game is parsed and replayed.
+
+    inputs:
+    -------
+        game_index (int): index of the game in the file
+        round_number (int): round of the decision
+        kind (str): kind of the decision: "trump", "bid" or "trick"
+        n_decision (int): number of decisions of that kind made earlier in the same round
+
+    returns:
+    --------
+        Replay_Step: the requested decision point
+    """
+    n_found: int = 0
+    for step in self.replay_game(game_index):
+      if step.kind != kind:
+        continue
+      step_round: int = step.game_state.round_number
+      if step_round == round_number:
+        if n_found == n_decision:
+          return step
+        n_found += 1
+      elif step_round > round_number:
+        break
+    raise IndexError(f"Game {game_index} has no decision {n_decision} of kind '{kind}' in round {round_number}.")
+
+
+  def iter_decisions(self,
+      game_indices: Iterator[int] = None,
+      yield_round_ends: bool = False) -> Iterator[tuple[int, Replay_Step]]:
+    """
+    replay several games and yield all of their decision points
+
+    inputs:
+    -------
+        game_indices (Iterator[int]): indices of the games to replay. Defaults to all games in the file.
+        yield_round_ends (bool): whether to also yield the end of each round (see `replay_game`)
+
+    yields:
+    -------
+        int: index of the game
+        Replay_Step: a decision point of that game
+    """
+    if game_indices is None:
+      game_indices = range(len(self.games))
+    for game_index in game_indices:
+      for step in self.replay_game(game_index, yield_round_ends=yield_round_ends):
+        yield game_index, step
+
+
+def _reconstruct_hands(
+    played_cards: np.ndarray,
+    n_players: int,
+    round_starting_player: int,
+    trump_color: int) -> list[list[Wizard_Card]]:
+  """
+  reconstruct the dealt hands of a round from the played cards by determining the trick winners
+
+  inputs:
+  -------
+      played_cards (np.ndarray): raw values of the played cards in the order they were played
+      n_players (int): number of players
+      round_starting_player (int): player who started the first trick
+      trump_color (int): trump color of the round
+
+  returns:
+  --------
+      list[list[Wizard_Card]]: sorted hand of each player
+  """
+  hands: list[list[Wizard_Card]] = [[] for _ in range(n_players)]
+  trick_starting_player: int = round_starting_player
+  for trick_start in range(0, len(played_cards), n_players):
+    winner_index, winning_card, serving_color = 0, None, None
+    for i, raw_value in enumerate(played_cards[trick_start:trick_start + n_players]):
+      player_index: int = (trick_starting_player + i) % n_players
+      card: Wizard_Card = _cards[raw_value]
+      hands[player_index].append(card)
+      winner_index, winning_card, serving_color = update_winning_card(
+          player_index=player_index,
+          new_card=card,
+          winner_index=winner_index,
+          winning_card=winning_card,
+          serving_color=serving_color,
+          trump_color=trump_color)
+    trick_starting_player = winner_index
+  return [sorted(hand) for hand in hands]
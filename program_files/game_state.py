@@ -15,7 +15,8 @@ class Game_State():
       - tricks to be played - (int) - `tricks_to_be_played` - `<= round_number`
       - trick starting player - (int) - `trick_starting_player` - `<= n_players`
       - player hands - (list[list[Wizard_Card]]) - `players_hands`
-      - predictions for each player - (list[int]) - `players_predictions`
+      - predictions for each player - (list[int]) - `players_predictions` - 0 for players that did not bid yet
+      - number of bids made this round - (int) - `n_predictions`
       - won tricks for each player - (list[int]) - `players_won_tricks`
       - total points for each player - (list[int]) - `players_total_points`
       - public card states - (list[int]) - `public_card_states`
@@ -39,6 +40,7 @@ class Game_State():
 
     self.players_hands: set = None
     self.players_predictions: "np.ndarray" = None
+    self.n_predictions: int = 0
     self.players_won_tricks: "np.ndarray" = np.zeros(n_players, dtype=np.int8)
     self.players_gained_points_history: "np.ndarray" = np.zeros((60 // n_players, n_players))
     self.players_total_points: "np.ndarray" = np.zeros(n_players, dtype=np.int16)
@@ -152,6 +154,7 @@ class Game_State():
         - players_hands
         - players_total_points
         - players_predictions
+        - n_predictions
         - players_won_tricks
         - public_card_states
     """
@@ -164,7 +167,8 @@ class Game_State():
     self.trick_active_player = self.round_starting_player
     # set player information
     self.players_hands = hands
-    self.players_predictions = None
+    self.players_predictions = np.zeros(self.n_players, dtype=np.int8)
+    self.n_predictions = 0
     self.players_won_tricks = np.zeros(self.n_players, dtype=np.int8)
     # set card state information
     self.public_card_states = -np.ones(60, dtype=np.int8)
@@ -188,13 +192,34 @@ class Game_State():
 
   def set_predictions(self, predictions: "np.ndarray"):
     """
-    save predictions
+    save the predictions of all players at once
 
     inputs:
     -------
         predictions (np.ndarray): predicted number of tricks for each player
     """
     self.players_predictions = predictions
+    self.n_predictions = self.n_players
+
+
+  def add_prediction(self, prediction: int) -> int:
+    """
+    save the prediction of the next player in bidding order, so that later players see all earlier bids.
+    Players bid in seat order starting with `round_starting_player`.
+
+    inputs:
+    -------
+        prediction (int): predicted number of tricks of the next player
+
+    returns:
+    --------
+        int: index of the player who has to bid next or -1 if all players have bid
+    """
+    self.players_predictions[(self.round_starting_player + self.n_predictions) % self.n_players] = prediction
+    self.n_predictions += 1
+    if self.n_predictions == self.n_players:
+      return -1
+    return (self.round_starting_player + self.n_predictions) % self.n_players
 
   def get_active_player_hand(self) -> list:
     """returns the hand of the active player
@@ -223,6 +248,7 @@ class Game_State():
 
         "players_hands": self.players_hands,
         "players_predictions": self.players_predictions,
+        "n_predictions": self.n_predictions,
         "players_won_tricks": self.players_won_tricks,
         "players_gained_points_history": self.players_gained_points_history,
         "players_total_points": self.players_total_points,
@@ -0,0 +1,123 @@
+"""
+This module computes summary statistics of a hand (cards per color, their values, wizards and jesters)
+that the AIs use to choose trump colors and bids, and caches them in an LRU cache shared by all AIs of the process.
+
+Hands are keyed by the raw values of their cards and the trump color (`get_hand_key`).
+Dealt hands are always sorted, so equal hands have equal keys. Only hands of up to `MAX_CACHED_HAND_SIZE` cards are cached:
+hands of 1 or 2 cards repeat constantly over many games, while larger hands almost never repeat
+(less than 3% of the 3 card hands in 2000 games with 4 players). Larger hands are computed in a single pass without the cache.
+Keys are not mapped to canonical colors (see `color_symmetry.py`): that raises the hit rate of hands with up to 2 cards
+from 67% to 96%, but building the canonical key takes longer than computing the statistics of a small hand.
+The statistics keep the order in which colors first appear in the hand, so AIs break ties exactly as before.
+"""
+from bisect import bisect_left
+from collections import namedtuple
+from functools import lru_cache
+
+from program_files.wizard_card import Wizard_Card
+
+# all hands of up to 2 cards with each trump color fit in the cache
+MAX_CACHED_HAND_SIZE: int = 2
+HAND_CACHE_SIZE: int = 1 << 14
+
+# statistics of a hand for a given trump color:
+#   - `color_counts`, `color_sums`, `color_mins`, `color_maxs`: number, sum, minimum and maximum of the values
+#     of the cards of each color (0-3). Minimum and maximum are 0 for colors without cards.
+#   - `color_order`: colors (including -1 for wizards and jesters) in the order they first appear in the hand
+#   - `n_wizards`, `n_jesters`: number of wizards and jesters
+#   - `trump_values`, `other_values`: sorted values of the cards with and without the trump color
+#     (wizards and jesters have color -1, so they count as trump cards if there is no trump color)
+Hand_Statistics = namedtuple("Hand_Statistics", [
+    "color_counts", "color_sums", "color_mins", "color_maxs", "color_order",
+    "n_wizards", "n_jesters", "trump_values", "other_values"])
+
+
+def get_hand_key(hand: list[Wizard_Card], trump_color: int = -1) -> tuple:
+  """
+  hashable key of a hand and the trump color
+
+  inputs:
+  -------
+      hand (list[Wizard_Card]): cards of a player
+      trump_color (int): trump color of the round (-1 = no trump)
+
+  returns:
+  --------
+      tuple: raw values of the cards and the trump color
+  """
+  return tuple([card.raw_value for card in hand]), trump_color
+
+
+def get_hand_statistics(hand: list[Wizard_Card], trump_color: int = -1) -> Hand_Statistics:
+  """
+  return the statistics of a hand from the cache or compute them
+
+  inputs:
+  -------
+      hand (list[Wizard_Card]): cards of a player
+      trump_color (int): trump color of the round (-1 = no trump)
+
+  returns:
+  --------
+      Hand_Statistics: statistics of the hand
+  """
+  if len(hand) > MAX_CACHED_HAND_SIZE:
+    return _compute_hand_statistics(*get_hand_key(hand, trump_color))
+  return _get_cached_hand_statistics(*get_hand_key(hand, trump_color))
+
+
+def count_at_least(values: tuple, threshold: float) -> int:
+  """
+  count the values of `Hand_Statistics.trump_values` or `other_values` that are at least `threshold`
+  """
+  return len(values) - bisect_left(values, threshold)
+
+
+def _compute_hand_statistics(raw_values: tuple[int], trump_color: int) -> Hand_Statistics:
+  color_counts: list[int] = [0, 0, 0, 0]
+  color_sums: list[int] = [0, 0, 0, 0]
+  color_mins: list[int] = [0, 0, 0, 0]
+  color_maxs: list[int] = [0, 0, 0, 0]
+  color_order: list[int] = []
+  trump_values: list[int] = []
+  other_values: list[int] = []
+  n_wizards: int = 0
+  n_jesters: int = 0
+  for raw_value in raw_values:
+    value: int = raw_value % 15
+    if value == 14:
+      color: int = -1
+      n_wizards += 1
+    elif value == 0:
+      color: int = -1
+      n_jesters += 1
+    else:
+      color: int = raw_value // 15
+      if color_counts[color] == 0:
+        color_mins[color] = color_maxs[color] = value
+      elif value < color_mins[color]:
+        color_mins[color] = value
+      elif value > color_maxs[color]:
+        color_maxs[color] = value
+      color_counts[color] += 1
+      color_sums[color] += value
+    if color not in color_order:
+      color_order.append(color)
+    if color == trump_color:
+      trump_values.append(value)
+    else:
+      other_values.append(value)
+  trump_values.sort()
+  other_values.sort()
+  return Hand_Statistics(tuple(color_counts), tuple(color_sums), tuple(color_mins), tuple(color_maxs),
+      tuple(color_order), n_wizards, n_jesters, tuple(trump_values), tuple(other_values))
+
+
+_get_cached_hand_statistics = lru_cache(maxsize=HAND_CACHE_SIZE)(_compute_hand_statistics)
+
+
+def get_cache_info():
+  """
+  hits, misses and size of the shared cache (see `functools.lru_cache`)
+  """
+  return _get_cached_hand_statistics.cache_info()
@@ -42,6 +42,13 @@ class Menu_Gui():
         master=self.master_window, value=0.2)
     self.round_sleep_time = tk.DoubleVar(
         master=self.master_window, value=0.8)
+    # settings for watching AI games ("Compare AIs")
+    self.spectator_speed = tk.IntVar(
+        master=self.master_window, value=1)
+    self.round_snapshots_only = tk.BooleanVar(
+        master=self.master_window, value=False)
+    self.hint_time_budget = tk.DoubleVar(
+        master=self.master_window, value=0.5)
 
     self.init_ai_mode_variables()
 
@@ -489,6 +496,78 @@ class Menu_Gui():
         padx=(5, 0),
         pady=(5, 0))
 
+    spectator_speed_label = tk.Label(
+        self.sleep_time_frame,
+        text="speed of AI games (x)")
+    self.add_label_style(spectator_speed_label)
+    spectator_speed_label.grid(
+        row=2,
+        column=0,
+        padx=(0, 10),
+        pady=(5, 0))
+    spectator_speed_scale = tk.Scale(
+        self.sleep_time_frame,
+        variable=self.spectator_speed,
+        from_=1,
+        to=100,
+        orient="horizontal")
+    self.add_scale_style(spectator_speed_scale)
+    spectator_speed_scale.grid(
+        row=2,
+        column=1,
+        padx=(5, 0),
+        pady=(5, 0))
+
+    round_snapshots_label = tk.Label(
+        self.sleep_time_frame,
+        text="AI games: only show round results")
+    self.add_label_style(round_snapshots_label)
+    round_snapshots_label.grid(
+        row=3,
+        column=0,
+        padx=(0, 10),
+        pady=(5, 0))
+    round_snapshots_check = tk.Checkbutton(
+        master=self.sleep_time_frame,
+        bg=self.gui_colors["button_bg"],
+        fg=self.gui_colors["button_fg"],
+        activebackground=self.gui_colors["active_button"],
+        activeforeground=self.gui_colors["active_button_fg"],
+        highlightthickness=0,
+        variable=self.round_snapshots_only,
+        indicatoron=False,
+        relief="flat",
+        borderwidth=0,
+        selectcolor=self.gui_colors["active_button"],
+        padx=8,
+        textvariable=self.round_snapshots_only,
+        font=("", "15", ""))
+    round_snapshots_check.grid(
+        row=3,
+        column=1,
+        padx=(5, 0),
+        pady=(5, 0))
+
+    hint_time_label = tk.Label(
+        self.sleep_time_frame,
+        text="time for AI hints (in s)")
+    self.add_label_style(hint_time_label)
+    hint_time_label.grid(
+        row=4,
+        column=0,
+        padx=(0, 10),
+        pady=(5, 0))
+    hint_time_input = tk.Entry(
+        self.sleep_time_frame,
+        textvariable=self.hint_time_budget,
+        width=4)
+    self.add_entry_style(hint_time_input)
+    hint_time_input.grid(
+        row=4,
+        column=1,
+        padx=(5, 0),
+        pady=(5, 0))
+
   def check_menu_inputs_regular(self) -> bool:
     """
     Check that all inputs in the menu have valid values.
@@ -496,9 +575,11 @@ class Menu_Gui():
     """
     try:
       max_rounds = self.max_rounds_var.get()
+      hint_time_budget = self.hint_time_budget.get()
+      round_snapshots_only = self.round_snapshots_only.get()
     except tk.TclError:
       return False
-    if max_rounds < 1:
+    if max_rounds < 1 or hint_time_budget < 0:
       return False  # game start not successful
     n_players = self.n_players_var.get()
     limit_choices = not self.limit_choices_var.get()
@@ -512,7 +593,8 @@ class Menu_Gui():
     # # DEBUG:
     # for var_dict in ai_player_choices:
     #     print(var_dict)
-    self.start_game(n_players, limit_choices, max_rounds, ai_player_choices, sleeptimes)
+    self.start_game(n_players, limit_choices, max_rounds, ai_player_choices, sleeptimes,
+        round_snapshots_only=round_snapshots_only, hint_time_budget=hint_time_budget)
     return True
 
 
@@ -523,9 +605,11 @@ class Menu_Gui():
     """
     try:
       max_rounds = self.max_rounds_var.get()
+      hint_time_budget = self.hint_time_budget.get()
+      round_snapshots_only = self.round_snapshots_only.get()
     except tk.TclError:
       return False
-    if max_rounds < 1:
+    if max_rounds < 1 or hint_time_budget < 0:
       return False  # game start not successful
     n_players = self.n_players_var.get()
     limit_choices = not self.limit_choices_var.get()
@@ -541,7 +625,8 @@ class Menu_Gui():
     # # DEBUG:
     # for var_dict in ai_player_choices:
     #     print(var_dict)
-    self.start_game(n_players, limit_choices, max_rounds, ai_player_choices, sleeptimes)
+    self.start_game(n_players, limit_choices, max_rounds, ai_player_choices, sleeptimes,
+        round_snapshots_only=round_snapshots_only, hint_time_budget=hint_time_budget, spectator_mode=True)
     return True
 
   def start_game(self,
@@ -549,7 +634,20 @@ class Menu_Gui():
                  limit_choices: bool,
                  max_rounds: int,
                  ai_player_choices: list,
-                 sleep_times: dict) -> None:
+                 sleep_times: dict,
+                 round_snapshots_only: bool = False,
+                 hint_time_budget: float = 0.5,
+                 spectator_mode: bool = False) -> None:
+    """
+    close the menu and start a game. All settings are read and validated before, since the menu's variables can not be read
+    once the menu is destroyed.
+
+    inputs:
+    -------
+      round_snapshots_only (bool): in spectator mode, skip the tricks and only show the result of each round.
+      hint_time_budget (float): maximum time in seconds to estimate the values of the cards shown as AI hints during tricks.
+      spectator_mode (bool): whether all players are AIs that play whole rounds at once (see `Game_Gui`)
+    """
     self.main_frame.destroy()
     game_gui = Game_Gui(
         self,
@@ -557,7 +655,10 @@ class Menu_Gui():
         limit_choices,
         max_rounds,
         ai_player_choices,
-        sleep_times)
+        sleep_times,
+        spectator_speed=self.spectator_speed if spectator_mode else None,
+        round_snapshots_only=round_snapshots_only,
+        hint_time_budget=hint_time_budget)
 
 
   def add_label_style(self, label, fontsize=15):
@@ -594,6 +695,19 @@ class Menu_Gui():
         font=("", "15", ""))
 
 
+  def add_scale_style(self, scale):
+    scale.configure(
+        bg=self.gui_colors["bg"],
+        fg=self.gui_colors["fg"],
+        troughcolor=self.gui_colors["button_bg"],
+        activebackground=self.gui_colors["active_button"],
+        highlightthickness=0,
+        relief="flat",
+        bd=0,
+        length=150,
+        font=("", "12", ""))
+
+
   def add_combobox_style(self, combobox, width=12):
     # self.ttk_style = ttk.Style(self.master_window)
     # self.ttk_style = ttk.Style(combobox)
@@ -0,0 +1,258 @@
+"""
+This module implements lightweight instrumentation for the auto-play game loops.
+`Phase_Timer` records the cumulative time and the number of calls per phase of the game
+(dealing, trump choice, bidding, trick play, scoring) and per AI implementation.
+Optionally, the latency of every AI decision is recorded in a `Latency_Histogram` with logarithmic bins
+to get percentiles per AI, decision kind and round number.
+
+The game loops only check `timer is not None` when profiling is disabled. Timers and histograms of different processes can be merged.
+"""
+import math
+import time
+from collections import defaultdict
+from typing import Callable
+
+
+class Latency_Histogram():
+  """
+  histogram of decision latencies with logarithmic bins for each (decision kind, AI name, round number).
+  Percentiles are accurate up to the bin width (`10**(1/bins_per_decade)`, about 12% for the default), maxima are exact.
+  """
+  def __init__(self,
+      min_latency: float = 1e-7,
+      max_latency: float = 1e3,
+      bins_per_decade: int = 20):
+    """
+    inputs:
+    -------
+        min_latency (float): upper edge of the first bin in seconds. Shorter latencies are counted in the first bin.
+        max_latency (float): lower edge of the last bin in seconds. Longer latencies are counted in the last bin.
+        bins_per_decade (int): number of bins per factor of 10
+    """
+    self.min_latency: float = min_latency
+    self.bins_per_decade: int = bins_per_decade
+    self.n_bins: int = int(round(math.log10(max_latency / min_latency) * bins_per_decade)) + 2
+    self._log_min_latency: float = math.log10(min_latency)
+    self.counts: dict[tuple[str, str, int], list[int]] = {}
+    self.max_latencies: dict[tuple[str, str, int], float] = {}
+
+
+  def add(self, kind: str, name: str, round_number: int, latency: float) -> None:
+    """
+    record the latency of one decision
+
+    inputs:
+    -------
+        kind (str): kind of decision, e.g. "bidding"
+        name (str): name of the AI that made the decision
+        round_number (int): round of the game in which the decision was made
+        latency (float): duration of the decision in seconds
+    """
+    key: tuple[str, str, int] = (kind, name, round_number)
+    counts: list[int] = self.counts.get(key)
+    if counts is None:
+      counts = self.counts[key] = [0] * self.n_bins
+      self.max_latencies[key] = 0.
+    if latency <= self.min_latency:
+      bin_index: int = 0
+    else:
+      bin_index: int = min(
+          int((math.log10(latency) - self._log_min_latency) * self.bins_per_decade) + 1,
+          self.n_bins - 1)
+    counts[bin_index] += 1
+    if latency > self.max_latencies[key]:
+      self.max_latencies[key] = latency
+
+
+  def merge(self, other: "Latency_Histogram") -> None:
+    """
+    add the counts of another histogram with the same bins (e.g. from a worker process) to this one
+    """
+    if other.n_bins != self.n_bins or other.min_latency != self.min_latency:
+      raise ValueError("Cannot merge latency histograms with different bins.")
+    for key, other_counts in other.counts.items():
+      counts: list[int] = self.counts.get(key)
+      if counts is None:
+        self.counts[key] = list(other_counts)
+        self.max_latencies[key] = other.max_latencies[key]
+        continue
+      for i, count in enumerate(other_counts):
+        counts[i] += count
+      self.max_latencies[key] = max(self.max_latencies[key], other.max_latencies[key])
+
+
+  def get_statistics(self,
+      kind: str,
+      name: str,
+      round_number: int = None,
+      percentiles: tuple[float] = (50, 95, 99)) -> tuple[int, list[float], float]:
+    """
+    calculate latency percentiles for one AI and decision kind
+
+    inputs:
+    -------
+        kind (str): kind of decision
+        name (str): name of the AI
+        round_number (int): round number to get the statistics for. `None` combines all rounds.
+        percentiles (tuple[float]): percentiles to calculate (in [0, 100])
+
+    returns:
+    --------
+        int: number of recorded decisions
+        list[float]: upper bin edge of each percentile in seconds (at most the maximum latency)
+        float: maximum latency in seconds
+    """
+    keys: list[tuple[str, str, int]] = [
+        key for key in self.counts
+        if key[0] == kind and key[1] == name and (round_number is None or key[2] == round_number)]
+    counts: list[int] = [sum(bin_counts) for bin_counts in zip(*[self.counts[key] for key in keys])]
+    n_decisions: int = sum(counts)
+    if n_decisions == 0:
+      return 0, [float("nan")] * len(percentiles), float("nan")
+    max_latency: float = max(self.max_latencies[key] for key in keys)
+    percentile_latencies: list[float] = []
+    for percentile in percentiles:
+      cumulative_count: int = 0
+      for bin_index, count in enumerate(counts):
+        cumulative_count += count
+        if cumulative_count >= percentile / 100 * n_decisions:
+          break
+      upper_edge: float = self.min_latency * 10 ** (bin_index / self.bins_per_decade)
+      percentile_latencies.append(min(upper_edge, max_latency))
+    return n_decisions, percentile_latencies, max_latency
+
+
+  def report(self, by_round: bool = False) -> str:
+    """
+    create a table of latency percentiles for each decision kind and AI
+
+    inputs:
+    -------
+        by_round (bool): whether to list each round number separately
+
+    returns:
+    --------
+        str: the report as multiline string
+    """
+    groups: list[tuple] = sorted({
+        (key[0], key[1], key[2] if by_round else None) for key in self.counts},
+        key=lambda group: (group[0], group[1], -1 if group[2] is None else group[2]))
+    lines: list[str] = [
+        f"{'decision':<14} {'AI':<22} {'round':>5} {'calls':>10} {'p50 (us)':>10} {'p95 (us)':>10} {'p99 (us)':>10} {'max (us)':>10}"]
+    for kind, name, round_number in groups:
+      n_decisions, (p50, p95, p99), max_latency = self.get_statistics(kind, name, round_number)
+      round_label: str = "all" if round_number is None else str(round_number)
+      lines.append(
+          f"{kind:<14} {name:<22} {round_label:>5} {n_decisions:>10} "
+          + f"{p50 * 1e6:>10.1f} {p95 * 1e6:>10.1f} {p99 * 1e6:>10.1f} {max_latency * 1e6:>10.1f}")
+    return "\n".join(lines)
+
+
+class Phase_Timer():
+  """
+  record cumulative time and call counts for each (phase, AI name) pair
+  """
+  def __init__(self, record_latencies: bool = False):
+    """
+    inputs:
+    -------
+        record_latencies (bool): whether to record the latency of every AI decision in `self.latencies`
+    """
+    self.total_times: dict[tuple[str, str], float] = defaultdict(float)
+    self.call_counts: dict[tuple[str, str], int] = defaultdict(int)
+    self.latencies: Latency_Histogram = Latency_Histogram() if record_latencies else None
+
+
+  def add(self, phase: str, name: str, duration: float) -> None:
+    """
+    record one call of the given phase
+
+    inputs:
+    -------
+        phase (str): name of the phase, e.g. "bidding"
+        name (str): name of the AI that made the decision. `None` for phases that are not AI decisions.
+        duration (float): duration of the call in seconds
+    """
+    key: tuple[str, str] = (phase, name)
+    self.total_times[key] += duration
+    self.call_counts[key] += 1
+
+
+  def timed(self, phase: str, name: str, function: Callable, round_number: int = None) -> Callable:
+    """
+    wrap `function` such that each call is recorded in the given phase
+
+    inputs:
+    -------
+        phase (str): name of the phase
+        name (str): name of the AI that made the decision. `None` for phases that are not AI decisions.
+        function (Callable): function to time
+        round_number (int): round of the game. If given and latencies are recorded, each call is added to `self.latencies`.
+
+    returns:
+    --------
+        Callable: function with the same signature as `function`
+    """
+    latencies: Latency_Histogram = self.latencies if round_number is not None else None
+    def timed_function(*args, **kwargs):
+      start_time: float = time.perf_counter()
+      result = function(*args, **kwargs)
+      duration: float = time.perf_counter() - start_time
+      self.add(phase, name, duration)
+      if latencies is not None:
+        latencies.add(phase, name, round_number, duration)
+      return result
+    return timed_function
+
+
+  def merge(self, other: "Phase_Timer") -> None:
+    """
+    add the recorded times of another timer (e.g. from a worker process) to this one.
+    Latencies are only merged if both timers record them.
+    """
+    for key, total_time in other.total_times.items():
+      self.total_times[key] += total_time
+      self.call_counts[key] += other.call_counts[key]
+    if self.latencies is not None and other.latencies is not None:
+      self.latencies.merge(other.latencies)
+
+
+  def new_like(self) -> "Phase_Timer":
+    """
+    create an empty timer with the same settings, e.g. to time single games in worker processes
+    """
+    return Phase_Timer(record_latencies=self.latencies is not None)
+
+
+  def report(self) -> str:
+    """
+    create a table of the recorded times, grouped by phase and sorted by total time.
+    If latencies are recorded, their percentiles are listed below.
+
+    returns:
+    --------
+        str: the report as multiline string
+    """
+    overall_time: float = sum(self.total_times.values())
+    phase_times: dict[str, float] = defaultdict(float)
+    for (phase, _), total_time in self.total_times.items():
+      phase_times[phase] += total_time
+    lines: list[str] = [
+        f"{'phase':<14} {'AI':<22} {'calls':>10} {'total (s)':>10} {'mean (us)':>10} {'share':>7}"]
+    for phase in sorted(phase_times, key=phase_times.get, reverse=True):
+      keys: list[tuple[str, str]] = sorted(
+          [key for key in self.total_times if key[0] == phase],
+          key=self.total_times.get,
+          reverse=True)
+      for key in keys:
+        total_time: float = self.total_times[key]
+        n_calls: int = self.call_counts[key]
+        name: str = "" if key[1] is None else key[1]
+        lines.append(
+            f"{phase:<14} {name:<22} {n_calls:>10} {total_time:>10.3f} "
+            + f"{total_time / n_calls * 1e6:>10.1f} {total_time / max(overall_time, 1e-12):>7.1%}")
+    lines.append(f"{'total':<14} {'':<22} {sum(self.call_counts.values()):>10} {overall_time:>10.3f}")
+    if self.latencies is not None:
+      lines.append("")
+      lines.append(self.latencies.report())
+    return "\n".join(lines)
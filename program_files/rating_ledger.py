@@ -0,0 +1,258 @@
+"""
+This module implements a persistent rating ledger for Wizard AIs stored in an SQLite database.
+Ratings follow a multiplayer Elo model: each game is treated as a set of pairwise comparisons between all players at the table,
+where a player wins against another if they have a higher final score. Players are identified by a key,
+which is the AI name for built-in AIs and a hash of the parameters for trained players (see `get_player_key`).
+
+Games are added in batches. A batch is split into rounds in which every player plays at most once, keeping the order of each player's games.
+The games of a round are rated together, and ratings and K-factors are updated between rounds. This gives the same ratings
+as adding the games one by one, but vectorizes the updates of games at disjoint tables (e.g. a round of a tournament).
+New players use a larger K-factor for their first games, so they can be placed with a few hundred games against rated opponents.
+"""
+import json
+import time
+import sqlite3
+import hashlib
+
+import numpy as np
+
+
+def get_parameter_hash(parameters: dict) -> str:
+  """
+  calculate a hash of the parameters of a trained player, e.g. from `get_parameters()`.
+  Tensors and arrays are hashed by their raw values.
+
+  inputs:
+  -------
+      parameters (dict): parameters of the player
+
+  returns:
+  --------
+      str: hexadecimal hash (16 characters)
+  """
+  hash_object = hashlib.sha1()
+  def add_value(value) -> None:
+    if hasattr(value, "detach"): # torch tensor
+      value = value.detach().cpu().numpy()
+    if isinstance(value, np.ndarray):
+      hash_object.update(np.ascontiguousarray(value, dtype=np.float64).tobytes())
+    elif isinstance(value, (list, tuple)):
+      for item in value:
+        add_value(item)
+    else:
+      hash_object.update(repr(value).encode())
+  for key in sorted(parameters.keys()):
+    hash_object.update(key.encode())
+    add_value(parameters[key])
+  return hash_object.hexdigest()[:16]
+
+
+def get_player_key(ai) -> str:
+  """
+  get the ledger key of an AI: its class name and parameter hash for parametrized players, otherwise its name.
+
+  inputs:
+  -------
+      ai (Wizard_Base_Ai | str): AI instance or name of a built-in AI
+
+  returns:
+  --------
+      str: key of the AI in the ledger
+  """
+  if isinstance(ai, str):
+    return ai
+  if hasattr(ai, "get_parameters"):
+    return f"{type(ai).__name__}:{get_parameter_hash(ai.get_parameters())}"
+  return getattr(ai, "name", type(ai).__name__)
+
+
+class Rating_Ledger():
+  """
+  persistent multiplayer Elo ratings of AI players
+  """
+  def __init__(self,
+      file_path: str,
+      initial_rating: float = 1500.,
+      k_factor: float = 16.,
+      provisional_k_factor: float = 48.,
+      n_provisional_games: int = 50,
+      store_games: bool = False):
+    """
+    open or create a rating ledger
+
+    inputs:
+    -------
+        file_path (str): path of the SQLite database
+        initial_rating (float): rating of new players
+        k_factor (float): maximum rating change per game of established players
+        provisional_k_factor (float): maximum rating change per game during a player's first `n_provisional_games` games
+        n_provisional_games (int): number of games a player is considered provisional
+        store_games (bool): whether to also append every game's players and scores to the `games` table
+    """
+    self.file_path: str = file_path
+    self.initial_rating: float = initial_rating
+    self.k_factor: float = k_factor
+    self.provisional_k_factor: float = provisional_k_factor
+    self.n_provisional_games: int = n_provisional_games
+    self.store_games: bool = store_games
+    self.connection: sqlite3.Connection = sqlite3.connect(file_path)
+    self.connection.executescript("""
+        CREATE TABLE IF NOT EXISTS ratings (
+            player_key TEXT PRIMARY KEY,
+            rating REAL NOT NULL,
+            n_games INTEGER NOT NULL,
+            last_update REAL NOT NULL);
+        CREATE TABLE IF NOT EXISTS games (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            time REAL NOT NULL,
+            player_keys TEXT NOT NULL,
+            scores TEXT NOT NULL);
+        """)
+    self.connection.commit()
+
+
+  def __enter__(self) -> "Rating_Ledger":
+    return self
+
+  def __exit__(self, *_) -> None:
+    self.close()
+
+  def close(self) -> None:
+    self.connection.close()
+
+
+  def get_ratings(self, player_keys: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    get the ratings and numbers of rated games of the given players. Unknown players have the initial rating and 0 games.
+
+    inputs:
+    -------
+        player_keys (list[str]): keys of the players
+
+    returns:
+    --------
+        np.ndarray: rating of each player
+        np.ndarray: number of rated games of each player
+    """
+    known_players: dict[str, tuple[float, int]] = {}
+    unique_keys: list[str] = list(set(player_keys))
+    # sqlite limits the number of parameters per query
+    for start in range(0, len(unique_keys), 500):
+      chunk: list[str] = unique_keys[start:start + 500]
+      rows = self.connection.execute(
+          f"SELECT player_key, rating, n_games FROM ratings WHERE player_key IN ({','.join('?' * len(chunk))})", chunk)
+      for key, rating, n_games in rows:
+        known_players[key] = (rating, n_games)
+    ratings: np.ndarray = np.array([known_players.get(key, (self.initial_rating, 0))[0] for key in player_keys])
+    n_games: np.ndarray = np.array([known_players.get(key, (self.initial_rating, 0))[1] for key in player_keys], dtype=np.int64)
+    return ratings, n_games
+
+
+  def get_rating(self, player_key: str) -> float:
+    """
+    get the rating of a single player
+    """
+    return float(self.get_ratings([player_key])[0][0])
+
+
+  def add_games(self, player_keys: list[list[str]], scores: np.ndarray) -> None:
+    """
+    update the ratings with a batch of games. The ratings are the same as if the games were added one by one.
+
+    inputs:
+    -------
+        player_keys (list[list[str]]): keys of the players of each game.
+            A single list of keys is used for all games if all games were played by the same players.
+        scores (np.ndarray): final scores of shape (n_games, n_players) in the order of `player_keys`
+            or a list of score arrays if the number of players differs between games
+    """
+    if len(scores) == 0:
+      return
+    if isinstance(player_keys[0], str):
+      player_keys = [player_keys] * len(scores)
+    unique_keys: list[str] = sorted({key for keys in player_keys for key in keys})
+    key_indices: dict[str, int] = {key: i for i, key in enumerate(unique_keys)}
+    ratings, n_games = self.get_ratings(unique_keys)
+    start_n_games: np.ndarray = n_games.copy()
+    # each game is rated in the round after the previous games of all its players
+    game_rounds: list[int] = []
+    next_rounds: np.ndarray = np.zeros(len(unique_keys), dtype=np.int64)
+    for keys in player_keys:
+      indices: list[int] = [key_indices[key] for key in keys]
+      game_round: int = int(np.max(next_rounds[indices]))
+      next_rounds[indices] = game_round + 1
+      game_rounds.append(game_round)
+    # group games by number of players and sort them by round to vectorize the updates
+    games_by_size: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+    for n_players in sorted({len(keys) for keys in player_keys}):
+      game_indices: list[int] = sorted((i for i, keys in enumerate(player_keys) if len(keys) == n_players), key=game_rounds.__getitem__)
+      games_by_size.append((
+          np.array([game_rounds[i] for i in game_indices]),
+          np.array([[key_indices[key] for key in player_keys[i]] for i in game_indices]),
+          np.array([scores[i] for i in game_indices], dtype=float)))
+    for game_round in range(int(np.max(next_rounds))):
+      for size_rounds, size_indices, size_scores in games_by_size:
+        start, end = np.searchsorted(size_rounds, [game_round, game_round + 1])
+        if start == end:
+          continue
+        indices: np.ndarray = size_indices[start:end]
+        k_factors: np.ndarray = np.where(n_games[indices] < self.n_provisional_games, self.provisional_k_factor, self.k_factor)
+        # `np.add.at` also counts players who take several seats of a game (e.g. identical reference players)
+        np.add.at(ratings, indices, self._get_rating_changes(ratings[indices], size_scores[start:end]) * k_factors)
+        np.add.at(n_games, indices, 1)
+    update_time: float = time.time()
+    with self.connection:
+      self.connection.executemany(
+          """INSERT INTO ratings (player_key, rating, n_games, last_update) VALUES (?, ?, ?, ?)
+          ON CONFLICT(player_key) DO UPDATE SET rating = excluded.rating, n_games = excluded.n_games, last_update = excluded.last_update""",
+          [(key, float(ratings[i]), int(n_games[i]), update_time)
+              for i, key in enumerate(unique_keys) if n_games[i] > start_n_games[i]])
+      if self.store_games:
+        self.connection.executemany(
+            "INSERT INTO games (time, player_keys, scores) VALUES (?, ?, ?)",
+            [(update_time, json.dumps(list(keys)), json.dumps([float(score) for score in game_scores]))
+                for keys, game_scores in zip(player_keys, scores)])
+
+
+  @staticmethod
+  def _get_rating_changes(ratings: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    """
+    calculate the rating change of each player in each game before multiplying with the K-factor.
+    The change is the average over all opponents of (actual result - expected result) of the pairwise comparison.
+
+    inputs:
+    -------
+        ratings (np.ndarray): ratings of the players of each game, shape (n_games, n_players)
+        scores (np.ndarray): final scores of shape (n_games, n_players)
+
+    returns:
+    --------
+        np.ndarray: rating changes of shape (n_games, n_players)
+    """
+    n_players: int = ratings.shape[1]
+    # expected result of player i against player j: (n_games, n_players, n_players)
+    expected_results: np.ndarray = 1 / (1 + 10 ** ((ratings[:, None, :] - ratings[:, :, None]) / 400))
+    # actual result: 1 for a higher score, 0.5 for equal scores, 0 for a lower score
+    actual_results: np.ndarray = 0.5 * (1 + np.sign(scores[:, :, None] - scores[:, None, :]))
+    differences: np.ndarray = actual_results - expected_results
+    # comparisons of players with themselves cancel out: 0.5 - 0.5
+    return np.sum(differences, axis=2) / (n_players - 1)
+
+
+  def get_leaderboard(self, n_players: int = None, min_games: int = 0) -> list[tuple[str, float, int]]:
+    """
+    get the highest rated players
+
+    inputs:
+    -------
+        n_players (int): maximum number of players to return. All players if `None`.
+        min_games (int): minimum number of rated games of listed players
+
+    returns:
+    --------
+        list[tuple[str, float, int]]: key, rating and number of games of each player, sorted by rating
+    """
+    query: str = "SELECT player_key, rating, n_games FROM ratings WHERE n_games >= ? ORDER BY rating DESC"
+    if n_players is not None:
+      query += f" LIMIT {int(n_players)}"
+    return list(self.connection.execute(query, (min_games,)))
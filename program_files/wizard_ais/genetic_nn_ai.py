@@ -29,9 +29,9 @@ class Genetic_NN_Ai(Wizard_Base_Ai):
     initialize the neural networks by loading them from file
     """
     base_path: str = os.path.join("program_files", "wizard_ais", "genetic_nn_ai")
-    self.trick_action_nn: torch.nn.Module = torch.load(os.path.join(base_path, "trick_action_nn.pt"))
-    self.trump_color_nn: torch.nn.Module = torch.load(os.path.join(base_path, "trump_color_nn.pt"))
-    self.prediction_nn: torch.nn.Module = torch.load(os.path.join(base_path, "prediction_nn.pt"))
+    self.trick_action_nn: torch.nn.Module = torch.load(os.path.join(base_path, "trick_action_nn.pt"), weights_only=False)
+    self.trump_color_nn: torch.nn.Module = torch.load(os.path.join(base_path, "trump_color_nn.pt"), weights_only=False)
+    self.prediction_nn: torch.nn.Module = torch.load(os.path.join(base_path, "prediction_nn.pt"), weights_only=False)
   # methods for playing
   def get_trump_color_choice(self,
       hands: list[list[Wizard_Card]],
@@ -76,9 +76,9 @@ class Genetic_NN_Ai(Wizard_Base_Ai):
     features: torch.Tensor = get_prediction_features(player_index, game_state)
     # get the output of the neural network
     output: torch.Tensor = self.prediction_nn(features)
-    # get the index of the highest value in the output tensor
-    prediction: int = torch.argmax(output).item()
-    return prediction
+    # the network has a single output estimating the number of tricks the player will win
+    prediction: int = int(torch.round(output).item())
+    return min(max(prediction, 0), game_state.round_number)
   
   def get_trick_action(self, game_state: Game_State) -> Wizard_Card:
     """
@@ -180,9 +180,9 @@ class Genetic_NN_Player(Wizard_Base_Ai):
     with open(os.path.join(save_dir, "nn_layers.json"), "r") as file:
       nn_layers: dict[str, tuple[int]] = json.load(file)
     # load network weights
-    trump_color_nn: Dense_NN = torch.load(os.path.join(save_dir, "trump_color_nn.pt"))
-    prediction_nn: Dense_NN = torch.load(os.path.join(save_dir, "prediction_nn.pt"))
-    trick_action_nn: Dense_NN = torch.load(os.path.join(save_dir, "trick_action_nn.pt"))
+    trump_color_nn: Dense_NN = torch.load(os.path.join(save_dir, "trump_color_nn.pt"), weights_only=False)
+    prediction_nn: Dense_NN = torch.load(os.path.join(save_dir, "prediction_nn.pt"), weights_only=False)
+    trick_action_nn: Dense_NN = torch.load(os.path.join(save_dir, "trick_action_nn.pt"), weights_only=False)
     return Genetic_NN_Player(
         trump_color_nn_layers = nn_layers["trump_color_nn_layers"],
         prediction_nn_layers = nn_layers["prediction_nn_layers"],
@@ -235,9 +235,9 @@ class Genetic_NN_Player(Wizard_Base_Ai):
     features: torch.Tensor = get_prediction_features(player_index, game_state)
     # get the output of the neural network
     output: torch.Tensor = self.prediction_nn(features)
-    # get the index of the highest value in the output tensor
-    prediction: int = torch.argmax(output).item()
-    return prediction
+    # the network has a single output estimating the number of tricks the player will win
+    prediction: int = int(torch.round(output).item())
+    return min(max(prediction, 0), game_state.round_number)
   
   def get_trick_action(self, game_state: Game_State) -> Wizard_Card:
     """
@@ -7,6 +7,7 @@ from program_files.game_state import Game_State
 from program_files.wizard_ais.ai_base_class import Wizard_Base_Ai
 from program_files.helper_functions import check_action_invalid
 from program_files.scoring_functions import update_winning_card
+from program_files.hand_statistics import Hand_Statistics, get_hand_statistics, count_at_least
 
 
 class Genetic_Rule_Ai():
@@ -221,17 +222,17 @@ class Genetic_Wizard_Player(Wizard_Base_Ai):
     --------
         int: The color to choose as trump. (0: red, 1: yellow, 2: green, 3: blue)
     """
-    hand: list[Wizard_Card] = hands[active_player]
-    # count the number of cards of each color
-    color_counts: dict[int, int] = {}
-    color_sums: dict[int, int] = {}
-    for card in hand:
-      color_counts[card.color] = color_counts.get(card.color, 0) + 1
-      color_sums[card.color] = color_sums.get(card.color, 0) + card.value
-    # calculate the value for each color
+    hand_statistics: Hand_Statistics = get_hand_statistics(hands[active_player])
+    # calculate the value for each color in the order the colors appear in the hand (wizards and jesters have color -1)
     color_values: dict[int, float] = {}
-    for color in color_counts:
-      color_values[color] = self.color_sum_weight * color_sums[color] + self.color_number_weight * color_counts[color]
+    for color in hand_statistics.color_order:
+      if color == -1:
+        color_sum: int = 14 * hand_statistics.n_wizards
+        color_count: int = hand_statistics.n_wizards + hand_statistics.n_jesters
+      else:
+        color_sum: int = hand_statistics.color_sums[color]
+        color_count: int = hand_statistics.color_counts[color]
+      color_values[color] = self.color_sum_weight * color_sum + self.color_number_weight * color_count
     # choose the color with the highest value
     return max(color_values, key=color_values.get)
 
@@ -254,15 +255,13 @@ class Genetic_Wizard_Player(Wizard_Base_Ai):
     --------
         int: The number of predicted tricks.
     """
-    hand: list[Wizard_Card] = game_state.players_hands[player_index]
+    hand_statistics: Hand_Statistics = get_hand_statistics(game_state.players_hands[player_index], game_state.trump_color)
     # count the number of non-trump cards with values above `min_value_for_win`
-    n_non_trumps: int = len([card for card in hand if card.color != game_state.trump_color and card.value >= self.min_value_for_win])
+    n_non_trumps: int = count_at_least(hand_statistics.other_values, self.min_value_for_win)
     # count the number of trump cards with values above `min_trump_value_for_win`
-    n_trumps: int = len([card for card in hand if card.color == game_state.trump_color and card.value >= self.min_trump_value_for_win])    
-    # count the number of wizards
-    n_wizards: int = len([card for card in hand if card.value == 14])
-    # count the number of jesters
-    n_jesters: int = len([card for card in hand if card.value == 0])
+    n_trumps: int = count_at_least(hand_statistics.trump_values, self.min_trump_value_for_win)
+    n_wizards: int = hand_statistics.n_wizards
+    n_jesters: int = hand_statistics.n_jesters
     # calculate the bid
     bid: int = int((n_non_trumps
                + n_trumps
@@ -0,0 +1,364 @@
+"""
+This module builds datasets for supervised training of the neural networks used by `Genetic_NN_Player` from recorded games (see `game_records.py`).
+Recorded games are replayed, the feature vectors defined in `wizard_feature_vectors.py` are computed for every decision and
+the results are written as sharded `.npy` files that can be memory-mapped for training.
+
+Each shard `k` consists of the following files in the dataset directory:
+  bids:
+    - `bid_features_k.npy` (n_bids, 20): features of `get_prediction_features` for each bid
+    - `bid_labels_k.npy` (n_bids, 3): number of won tricks, whether the bid was met (0/1) and the player's score of the round
+  tricks:
+    - `trick_features_k.npy` (n_rows, 22): features of `get_trick_action_features` for every valid action of every decision
+    - `trick_offsets_k.npy` (n_tricks + 1,): rows `offsets[i]:offsets[i+1]` of `trick_features` belong to decision `i`
+    - `trick_actions_k.npy` (n_tricks,): index of the played card among the rows of its decision
+    - `trick_labels_k.npy` (n_tricks, 2): whether the played card won the trick (0/1) and the player's score of the round
+    - `trick_next_k.npy` (n_tricks,): index of the same player's next decision in the same round, -1 for the last card of a round
+"""
+import os
+import time
+import queue
+import threading
+import multiprocessing as mp
+from typing import Iterator
+
+import numpy as np
+import torch
+
+from program_files.game_records import Game_Record_Reader, Replay_Step
+from program_files.wizard_ais.wizard_feature_vectors import get_prediction_features, get_trick_action_features
+
+DATASET_ARRAY_NAMES: tuple[str] = (
+    "bid_features",
+    "bid_labels",
+    "trick_features",
+    "trick_offsets",
+    "trick_actions",
+    "trick_labels",
+    "trick_next",
+)
+
+
+def build_nn_datasets(
+    record_paths: list[str],
+    dataset_dir: str,
+    games_per_shard: int = 5000,
+    n_processes: int = None,
+    verbosity: int = 1) -> int:
+  """
+  build datasets for supervised training from recorded games. Shards are built in parallel by a process pool.
+
+  inputs:
+  -------
+      record_paths (list[str]): paths of game record files
+      dataset_dir (str): directory to write the dataset shards to
+      games_per_shard (int): number of games replayed for each shard
+      n_processes (int): number of processes to use. Defaults to the number of CPUs.
+      verbosity (int): print progress if at least 1
+
+  returns:
+  --------
+      int: number of written shards
+  """
+  os.makedirs(dataset_dir, exist_ok=True)
+  jobs: list[tuple[str, int, int, str, int]] = []
+  for record_path in record_paths:
+    # index the file once in the main process, workers then only load the cached index
+    n_games: int = len(Game_Record_Reader(record_path))
+    for first_game in range(0, n_games, games_per_shard):
+      jobs.append((record_path, first_game, min(first_game + games_per_shard, n_games), dataset_dir, len(jobs)))
+  if n_processes is None:
+    n_processes = mp.cpu_count()
+  start_time: float = time.time()
+  with mp.Pool(min(n_processes, max(len(jobs), 1))) as process_pool:
+    for n_done, _ in enumerate(process_pool.imap_unordered(_build_shard, jobs), start=1):
+      if verbosity >= 1:
+        print(f"\rBuilding datasets: {n_done}/{len(jobs)} shards in {time.time() - start_time: 6.0f} s.", end="")
+  if verbosity >= 1:
+    print()
+  return len(jobs)
+
+
+def _build_shard(job: tuple[str, int, int, str, int]) -> int:
+  """
+  replay games `first_game` to `end_game` of a record file and save their features and labels as one shard
+
+  inputs:
+  -------
+      job (tuple[str, int, int, str, int]): record file path, first game index, end game index (exclusive), dataset directory and shard id
+
+  returns:
+  --------
+      int: the shard id
+  """
+  record_path, first_game, end_game, dataset_dir, shard_id = job
+  reader: Game_Record_Reader = Game_Record_Reader(record_path)
+  shard_builder: _Shard_Builder = _Shard_Builder()
+  for _, step in reader.iter_decisions(range(first_game, end_game), yield_round_ends=True):
+    shard_builder.add_step(step)
+  shard_builder.save(dataset_dir, shard_id)
+  return shard_id
+
+
+class _Shard_Builder():
+  """
+  collect features and labels of replayed decisions. Labels only become known at the end of each round,
+  so decisions of the current round are kept pending until the round ends.
+  """
+  def __init__(self):
+    self.bid_features: list[np.ndarray] = []
+    self.bid_labels: list[list[float]] = []
+    self.trick_features: list[np.ndarray] = []
+    self.trick_n_rows: list[int] = []
+    self.trick_actions: list[int] = []
+    self.trick_labels: list[list[float]] = []
+    self.trick_next: list[int] = []
+    # decisions of the current round: (bid index, player) and (trick index, player, trick number)
+    self._pending_bids: list[tuple[int, int]] = []
+    self._pending_tricks: list[tuple[int, int, int]] = []
+    self._trick_winners: list[int] = []
+    self._last_trick_decision: dict[int, int] = dict()
+
+
+  def add_step(self, step: Replay_Step) -> None:
+    """
+    add a single step of a replayed game
+    """
+    if step.kind == "bid":
+      self._add_bid(step)
+    elif step.kind == "trick":
+      self._add_trick(step)
+    elif step.kind == "round_end":
+      self._end_round(step)
+
+
+  def _add_bid(self, step: Replay_Step) -> None:
+    features = get_prediction_features(step.player_index, step.game_state)
+    self._pending_bids.append((len(self.bid_features), step.player_index))
+    self.bid_features.append(features.numpy())
+    self.bid_labels.append(None)
+
+
+  def _add_trick(self, step: Replay_Step) -> None:
+    game_state = step.game_state
+    trick_number: int = game_state.round_number - game_state.tricks_to_be_played
+    if game_state.n_cards_to_be_played == game_state.n_players and trick_number > 0:
+      # the winner of the last trick starts the current one
+      self._trick_winners.append(step.player_index)
+    features, valid_indices = get_trick_action_features(game_state)
+    hand_index: int = game_state.players_hands[step.player_index].index(step.action)
+    decision_index: int = len(self.trick_actions)
+    # link the player's previous decision of this round to this one
+    previous_decision: int = self._last_trick_decision.get(step.player_index)
+    if previous_decision is not None:
+      self.trick_next[previous_decision] = decision_index
+    self._last_trick_decision[step.player_index] = decision_index
+    self._pending_tricks.append((decision_index, step.player_index, trick_number))
+    self.trick_features.append(features.numpy())
+    self.trick_n_rows.append(len(valid_indices))
+    self.trick_actions.append(valid_indices.index(hand_index))
+    self.trick_labels.append(None)
+    self.trick_next.append(-1)
+
+
+  def _end_round(self, step: Replay_Step) -> None:
+    game_state = step.game_state
+    self._trick_winners.append(step.player_index)
+    # round number was already increased when the round was scored
+    round_scores: np.ndarray = game_state.players_gained_points_history[game_state.round_number - 2]
+    won_tricks: np.ndarray = game_state.players_won_tricks
+    predictions: np.ndarray = game_state.players_predictions
+    for bid_index, player_index in self._pending_bids:
+      self.bid_labels[bid_index] = [
+          won_tricks[player_index],
+          float(won_tricks[player_index] == predictions[player_index]),
+          round_scores[player_index]]
+    for decision_index, player_index, trick_number in self._pending_tricks:
+      self.trick_labels[decision_index] = [
+          float(self._trick_winners[trick_number] == player_index),
+          round_scores[player_index]]
+    self._pending_bids = []
+    self._pending_tricks = []
+    self._trick_winners = []
+    self._last_trick_decision = dict()
+
+
+  def save(self, dataset_dir: str, shard_id: int) -> None:
+    """
+    save all collected decisions of completed rounds as shard `shard_id`
+    """
+    arrays: dict[str, np.ndarray] = {
+        "bid_features": _stack(self.bid_features, (0, 20)),
+        "bid_labels": np.array(self.bid_labels, dtype=np.float32).reshape(-1, 3),
+        "trick_features": _stack(self.trick_features, (0, 22), concatenate=True),
+        "trick_offsets": np.concatenate([[0], np.cumsum(self.trick_n_rows, dtype=np.int64)]),
+        "trick_actions": np.array(self.trick_actions, dtype=np.int16),
+        "trick_labels": np.array(self.trick_labels, dtype=np.float32).reshape(-1, 2),
+        "trick_next": np.array(self.trick_next, dtype=np.int64),
+    }
+    for name, array in arrays.items():
+      np.save(os.path.join(dataset_dir, f"{name}_{shard_id:05d}.npy"), array)
+
+
+def _stack(arrays: list[np.ndarray], empty_shape: tuple[int], concatenate: bool = False) -> np.ndarray:
+  """
+  stack or concatenate a list of feature arrays as float32. Returns an array of shape `empty_shape` if the list is empty.
+  """
+  if not arrays:
+    return np.zeros(empty_shape, dtype=np.float32)
+  if concatenate:
+    return np.concatenate(arrays).astype(np.float32)
+  return np.stack(arrays).astype(np.float32)
+
+
+def list_shards(dataset_dir: str) -> list[int]:
+  """
+  list the ids of all shards in a dataset directory
+
+  inputs:
+  -------
+      dataset_dir (str): directory containing the dataset shards
+
+  returns:
+  --------
+      list[int]: sorted shard ids
+  """
+  return sorted(
+      int(file_name[len("bid_features_"):-len(".npy")]) for file_name in os.listdir(dataset_dir)
+      if file_name.startswith("bid_features_") and file_name.endswith(".npy"))
+
+
+def load_shard(dataset_dir: str, shard_id: int, mmap_mode: str = "r") -> dict[str, np.ndarray]:
+  """
+  load all arrays of a dataset shard
+
+  inputs:
+  -------
+      dataset_dir (str): directory containing the dataset shards
+      shard_id (int): id of the shard
+      mmap_mode (str): memory-map mode passed to `np.load`. `None` loads the arrays into memory.
+
+  returns:
+  --------
+      dict[str, np.ndarray]: arrays of the shard with the names in `DATASET_ARRAY_NAMES` as keys
+  """
+  return {
+      name: np.load(os.path.join(dataset_dir, f"{name}_{shard_id:05d}.npy"), mmap_mode=mmap_mode)
+      for name in DATASET_ARRAY_NAMES}
+
+
+class Shard_Batch_Loader():
+  """
+  Iterate over mini-batches of memory-mapped dataset shards. Batches are read and converted to tensors
+  by background threads, so loading overlaps with training.
+  """
+  def __init__(self,
+      dataset_dir: str,
+      feature_name: str,
+      label_name: str,
+      label_column: int,
+      batch_size: int = 256,
+      shard_ids: list[int] = None,
+      shuffle: bool = True,
+      n_threads: int = 2,
+      prefetch_batches: int = 16):
+    """
+    inputs:
+    -------
+        dataset_dir (str): directory containing the dataset shards
+        feature_name (str): name of the feature array, i.e. "bid_features"
+        label_name (str): name of the label array, i.e. "bid_labels"
+        label_column (int): column of the label array to use as target
+        batch_size (int): number of samples per batch
+        shard_ids (list[int]): shards to use. Defaults to all shards in `dataset_dir`.
+        shuffle (bool): whether to shuffle the order of shards and samples each epoch
+        n_threads (int): number of background threads loading batches
+        prefetch_batches (int): maximum number of batches loaded ahead of training
+    """
+    self.dataset_dir: str = dataset_dir
+    self.feature_name: str = feature_name
+    self.label_name: str = label_name
+    self.label_column: int = label_column
+    self.batch_size: int = batch_size
+    self.shard_ids: list[int] = list_shards(dataset_dir) if shard_ids is None else list(shard_ids)
+    self.shuffle: bool = shuffle
+    self.n_threads: int = max(1, min(n_threads, len(self.shard_ids)))
+    self.prefetch_batches: int = prefetch_batches
+
+
+  def __iter__(self) -> Iterator[tuple[torch.Tensor, torch.Tensor]]:
+    """
+    iterate over all batches of one epoch. Errors of the loading threads (e.g. missing shards) are raised here.
+
+    yields:
+    -------
+        torch.Tensor: features of shape (batch_size, n_features)
+        torch.Tensor: labels of shape (batch_size, 1)
+    """
+    shard_ids: list[int] = list(self.shard_ids)
+    if self.shuffle:
+      np.random.shuffle(shard_ids)
+    batch_queue: queue.Queue = queue.Queue(maxsize=self.prefetch_batches)
+    stop_event: threading.Event = threading.Event()
+    threads: list[threading.Thread] = [
+        threading.Thread(
+            target=self._load_batches,
+            args=(shard_ids[i::self.n_threads], batch_queue, stop_event),
+            daemon=True)
+        for i in range(self.n_threads)]
+    for thread in threads:
+      thread.start()
+    n_finished: int = 0
+    try:
+      while n_finished < len(threads):
+        batch = batch_queue.get()
+        if batch is None:
+          n_finished += 1
+          continue
+        if isinstance(batch, Exception):
+          raise batch
+        yield batch
+    finally:
+      # stop loading if iteration ends early
+      stop_event.set()
+      for thread in threads:
+        while thread.is_alive():
+          try:
+            batch_queue.get_nowait()
+          except queue.Empty:
+            thread.join(timeout=0.01)
+
+
+  def _load_batches(self, shard_ids: list[int], batch_queue: queue.Queue, stop_event: threading.Event) -> None:
+    """
+    load all batches of the given shards and put them into `batch_queue`.
+    Errors are put into the queue as well, and `None` is always put when done, so `__iter__` never waits for a dead thread.
+    """
+    try:
+      for shard_id in shard_ids:
+        features: np.ndarray = np.load(
+            os.path.join(self.dataset_dir, f"{self.feature_name}_{shard_id:05d}.npy"), mmap_mode="r")
+        labels: np.ndarray = np.load(
+            os.path.join(self.dataset_dir, f"{self.label_name}_{shard_id:05d}.npy"), mmap_mode="r")
+        indices: np.ndarray = np.arange(len(features))
+        if self.shuffle:
+          np.random.shuffle(indices)
+        for start in range(0, len(indices), self.batch_size):
+          if stop_event.is_set():
+            return
+          # sorted indices make reads from the memory map mostly sequential
+          batch_indices: np.ndarray = np.sort(indices[start:start + self.batch_size])
+          batch = (
+              torch.from_numpy(np.ascontiguousarray(features[batch_indices])),
+              torch.from_numpy(np.ascontiguousarray(labels[batch_indices, self.label_column:self.label_column + 1])))
+          batch_queue.put(batch)
+    except Exception as error:
+      batch_queue.put(error)
+    finally:
+      batch_queue.put(None)
+
+
+if __name__ == "__main__":
+  import sys
+  from program_files.game_records import list_record_files
+  # usage: python -m program_files.wizard_ais.nn_datasets <record_dir> <dataset_dir>
+  build_nn_datasets(list_record_files(sys.argv[1]), sys.argv[2])
@@ -6,6 +6,7 @@ from program_files.game_state import Game_State
 from program_files.wizard_ais.ai_base_class import Wizard_Base_Ai
 from program_files.helper_functions import check_action_invalid
 from program_files.scoring_functions import update_winning_card
+from program_files.hand_statistics import get_hand_statistics, count_at_least
 
 
 class Simple_Rule_Ai(Wizard_Base_Ai):
@@ -36,11 +37,8 @@ class Simple_Rule_Ai(Wizard_Base_Ai):
             2 -> green
             3 -> blue
     """
-    hand = hands[active_player]
     # calculate weights for each color
-    color_weights = np.zeros(4, dtype=np.float64)
-    for i, _ in enumerate(color_weights):
-      color_weights[i] = len([card for card in hand if card.color == i])
+    color_weights = np.array(get_hand_statistics(hands[active_player]).color_counts, dtype=np.float64)
     total_weights = np.sum(color_weights)
     if total_weights == 0:  # choose uniform random color if no card on hand has a color
       return np.random.choice((0, 1, 2, 3))
@@ -61,13 +59,10 @@ class Simple_Rule_Ai(Wizard_Base_Ai):
     --------
         int: number of expected won tricks this round
     """
-    prediction = 0
-    for card in game_state.players_hands[player_index]:
-      if card.value >= self.min_value_for_win:
-        prediction += 1
-      elif card.color == game_state.trump_color \
-              and card.value >= self.min_trump_value_for_win:
-        prediction += 1
+    hand_statistics = get_hand_statistics(game_state.players_hands[player_index], game_state.trump_color)
+    # count high cards and trump cards that are high or at least `min_trump_value_for_win`
+    prediction = count_at_least(hand_statistics.other_values, self.min_value_for_win) \
+        + count_at_least(hand_statistics.trump_values, min(self.min_value_for_win, self.min_trump_value_for_win))
     return round(prediction * self.prediction_factor)
 
 
@@ -1,21 +1,66 @@
 """
 this module summarized all implemented AI classes and automatically checks which parts of the an AI they implement.
 results are stored in global dictionaries. Each dict has some or all names of the implemented AI classes as keys.
-  - `ai_classes`: dict - keys are names of each AI class, values are instances of each class.
+  - `ai_classes`: dict - keys are names of each AI class, values are instances of each class
+    (or `Lazy_Ai` placeholders for AIs with heavy dependencies that are loaded on first use).
   for the following three dicts: keys are names of each AI class, values are the corresponding get_action functions
   - `ai_trump_chooser_methods`: dict
   - `ai_bids_chooser_methods`: dict
   - `ai_trick_play_methods`: dict
+`Mixed_Ai_Player` combines the methods of different AIs into one player for `Game_Engine`.
 
 last edited: 25.05.2022
 author: Sebastian Jost
 version 0.2
 """
+import importlib
+
 from .uniform_random_ai import Uniform_Random_Ai
 from .smart_random_ai import Smart_Random_Ai
 from .simple_rule_ai import Simple_Rule_Ai
 from .genetic_rule_ai import Genetic_Rule_Ai
-from .genetic_nn_ai import Genetic_NN_Ai
+
+
+class Lazy_Ai():
+  """
+  placeholder for an AI whose module has heavy dependencies (e.g. torch).
+  The AI class is imported and initialized when one of its methods is called for the first time.
+  """
+  def __init__(self, name: str, module_name: str, class_name: str):
+    """
+    inputs:
+    -------
+        name (str): name of the AI class (`ai_class.name`)
+        module_name (str): module containing the AI class, relative to this package
+        class_name (str): name of the AI class in that module
+    """
+    self.name: str = name
+    self.module_name: str = module_name
+    self.class_name: str = class_name
+    self._instance = None
+
+  def get_instance(self):
+    """
+    import and initialize the AI on first use
+
+    returns:
+    --------
+        Wizard_Base_Ai: the AI instance
+    """
+    if self._instance is None:
+      module = importlib.import_module(self.module_name, package=__package__)
+      self._instance = getattr(module, self.class_name)()
+    return self._instance
+
+  def get_trump_color_choice(self, *args, **kwargs) -> int:
+    return self.get_instance().get_trump_color_choice(*args, **kwargs)
+
+  def get_prediction(self, *args, **kwargs) -> int:
+    return self.get_instance().get_prediction(*args, **kwargs)
+
+  def get_trick_action(self, *args, **kwargs):
+    return self.get_instance().get_trick_action(*args, **kwargs)
+
 
 # add all implemented AI classes to this list.
 #   Everything else is done automatically.
@@ -24,18 +69,60 @@ ai_classes = [
     Smart_Random_Ai,
     Simple_Rule_Ai,
     Genetic_Rule_Ai,
-    Genetic_NN_Ai
 ]
 ai_classes = {ai_class.name: ai_class() for ai_class in ai_classes}
+# AIs that import torch are only loaded when they are used
+for lazy_ai in [
+    Lazy_Ai("genetic_nn_ai", ".genetic_nn_ai", "Genetic_NN_Ai"),
+]:
+  ai_classes[lazy_ai.name] = lazy_ai
 
 ai_trump_chooser_methods = dict()
 ai_bids_chooser_methods = dict()
 ai_trick_play_methods = dict()
 
-for name, ai_class in ai_classes.items():
-  if hasattr(ai_class, "get_trump_color_choice"):
-    ai_trump_chooser_methods[name] = ai_class.get_trump_color_choice
-  if hasattr(ai_class, "get_prediction"):
-    ai_bids_chooser_methods[name] = ai_class.get_prediction
-  if hasattr(ai_class, "get_trick_action"):
-    ai_trick_play_methods[name] = ai_class.get_trick_action
+
+def register_ai(name: str, ai_instance) -> None:
+  """
+  add an AI instance (e.g. a trained player loaded from a checkpoint) to the global dicts of this module,
+  so it can be used by name like the built-in AIs. Worker processes have to register the AI themselves
+  unless they were forked after the registration.
+
+  inputs:
+  -------
+      name (str): name to register the AI under
+      ai_instance (Wizard_Base_Ai): the AI instance
+  """
+  ai_classes[name] = ai_instance
+  if hasattr(ai_instance, "get_trump_color_choice"):
+    ai_trump_chooser_methods[name] = ai_instance.get_trump_color_choice
+  if hasattr(ai_instance, "get_prediction"):
+    ai_bids_chooser_methods[name] = ai_instance.get_prediction
+  if hasattr(ai_instance, "get_trick_action"):
+    ai_trick_play_methods[name] = ai_instance.get_trick_action
+
+
+for name, ai_class in list(ai_classes.items()):
+  register_ai(name, ai_class)
+
+
+class Mixed_Ai_Player():
+  """
+  player that combines the trump choice, bidding and trick play of the AIs registered in this module by name
+  """
+  def __init__(self, trump_choice_name: str, bids_name: str, trick_play_name: str):
+    """
+    inputs:
+    -------
+        trump_choice_name (str): name of the AI that chooses trump colors
+        bids_name (str): name of the AI that bids
+        trick_play_name (str): name of the AI that plays cards
+    """
+    self.get_trump_color_choice = ai_trump_chooser_methods[trump_choice_name]
+    self.get_prediction = ai_bids_chooser_methods[bids_name]
+    self.get_trick_action = ai_trick_play_methods[trick_play_name]
+    # names to profile the decisions of this player under (see `Game_Engine`)
+    self.decision_names: dict[str, str] = {
+        "trump choice": trump_choice_name,
+        "bidding": bids_name,
+        "trick play": trick_play_name}
@@ -9,6 +9,7 @@ from program_files.game_state import Game_State
 from program_files.wizard_card import Wizard_Card
 from program_files.helper_functions import check_action_invalid
 from program_files.scoring_functions import update_winning_card
+from program_files.hand_statistics import Hand_Statistics, get_hand_statistics
 
 
 def get_trump_choice_features(
@@ -36,23 +37,22 @@ def get_trump_choice_features(
   --------
       torch.Tensor: feature vector
   """
-  hand: list[Wizard_Card] = hands[active_player]
+  hand_statistics: Hand_Statistics = get_hand_statistics(hands[active_player])
   feature_vector: torch.Tensor = torch.zeros(18)
   # color-specific features
   for i in range(4):
-    color_cards = [card for card in hand if card.color == i]
-    feature_vector[4*i] = len(color_cards)
-    if len(color_cards) > 0:
-      card_values: list[int] = [card.value for card in color_cards]
-      feature_vector[4*i + 1] = sum(card_values) / len(color_cards) # average value
-      feature_vector[4*i + 2] = min(card_values) # minimum value
-      feature_vector[4*i + 3] = max(card_values) # maximum value
+    n_cards: int = hand_statistics.color_counts[i]
+    feature_vector[4*i] = n_cards
+    if n_cards > 0:
+      feature_vector[4*i + 1] = hand_statistics.color_sums[i] / n_cards # average value
+      feature_vector[4*i + 2] = hand_statistics.color_mins[i] # minimum value
+      feature_vector[4*i + 3] = hand_statistics.color_maxs[i] # maximum value
   # number of wizards
-  feature_vector[16] = len([card for card in hand if card.value == 14])
+  feature_vector[16] = hand_statistics.n_wizards
   # number of jesters
-  feature_vector[17] = len([card for card in hand if card.value == 0])
+  feature_vector[17] = hand_statistics.n_jesters
   # normalize feature vector to values in [-1, 1]
-  feature_vector = feature_vector / torch.tensor([13, 13, 0, 13, 13, 13, 0, 13, 13, 13, 0, 13, 13, 13, 0, 13, 4, 4])
+  feature_vector = feature_vector / torch.tensor([13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 4, 4])
   return feature_vector
 
 
@@ -62,7 +62,7 @@ def get_prediction_features(
   """
   create a feature vector for the bid prediction neural network
 
-  Feature vector includes (shape: (20,)): # TODO: (22,) once Game_State updates bids immediately
+  Feature vector includes (shape: (20,)):
     for i in [0, 1, 2, 3]:
     - [0 - 8]: number of cards of color i, 
     - [0 - 13]: average value of cards of color i
@@ -72,8 +72,6 @@ def get_prediction_features(
     - [0 - 4]: number of jesters in hand
     - [0 - 6]: number of players left to bid
     - [0 - 4]: number of players who already declared their bid
-    # - [-48 - 20]: number of tricks left # not supported by Game_State yet
-    # - [0 - 60]: sum of previous player's bids # not supported by Game_State yet
   """
   feature_vector: torch.Tensor = torch.zeros(20)
   # color-specific and wizard/ jester features
@@ -87,7 +85,7 @@ def get_prediction_features(
   # sum of previous player's bids
   # feature_vector[21] = np.sum(game_state.players_predictions)
   # normalize feature vector to values in [-1, 1]
-  feature_vector = feature_vector / torch.tensor([13, 13, 0, 13, 13, 13, 0, 13, 13, 13, 0, 13, 13, 13, 0, 13, 4, 4, 5, 5])
+  feature_vector = feature_vector / torch.tensor([13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 4, 4, 5, 5])
   return feature_vector
 
 def get_trick_action_features(game_state: Game_State) -> torch.Tensor:
@@ -0,0 +1,91 @@
+"""
+test the persistent multiplayer Elo ratings in `rating_ledger.py`
+"""
+import os
+import tempfile
+
+import numpy as np
+
+from program_files.rating_ledger import Rating_Ledger, get_player_key
+from program_files.wizard_ais.genetic_rule_ai import Genetic_Wizard_Player
+
+
+def test_rating_updates():
+  """
+  test a single game against the pairwise Elo formula and that ratings persist after reopening the ledger
+  """
+  with tempfile.TemporaryDirectory() as temp_dir:
+    file_path = os.path.join(temp_dir, "ratings.sqlite")
+    with Rating_Ledger(file_path, k_factor=16, provisional_k_factor=32, n_provisional_games=1) as ledger:
+      ledger.add_games(["a", "b", "c"], np.array([[30., 10., 10.]]))
+      # all players start at 1500: expected result 0.5 against everyone
+      assert np.allclose(ledger.get_ratings(["a", "b", "c"])[0], [1516, 1492, 1492])
+      assert ledger.get_rating("unknown") == 1500
+    with Rating_Ledger(file_path, k_factor=16, provisional_k_factor=32, n_provisional_games=1) as ledger:
+      ratings, n_games = ledger.get_ratings(["a", "b", "c"])
+      assert np.all(n_games == 1)
+      # established players use the normal K-factor
+      ledger.add_games([["c", "a", "b"]], np.array([[0., 20., 20.]]))
+      expected_a = 1 / (1 + 10 ** ((ratings[1:] - ratings[0]) / 400))
+      # a draws with b and wins against c
+      new_rating_a = ratings[0] + 16 * np.sum(np.array([0.5, 1]) - expected_a) / 2
+      assert np.isclose(ledger.get_rating("a"), new_rating_a)
+      assert ledger.get_leaderboard(1)[0][0] == "a"
+
+
+def test_batch_ranking():
+  """
+  test that batches of games with varying table sizes rank players by strength
+  """
+  rng = np.random.default_rng(0)
+  strengths = np.arange(6) * 20.
+  with tempfile.TemporaryDirectory() as temp_dir:
+    with Rating_Ledger(os.path.join(temp_dir, "ratings.sqlite")) as ledger:
+      for _ in range(50):
+        tables = [rng.choice(6, size=rng.integers(3, 7), replace=False) for _ in range(20)]
+        ledger.add_games(
+            [[f"player {i}" for i in table] for table in tables],
+            [strengths[table] + rng.normal(scale=20, size=len(table)) for table in tables])
+      leaderboard = ledger.get_leaderboard()
+  assert [key for key, _, _ in leaderboard] == [f"player {i}" for i in range(5, -1, -1)]
+
+
+def test_batch_size():
+  """
+  test that a batch of games gives the same ratings as adding the games one by one, including the change of K-factors
+  """
+  n_games = 200
+  tables = [["a", "b", "c"], ["a", "c"], ["c", "b"]] * n_games
+  scores = [np.array([2., 0., 1.]), np.array([1., 0.]), np.array([1., 0.])] * n_games
+  with tempfile.TemporaryDirectory() as temp_dir:
+    with Rating_Ledger(os.path.join(temp_dir, "batch.sqlite")) as batch_ledger, \
+        Rating_Ledger(os.path.join(temp_dir, "single.sqlite")) as single_ledger:
+      batch_ledger.add_games(tables, scores)
+      for keys, game_scores in zip(tables, scores):
+        single_ledger.add_games([keys], [game_scores])
+      batch_ratings, batch_n_games = batch_ledger.get_ratings(["a", "b", "c"])
+      single_ratings, single_n_games = single_ledger.get_ratings(["a", "b", "c"])
+  assert np.allclose(batch_ratings, single_ratings)
+  assert batch_n_games.tolist() == single_n_games.tolist() == [2 * n_games, 2 * n_games, 3 * n_games]
+  # ratings converge instead of growing with the batch size
+  assert 1600 < batch_ratings[0] < 2200 and 800 < batch_ratings[1] < 1400
+
+
+def test_player_keys():
+  player = Genetic_Wizard_Player()
+  same_player = Genetic_Wizard_Player(**player.get_parameters())
+  other_player = Genetic_Wizard_Player(color_sum_weight=0.5)
+  assert get_player_key(player) == get_player_key(same_player)
+  assert get_player_key(player) != get_player_key(other_player)
+  assert get_player_key(player).startswith("Genetic_Wizard_Player:")
+  assert get_player_key("simple rule ai") == "simple rule ai"
+
+
+def all_tests():
+  test_rating_updates()
+  test_batch_ranking()
+  test_batch_size()
+  test_player_keys()
+
+if __name__ == "__main__":
+  all_tests()
@@ -0,0 +1,415 @@
+"""
+This file implements a headless tournament runner for comparing Wizard AIs.
+Participants are names of built-in AIs (see `wizard_ai_classes.py`) or checkpoints of trained players:
+  - `.json` files saved by `Genetic_Wizard_Player.save`
+  - directories saved by `Genetic_NN_Player.save` (containing `nn_layers.json`)
+
+All table compositions are scheduled either round-robin (every subset of `n_players` participants)
+or Swiss (each round, participants with similar scores share a table). Games are played in chunks on a persistent process pool.
+The result is a ranking with confidence intervals of the mean scores and the results of each pair of participants.
+Optionally, all games update a persistent `Rating_Ledger`, so ratings can be compared across tournaments and training runs.
+
+usage:
+  python tournament.py "simple rule ai" "genetic rule ai" path/to/genetic_rule_ai_player_0.json --n_players 3 --games_per_table 200
+  python tournament.py "simple rule ai" "genetic rule ai" path/to/new_player.json --schedule swiss --ledger ratings.sqlite
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import itertools
+import multiprocessing as mp
+
+import numpy as np
+
+from program_files.auto_play_games import Wizard_Auto_Play
+from program_files.fitness_statistics import confidence_interval
+from program_files.rating_ledger import Rating_Ledger, get_player_key
+from program_files.wizard_ais.wizard_ai_classes import ai_classes, register_ai
+
+
+def load_checkpoint(path: str):
+  """
+  load a trained player from a checkpoint
+
+  inputs:
+  -------
+      path (str): `.json` file of a `Genetic_Wizard_Player` or directory of a `Genetic_NN_Player`
+
+  returns:
+  --------
+      Wizard_Base_Ai: the loaded player
+  """
+  if os.path.isdir(path):
+    from program_files.wizard_ais.genetic_nn_ai import Genetic_NN_Player
+    return Genetic_NN_Player.load(path)
+  if path.endswith(".json"):
+    from program_files.wizard_ais.genetic_rule_ai import Genetic_Wizard_Player
+    return Genetic_Wizard_Player.load(path)
+  raise ValueError(f"Unknown AI or checkpoint: {path}")
+
+
+def get_participants(participant_specs: list[str]) -> tuple[list[str], list[str], dict[str, str]]:
+  """
+  determine labels and AI names of all participants
+
+  inputs:
+  -------
+      participant_specs (list[str]): built-in AI names or checkpoint paths
+
+  returns:
+  --------
+      list[str]: unique label of each participant
+      list[str]: name of each participant's AI in the AI registry
+      dict[str, str]: checkpoint path for each AI name that has to be registered
+  """
+  labels, ai_names, checkpoints = [], [], {}
+  for spec in participant_specs:
+    if spec in ai_classes:
+      ai_name: str = spec
+    else:
+      ai_name: str = "checkpoint: " + os.path.normpath(spec)
+      checkpoints[ai_name] = spec
+    label: str = ai_name if spec in ai_classes else os.path.splitext(os.path.basename(os.path.normpath(spec)))[0]
+    # distinguish multiple participants with the same AI
+    n_duplicates: int = sum(1 for other in labels if other == label or other.startswith(label + " #"))
+    if n_duplicates > 0:
+      label += f" #{n_duplicates + 1}"
+    labels.append(label)
+    ai_names.append(ai_name)
+  return labels, ai_names, checkpoints
+
+
+def register_checkpoints(checkpoints: dict[str, str]) -> None:
+  """
+  load all checkpoints and register them in the AI registry. Used as initializer of the worker processes.
+  """
+  for ai_name, path in checkpoints.items():
+    if ai_name not in ai_classes:
+      register_ai(ai_name, load_checkpoint(path))
+
+
+def get_round_robin_tables(n_participants: int, n_players: int) -> list[tuple[int]]:
+  """
+  get all table compositions of `n_players` out of `n_participants` participants
+  """
+  if n_participants < n_players:
+    raise ValueError(f"A table needs {n_players} participants, but only {n_participants} were given.")
+  return list(itertools.combinations(range(n_participants), n_players))
+
+
+def get_swiss_tables(
+    mean_scores: np.ndarray,
+    n_players: int,
+    rng: np.random.Generator) -> list[tuple[int]]:
+  """
+  group participants with similar mean scores at the same tables.
+  If the number of participants is not divisible by `n_players`, the lowest ranked participants of the previous table fill the last table.
+
+  inputs:
+  -------
+      mean_scores (np.ndarray): current mean score of each participant (nan for participants without games)
+      n_players (int): number of players per table
+      rng (np.random.Generator): random number generator to break ties
+
+  returns:
+  --------
+      list[tuple[int]]: participant indices of each table
+  """
+  n_participants: int = len(mean_scores)
+  if n_participants < n_players:
+    raise ValueError(f"A table needs {n_players} participants, but only {n_participants} were given.")
+  # sort by score (descending), random order among equal scores and participants without games
+  sort_keys: np.ndarray = np.where(np.isnan(mean_scores), -np.inf, mean_scores)
+  order: np.ndarray = np.lexsort((rng.random(n_participants), -sort_keys))
+  tables: list[tuple[int]] = [
+      tuple(order[start:start + n_players]) for start in range(0, n_participants - n_players + 1, n_players)]
+  if n_participants % n_players != 0:
+    tables.append(tuple(order[-n_players:]))
+  return tables
+
+
+def play_table_games(task: tuple) -> tuple[tuple[int], np.ndarray]:
+  """
+  play a number of games with one table composition, shuffling the seats before each game
+
+  inputs:
+  -------
+      task (tuple): (table, ai_names, max_rounds, limit_choices, n_games, seed)
+
+  returns:
+  --------
+      tuple[int]: participant indices of the table
+      np.ndarray: scores of shape (n_games, n_players) in the order of `table`
+  """
+  table, ai_names, max_rounds, limit_choices, n_games, seed = task
+  # workers would otherwise share the random state of the parent process
+  np.random.seed(seed)
+  random.seed(seed)
+  n_players: int = len(table)
+  ai_player_types: list[dict] = [
+      {"trump_choice_var": ai_name, "bids_choice_var": ai_name, "get_trick_action": ai_name} for ai_name in ai_names]
+  auto_game = Wizard_Auto_Play(n_players, ai_player_types, limit_choices=limit_choices, max_rounds=max_rounds)
+  scores: np.ndarray = np.zeros((n_games, n_players))
+  seat_order: np.ndarray = np.arange(n_players)
+  for n in range(n_games):
+    np.random.shuffle(seat_order)
+    seat_scores = auto_game.play_game([ai_player_types[i] for i in seat_order], seat_order)
+    scores[n, seat_order] = seat_scores
+  return table, scores
+
+
+class Tournament_Results():
+  """
+  collect the scores of all games of a tournament and calculate rankings and pairwise results
+  """
+  def __init__(self, labels: list[str]):
+    self.labels: list[str] = labels
+    n_participants: int = len(labels)
+    self.game_scores: list[list[np.ndarray]] = [[] for _ in range(n_participants)]
+    self.n_wins: np.ndarray = np.zeros(n_participants)
+    # pairwise results: row participant compared to column participant at the same table
+    self.pair_games: np.ndarray = np.zeros((n_participants, n_participants), dtype=np.int64)
+    self.pair_wins: np.ndarray = np.zeros((n_participants, n_participants), dtype=np.int64)
+    self.pair_score_differences: np.ndarray = np.zeros((n_participants, n_participants))
+
+
+  def add_games(self, table: tuple[int], scores: np.ndarray) -> None:
+    """
+    add the scores of games played at one table
+
+    inputs:
+    -------
+        table (tuple[int]): participant indices of the table
+        scores (np.ndarray): scores of shape (n_games, n_players) in the order of `table`
+    """
+    table_winners: np.ndarray = scores == np.max(scores, axis=1, keepdims=True)
+    for position, participant in enumerate(table):
+      self.game_scores[participant].append(scores[:, position])
+      self.n_wins[participant] += np.sum(table_winners[:, position])
+    for position_1, position_2 in itertools.permutations(range(len(table)), 2):
+      participant_1, participant_2 = table[position_1], table[position_2]
+      self.pair_games[participant_1, participant_2] += len(scores)
+      self.pair_wins[participant_1, participant_2] += np.sum(scores[:, position_1] > scores[:, position_2])
+      self.pair_score_differences[participant_1, participant_2] += np.sum(scores[:, position_1] - scores[:, position_2])
+
+
+  def get_n_games(self) -> np.ndarray:
+    """
+    number of games played by each participant
+    """
+    return np.array([sum(len(scores) for scores in participant_scores) for participant_scores in self.game_scores])
+
+
+  def get_mean_scores(self) -> np.ndarray:
+    """
+    mean score of each participant (nan for participants without games)
+    """
+    return np.array([
+        np.mean(np.concatenate(participant_scores)) if participant_scores else np.nan
+        for participant_scores in self.game_scores])
+
+
+  def get_ranking(self, confidence_level: float = 0.95) -> list[dict]:
+    """
+    rank all participants by their mean score
+
+    returns:
+    --------
+        list[dict]: one dict per participant, sorted by mean score, with keys
+            "label", "n_games", "mean_score", "lower_bound", "upper_bound", "win_ratio"
+    """
+    ranking: list[dict] = []
+    for participant, label in enumerate(self.labels):
+      if not self.game_scores[participant]:
+        continue
+      scores: np.ndarray = np.concatenate(self.game_scores[participant])
+      lower_bound, upper_bound = confidence_interval(scores[:, None], confidence_level)
+      ranking.append({
+          "label": label,
+          "n_games": len(scores),
+          "mean_score": float(np.mean(scores)),
+          "lower_bound": float(lower_bound[0]),
+          "upper_bound": float(upper_bound[0]),
+          "win_ratio": float(self.n_wins[participant] / len(scores)),
+      })
+    return sorted(ranking, key=lambda entry: entry["mean_score"], reverse=True)
+
+
+  def get_pair_results(self) -> list[dict]:
+    """
+    results of each pair of participants that shared a table
+
+    returns:
+    --------
+        list[dict]: one dict per ordered pair with keys "label", "opponent", "n_games", "win_ratio", "mean_score_difference"
+            `win_ratio` is the fraction of games in which `label` scored more than `opponent`.
+    """
+    pair_results: list[dict] = []
+    for participant_1, participant_2 in zip(*np.nonzero(self.pair_games)):
+      n_games: int = int(self.pair_games[participant_1, participant_2])
+      pair_results.append({
+          "label": self.labels[participant_1],
+          "opponent": self.labels[participant_2],
+          "n_games": n_games,
+          "win_ratio": float(self.pair_wins[participant_1, participant_2] / n_games),
+          "mean_score_difference": float(self.pair_score_differences[participant_1, participant_2] / n_games),
+      })
+    return pair_results
+
+
+  def report(self, confidence_level: float = 0.95) -> str:
+    """
+    create a printable ranking and a matrix of pairwise win ratios
+    """
+    ranking: list[dict] = self.get_ranking(confidence_level)
+    label_width: int = max(len(label) for label in self.labels) + 2
+    lines: list[str] = [
+        f"{'rank':>4}  {'participant':<{label_width}} {'games':>8} {'mean score':>11} "
+        + f"{f'{confidence_level:.0%} confidence interval':>26} {'win ratio':>10}"]
+    for rank, entry in enumerate(ranking, start=1):
+      interval: str = f"[{entry['lower_bound']:.2f}, {entry['upper_bound']:.2f}]"
+      lines.append(
+          f"{rank:>4}  {entry['label']:<{label_width}} {entry['n_games']:>8} {entry['mean_score']:>11.2f} "
+          + f"{interval:>26} {entry['win_ratio']:>10.3f}")
+    # pairwise win ratios in the order of the ranking
+    order: list[int] = [self.labels.index(entry["label"]) for entry in ranking]
+    lines.append("")
+    lines.append("pairwise win ratios (row scored more than column):")
+    lines.append(" " * (label_width + 4) + "".join(f"{rank:>8}" for rank in range(1, len(order) + 1)))
+    for rank, participant_1 in enumerate(order, start=1):
+      row: str = f"{rank:>2}  {self.labels[participant_1]:<{label_width}}"
+      for participant_2 in order:
+        n_games: int = self.pair_games[participant_1, participant_2]
+        row += f"{'-':>8}" if n_games == 0 else f"{self.pair_wins[participant_1, participant_2] / n_games:>8.3f}"
+      lines.append(row)
+    return "\n".join(lines)
+
+
+def run_tournament(
+    participant_specs: list[str],
+    n_players: int = 3,
+    games_per_table: int = 100,
+    schedule: str = "round_robin",
+    n_swiss_rounds: int = 5,
+    max_rounds: int = 20,
+    limit_choices: bool = False,
+    n_processes: int = None,
+    games_per_task: int = 10,
+    seed: int = None,
+    rating_ledger: Rating_Ledger = None,
+    verbosity: int = 1,
+    ) -> Tournament_Results:
+  """
+  play a tournament between the given AIs
+
+  inputs:
+  -------
+      participant_specs (list[str]): built-in AI names or checkpoint paths
+      n_players (int): number of players per table
+      games_per_table (int): number of games played by each table composition
+      schedule (str): "round_robin" (all table compositions) or "swiss" (`n_swiss_rounds` rounds of tables with similar scores)
+      n_swiss_rounds (int): number of rounds for the swiss schedule
+      max_rounds (int): maximum number of rounds per game
+      limit_choices (bool): whether the sum of bids may not equal the number of tricks
+      n_processes (int): number of worker processes. Defaults to the number of CPUs.
+      games_per_task (int): number of games played per task sent to a worker
+      seed (int): seed for scheduling and games. A random seed is used if `None`.
+      rating_ledger (Rating_Ledger): ledger to update with the scores of all games. `None` disables ratings.
+      verbosity (int): print progress if at least 1
+
+  returns:
+  --------
+      Tournament_Results: results of all played games
+  """
+  labels, ai_names, checkpoints = get_participants(participant_specs)
+  register_checkpoints(checkpoints)
+  # built-in AIs are rated by name, checkpoints by their parameters
+  player_keys: list[str] = [
+      ai_name if ai_name not in checkpoints else get_player_key(ai_classes[ai_name]) for ai_name in ai_names]
+  rng: np.random.Generator = np.random.default_rng(seed)
+  results: Tournament_Results = Tournament_Results(labels)
+  if n_processes is None:
+    n_processes = mp.cpu_count()
+  start_time: float = time.time()
+  with mp.Pool(n_processes, initializer=register_checkpoints, initargs=(checkpoints,)) as process_pool:
+    n_stages: int = 1 if schedule == "round_robin" else n_swiss_rounds
+    for stage in range(n_stages):
+      if schedule == "round_robin":
+        tables: list[tuple[int]] = get_round_robin_tables(len(labels), n_players)
+      elif schedule == "swiss":
+        tables: list[tuple[int]] = get_swiss_tables(results.get_mean_scores(), n_players, rng)
+      else:
+        raise ValueError(f"Unknown schedule {schedule}. Choose 'round_robin' or 'swiss'.")
+      tasks: list[tuple] = []
+      for table in tables:
+        for start in range(0, games_per_table, games_per_task):
+          tasks.append((
+              tuple(int(i) for i in table),
+              [ai_names[i] for i in table],
+              max_rounds,
+              limit_choices,
+              min(games_per_task, games_per_table - start),
+              int(rng.integers(2**31))))
+      n_games_total: int = games_per_table * len(tables)
+      n_games_played: int = 0
+      for table, scores in process_pool.imap_unordered(play_table_games, tasks):
+        results.add_games(table, scores)
+        if rating_ledger is not None:
+          rating_ledger.add_games([player_keys[i] for i in table], scores)
+        n_games_played += len(scores)
+        if verbosity >= 1:
+          elapsed_time: float = time.time() - start_time
+          stage_info: str = "" if n_stages == 1 else f"round {stage + 1}/{n_stages}, "
+          print(f"\rTournament: {stage_info}{n_games_played}/{n_games_total} games in {elapsed_time: 6.0f} s.", end="")
+    if verbosity >= 1:
+      print()
+  return results
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Play a tournament between Wizard AIs and rank them.")
+  parser.add_argument("participants", nargs="+", help="built-in AI names or checkpoint paths of trained players")
+  parser.add_argument("--n_players", type=int, default=3, help="number of players per table (3-6)")
+  parser.add_argument("--games_per_table", type=int, default=100)
+  parser.add_argument("--schedule", choices=["round_robin", "swiss"], default="round_robin")
+  parser.add_argument("--n_swiss_rounds", type=int, default=5)
+  parser.add_argument("--max_rounds", type=int, default=20)
+  parser.add_argument("--limit_choices", action="store_true")
+  parser.add_argument("--n_processes", type=int, default=None)
+  parser.add_argument("--games_per_task", type=int, default=10)
+  parser.add_argument("--confidence_level", type=float, default=0.95)
+  parser.add_argument("--seed", type=int, default=None)
+  parser.add_argument("--output", default=None, help="json file to save the ranking and pairwise results to")
+  parser.add_argument("--ledger", default=None, help="SQLite rating ledger to update with all games")
+  args = parser.parse_args()
+
+  if not 3 <= args.n_players <= 6:
+    sys.exit("Wizard is played with 3 to 6 players.")
+  rating_ledger: Rating_Ledger = None if args.ledger is None else Rating_Ledger(args.ledger)
+  results: Tournament_Results = run_tournament(
+      args.participants,
+      n_players=args.n_players,
+      games_per_table=args.games_per_table,
+      schedule=args.schedule,
+      n_swiss_rounds=args.n_swiss_rounds,
+      max_rounds=args.max_rounds,
+      limit_choices=args.limit_choices,
+      n_processes=args.n_processes,
+      games_per_task=args.games_per_task,
+      seed=args.seed,
+      rating_ledger=rating_ledger)
+  print(results.report(args.confidence_level))
+  if rating_ledger is not None:
+    print(f"Ledger ratings ({args.ledger}):")
+    for key, rating, n_games in rating_ledger.get_leaderboard():
+      print(f"  {key:40} {rating: 8.1f} ({n_games} games)")
+    rating_ledger.close()
+  if args.output is not None:
+    with open(args.output, "w") as file:
+      json.dump({
+          "ranking": results.get_ranking(args.confidence_level),
+          "pairs": results.get_pair_results(),
+          }, file, indent=2)
@@ -0,0 +1,68 @@
+"""
+test the schedules and results of the headless tournament runner in `tournament.py`
+"""
+import itertools
+
+import numpy as np
+
+from tournament import get_round_robin_tables, get_swiss_tables, get_participants, Tournament_Results, run_tournament
+
+PARTICIPANTS: list[str] = ["simple rule ai", "genetic rule ai", "smart random ai", "simple rule ai"]
+
+
+def test_round_robin_tables():
+  tables = get_round_robin_tables(5, 3)
+  assert len(tables) == 10 and len(set(tables)) == 10
+  # every participant plays at the same number of tables
+  assert all(sum(participant in table for table in tables) == 6 for participant in range(5))
+  try:
+    get_round_robin_tables(2, 3)
+  except ValueError:
+    pass
+  else:
+    assert False, "a table with more players than participants should not be possible"
+
+
+def test_swiss_tables():
+  rng = np.random.default_rng(0)
+  mean_scores = np.array([50., 40., 30., 20., 10., np.nan, 0.])
+  tables = get_swiss_tables(mean_scores, 3, rng)
+  # participants without games are ranked last. The lowest ranked participants of the previous table fill the last table.
+  assert tables == [(0, 1, 2), (3, 4, 6), (4, 6, 5)]
+  assert set(itertools.chain(*tables)) == set(range(7))
+  # without a remainder, every participant plays exactly once
+  tables = get_swiss_tables(np.full(6, np.nan), 3, rng)
+  assert len(tables) == 2 and sorted(itertools.chain(*tables)) == list(range(6))
+
+
+def test_results():
+  labels, ai_names, checkpoints = get_participants(PARTICIPANTS)
+  assert labels[-1] == "simple rule ai #2" and ai_names[-1] == "simple rule ai" and checkpoints == {}
+  results = Tournament_Results(labels)
+  results.add_games((0, 1, 2), np.array([[10., 0., -10.], [0., 20., 20.]]))
+  assert results.get_n_games().tolist() == [2, 2, 2, 0]
+  assert np.isnan(results.get_mean_scores()[3])
+  assert [entry["label"] for entry in results.get_ranking()] == [labels[1], labels[0], labels[2]]
+  assert results.pair_wins[1, 2] == 1 and results.pair_games[1, 2] == 2
+  assert results.n_wins.tolist() == [1, 1, 1, 0]
+
+
+def test_run_tournament():
+  settings = {"n_players": 3, "games_per_table": 4, "max_rounds": 3, "n_processes": 1, "games_per_task": 3, "seed": 0, "verbosity": 0}
+  results = run_tournament(PARTICIPANTS, **settings)
+  # 4 tables with 3 of 4 participants
+  assert results.get_n_games().tolist() == [12, 12, 12, 12]
+  assert "pairwise win ratios" in results.report()
+  # 2 swiss rounds with 2 overlapping tables each
+  results = run_tournament(PARTICIPANTS, schedule="swiss", n_swiss_rounds=2, **settings)
+  assert np.sum(results.get_n_games()) == 2 * 2 * 4 * 3
+
+
+def all_tests():
+  test_round_robin_tables()
+  test_swiss_tables()
+  test_results()
+  test_run_tournament()
+
+if __name__ == "__main__":
+  all_tests()